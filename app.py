@@ -1,8 +1,14 @@
+import os
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, filedialog
 from float64_converter import converter
-import math
-import numpy as np
+from float64_converter.worker import BackgroundConverter
+
+POLL_MS = 50         # How often the worker is checked for a result
+DEBOUNCE_MS = 300    # Pause in typing before a live conversion starts
+TIMEOUT = 5.0        # Seconds before a conversion is cancelled
+BATCH_CHUNK = 5000   # Rows per background job (and per CSV write) in the batch tab
+TABLE_ROWS = 25      # Rows on screen in the batch table
 
 class IEEE754ConverterApp:
     """
@@ -12,8 +18,14 @@ class IEEE754ConverterApp:
     Features:
     - Input a real number or a mathematical expression (e.g., sin(2), sqrt(5), e^3, 1+29*e).
     - Input a 64-bit binary string to convert back to a real number.
+    - Sweep an expression in x (e.g., sin(x)) over a range of points.
     - Choose conversion method: Chopping or Rounding.
     - Copy the output to clipboard.
+    - Batch tab: convert a file or pasted list of numbers (see BatchTab).
+
+    Conversions run in a background worker process, so the window stays
+    responsive; a slow one can be cancelled and is stopped after TIMEOUT.
+    With Live on, the input is converted as you type.
     """
 
     def __init__(self, root):
@@ -26,12 +38,32 @@ class IEEE754ConverterApp:
         self.method_var = tk.StringVar(value="chop")
         self.output_text = tk.StringVar()
         self.input_var = tk.StringVar()
-        self.mode_var = tk.StringVar(value="expression")  # Expression or Binary
+        self.mode_var = tk.StringVar(value="expression")  # Expression, Binary or Sweep
+        self.range_var = tk.StringVar(value="0, 1, 11")  # Sweep start, stop, points
+        self.status_text = tk.StringVar()
+        self.live_var = tk.BooleanVar(value=True)
+
+        self.worker = BackgroundConverter(timeout=TIMEOUT)
+        self.worker.start()
+        self._poll_id = None
+        self._debounce_id = None
 
         self.create_widgets()
 
+        for var in (self.input_var, self.mode_var, self.method_var, self.range_var):
+            var.trace_add("write", self._schedule_live)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
     def create_widgets(self):
         self._create_header()
+
+        notebook = ttk.Notebook(self.root)
+        notebook.pack(fill="both", expand=True)
+        self.single_tab = tk.Frame(notebook, bg="#1c1c1c")
+        notebook.add(self.single_tab, text="Single")
+        self.batch_tab = BatchTab(notebook)
+        notebook.add(self.batch_tab.frame, text="Batch")
+
         self._create_instructions()
         self._create_mode_frame()
         self._create_input_frame()
@@ -49,7 +81,7 @@ class IEEE754ConverterApp:
 
     def _create_instructions(self):
         frame = tk.LabelFrame(
-            self.root,
+            self.single_tab,
             text="Instructions",
             font=("Segoe UI", 14, "bold"),
             bg="#2c2c2c",
@@ -65,8 +97,9 @@ class IEEE754ConverterApp:
         instruction_text = (
             "• Enter a mathematical expression (e.g., sin(2), sqrt(5), e^3, 1+29*e) and convert it to 64-bit binary.\n"
             "• Or enter a 64-bit binary string to convert back to a real number.\n"
+            "• Or sweep an expression in x (e.g., sin(x)) over the range start, stop, points.\n"
             "• Choose Chopping or Rounding for expression → binary conversion.\n"
-            "• Click Convert to see the result, and Copy to copy the output."
+            "• Click Convert (or type with Live on) to see the result, Cancel to stop a slow one, and Copy to copy the output."
         )
 
         tk.Label(
@@ -79,7 +112,7 @@ class IEEE754ConverterApp:
         ).pack(anchor="w")
 
     def _create_mode_frame(self):
-        frame = tk.Frame(self.root, bg="#2c2c2c")
+        frame = tk.Frame(self.single_tab, bg="#2c2c2c")
         frame.pack(pady=5, fill="x", padx=20)
 
         tk.Radiobutton(
@@ -104,8 +137,38 @@ class IEEE754ConverterApp:
             selectcolor="#3a3a3a"
         ).pack(side="left", padx=10)
 
+        tk.Radiobutton(
+            frame,
+            text="Sweep f(x) → Binary",
+            variable=self.mode_var,
+            value="sweep",
+            font=("Segoe UI", 11),
+            bg="#2c2c2c",
+            fg="#cccccc",
+            selectcolor="#3a3a3a"
+        ).pack(side="left", padx=10)
+
+        tk.Label(
+            frame,
+            text="Range:",
+            font=("Segoe UI", 11),
+            bg="#2c2c2c",
+            fg="#cccccc"
+        ).pack(side="left", padx=(10, 5))
+
+        tk.Entry(
+            frame,
+            font=("Consolas", 11),
+            width=16,
+            textvariable=self.range_var,
+            bg="#3a3a3a",
+            fg="#ffffff",
+            insertbackground="white",
+            relief="flat"
+        ).pack(side="left")
+
     def _create_input_frame(self):
-        frame = tk.Frame(self.root, bg="#2c2c2c")
+        frame = tk.Frame(self.single_tab, bg="#2c2c2c")
         frame.pack(pady=10, fill="x", padx=20)
 
         tk.Label(
@@ -179,9 +242,32 @@ class IEEE754ConverterApp:
             pady=5
         ).pack(side="left", padx=10)
 
+        tk.Button(
+            frame,
+            text="Cancel",
+            command=self.cancel,
+            font=("Segoe UI", 12, "bold"),
+            bg="#555555",
+            fg="#ffffff",
+            activebackground="#777777",
+            relief="flat",
+            padx=10,
+            pady=5
+        ).pack(side="left", padx=10)
+
+        tk.Checkbutton(
+            frame,
+            text="Live",
+            variable=self.live_var,
+            font=("Segoe UI", 11),
+            bg="#2c2c2c",
+            fg="#cccccc",
+            selectcolor="#3a3a3a"
+        ).pack(side="left", padx=10)
+
     def _create_output_frame(self):
         frame = tk.LabelFrame(
-            self.root,
+            self.single_tab,
             text="Result",
             font=("Segoe UI", 14, "bold"),
             bg="#3a3a3a",
@@ -203,6 +289,14 @@ class IEEE754ConverterApp:
             fg="#ffffff"
         ).pack(anchor="w")
 
+        tk.Label(
+            frame,
+            textvariable=self.status_text,
+            font=("Segoe UI", 10),
+            bg="#3a3a3a",
+            fg="#aaaaaa"
+        ).pack(anchor="w", side="bottom")
+
         # Copy button at bottom right
         tk.Button(
             frame,
@@ -226,9 +320,21 @@ class IEEE754ConverterApp:
             fg="#888888"
         ).pack(side="bottom", pady=10)
 
-    def convert(self):
+    def convert(self, live=False):
+        """
+        Check the input and hand the conversion to the background worker.
+        The result is shown by _poll when it arrives. With live=True (called
+        while typing) an empty input just clears the result.
+        """
         mode = self.mode_var.get()
         user_input = self.input_var.get().strip()
+        round = self.method_var.get() == "round"
+
+        if live and not user_input:
+            self.worker.cancel()
+            self.output_text.set("")
+            self.status_text.set("")
+            return
 
         try:
             if mode == "expression":
@@ -242,20 +348,11 @@ class IEEE754ConverterApp:
                     )
                     return
 
-                # Safely evaluate mathematical expression
-                allowed_names = {
-                    k: getattr(math, k) for k in dir(math) if not k.startswith("__")
-                }
-                allowed_names.update({"e": math.e, "pi": math.pi})
-                number = eval(user_input, {"__builtins__": None}, allowed_names)
-
-                method = self.method_var.get()
-                if method == "chop":
-                    binary_repr = converter.real_to_float64(number)
-                else:
-                    binary_repr = converter.real_to_float64(number, round=True)
+                self.worker.submit(expression_task, user_input, round)
 
-                self.output_text.set(f"{binary_repr}")
+            elif mode == "sweep":
+                start, stop, num = self.parse_range()
+                self.worker.submit(sweep_task, user_input, start, stop, num, round)
 
             else:  # mode == "binary"
                 # Detect if user entered something that looks like a math expression
@@ -272,17 +369,308 @@ class IEEE754ConverterApp:
                 if len(user_input) != 64:
                     raise ValueError("Input must be a 64-bit binary string")
 
-                real_val = converter.float64_to_real(user_input)
-                self.output_text.set(f"{real_val}")
+                self.worker.submit(binary_task, user_input)
 
         except Exception as e:
             self.output_text.set(f"Error: {str(e)}")
-        
-        
+            return
+
+        self.status_text.set("Converting...")
+        if self._poll_id is None:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
+
+    def _poll(self):
+        """Show the worker's result once it arrives; reschedule until then."""
+        self._poll_id = None
+        result = self.worker.poll()
+
+        if result is None:
+            if self.worker.busy:
+                self._poll_id = self.root.after(POLL_MS, self._poll)
+            return
+
+        _, status, value = result
+        if status == "ok":
+            self.output_text.set(f"{value}")
+            self.status_text.set("")
+        elif status == "error":
+            self.output_text.set(f"Error: {value}")
+            self.status_text.set("")
+        else:
+            self.status_text.set(f"Cancelled: took longer than {self.worker.timeout:g} s")
+
+    def cancel(self):
+        self.worker.cancel()
+        self.status_text.set("Cancelled")
+
+    def _schedule_live(self, *_):
+        """Debounce: convert once the input has not changed for DEBOUNCE_MS."""
+        if self._debounce_id is not None:
+            self.root.after_cancel(self._debounce_id)
+            self._debounce_id = None
+        if self.live_var.get():
+            self._debounce_id = self.root.after(DEBOUNCE_MS, self._live_convert)
+
+    def _live_convert(self):
+        self._debounce_id = None
+        self.convert(live=True)
+
+    def parse_range(self):
+        """Return (start, stop, points) from the sweep range entry."""
+        try:
+            start, stop, num = (part.strip() for part in self.range_var.get().split(","))
+            return float(start), float(stop), int(num)
+        except ValueError:
+            raise ValueError("Range must be: start, stop, points") from None
+
+    def close(self):
+        self.worker.close()
+        self.batch_tab.worker.close()
+        self.root.destroy()
+
     def copy_output(self):
         self.root.clipboard_clear()
         self.root.clipboard_append(self.output_text.get())
 
+class BatchTab:
+    """
+    Batch conversion of many numbers: load a file or paste a list, convert
+    it in a background process chunk by chunk with a progress bar, browse
+    the results and export them as CSV.
+
+    Results live in a ConversionTable (flat NumPy arrays). The Treeview
+    holds only TABLE_ROWS items, refilled from the table for the scroll
+    position, so a million rows never become a million widgets. CSV export
+    writes BATCH_CHUNK rows per event-loop turn.
+
+    The widgets (and NumPy, through the table module) are only created the
+    first time the tab is shown, which keeps the window's startup fast.
+    """
+
+    def __init__(self, parent):
+        self.frame = tk.Frame(parent, bg="#1c1c1c")
+        self.worker = BackgroundConverter(timeout=None)
+        self.table = None
+        self.offset = 0           # First table row on screen
+        self._next = 0            # First row of the next chunk to convert
+        self._reading = False     # The worker's job is reading a file
+        self._poll_id = None
+        self.status_text = tk.StringVar()
+
+        parent.bind("<<NotebookTabChanged>>", self._on_tab_changed, add="+")
+
+    def _on_tab_changed(self, event):
+        if self.table is None and event.widget.select() == str(self.frame):
+            from float64_converter.table import ConversionTable, InputLines
+            self.table = ConversionTable(InputLines())
+            self._create_controls()
+            self._create_table()
+
+    def _create_controls(self):
+        frame = tk.Frame(self.frame, bg="#2c2c2c")
+        frame.pack(pady=10, fill="x", padx=20)
+
+        self.paste = tk.Text(
+            frame,
+            height=5,
+            width=40,
+            font=("Consolas", 11),
+            bg="#3a3a3a",
+            fg="#ffffff",
+            insertbackground="white",
+            relief="flat"
+        )
+        self.paste.pack(side="left", padx=(0, 10))
+
+        buttons = tk.Frame(frame, bg="#2c2c2c")
+        buttons.pack(side="left")
+        for text, command in (("Convert pasted", self.convert_pasted),
+                              ("Load file...", self.load_file),
+                              ("Cancel", self.cancel),
+                              ("Export CSV...", self.export_csv)):
+            tk.Button(
+                buttons,
+                text=text,
+                command=command,
+                font=("Segoe UI", 11, "bold"),
+                bg="#555555",
+                fg="#ffffff",
+                activebackground="#777777",
+                relief="flat",
+                padx=10,
+                pady=2
+            ).pack(fill="x", pady=2)
+
+        status = tk.Frame(self.frame, bg="#1c1c1c")
+        status.pack(fill="x", padx=20)
+        self.progress = ttk.Progressbar(status, mode="determinate", length=400)
+        self.progress.pack(side="left")
+        tk.Label(
+            status,
+            textvariable=self.status_text,
+            font=("Segoe UI", 10),
+            bg="#1c1c1c",
+            fg="#aaaaaa"
+        ).pack(side="left", padx=10)
+
+    def _create_table(self):
+        from float64_converter.table import COLUMNS
+        frame = tk.Frame(self.frame, bg="#1c1c1c")
+        frame.pack(pady=10, fill="both", expand=True, padx=20)
+
+        self.tree = ttk.Treeview(frame, columns=COLUMNS, show="headings", height=TABLE_ROWS)
+        widths = {"Input": 160, "Sign": 40, "Exponent": 110, "Fraction": 420,
+                  "Chopped": 170, "Rounded": 170, "Error": 160}
+        for column in COLUMNS:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=widths[column], stretch=column == "Error")
+        self.items = [self.tree.insert("", "end") for _ in range(TABLE_ROWS)]
+
+        self.scrollbar = ttk.Scrollbar(frame, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.tree.bind("<MouseWheel>", lambda event: self.scroll_to(self.offset - event.delta // 40))
+        self.tree.bind("<Button-4>", lambda event: self.scroll_to(self.offset - 3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_to(self.offset + 3))
+        self.refresh()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.table)))
+        elif unit == "pages":
+            self.scroll_to(self.offset + int(amount) * TABLE_ROWS)
+        else:
+            self.scroll_to(self.offset + int(amount))
+
+    def scroll_to(self, offset):
+        self.offset = max(0, min(offset, len(self.table) - TABLE_ROWS))
+        self.refresh()
+
+    def refresh(self):
+        """Fill the on-screen rows from the table."""
+        rows = self.table.rows(self.offset, self.offset + TABLE_ROWS)
+        for i, item in enumerate(self.items):
+            self.tree.item(item, values=rows[i] if i < len(rows) else ())
+        n = max(len(self.table), 1)
+        self.scrollbar.set(self.offset / n, min(self.offset + TABLE_ROWS, n) / n)
+
+    def convert_pasted(self):
+        from float64_converter.table import read_lines
+        self.start(read_lines(self.paste.get("1.0", "end").splitlines()))
+
+    def load_file(self):
+        path = filedialog.askopenfilename(title="Numbers to convert, one per line")
+        if path:
+            # Read in the worker, so a large file never blocks the event loop
+            from float64_converter.table import read_file
+            self.worker.cancel()
+            self._reading = True
+            self.worker.submit(read_file, path)
+            self.status_text.set(f"Reading {os.path.basename(path)}")
+            if self._poll_id is None:
+                self._poll_id = self.frame.after(POLL_MS, self._poll)
+
+    def start(self, inputs):
+        """Convert InputLines (see float64_converter.table), replacing the current table."""
+        from float64_converter.table import ConversionTable
+        self.worker.cancel()
+        self._reading = False
+        self.table = ConversionTable(inputs)
+        self.offset = self._next = 0
+        self.progress.configure(maximum=max(len(inputs), 1), value=0)
+        self.refresh()
+        self._submit_next()
+
+    def _submit_next(self):
+        if self._next >= len(self.table):
+            self.status_text.set(f"{len(self.table)} rows, {len(self.table.errors)} errors")
+            return
+        from float64_converter.table import convert_lines
+        stop = self._next + BATCH_CHUNK
+        self.worker.submit(convert_lines, self.table.inputs[self._next:stop])
+        self.status_text.set(f"Converting {self._next} / {len(self.table)}")
+        if self._poll_id is None:
+            self._poll_id = self.frame.after(POLL_MS, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        result = self.worker.poll()
+        if result is None:
+            if self.worker.busy:
+                self._poll_id = self.frame.after(POLL_MS, self._poll)
+            return
+
+        _, status, value = result
+        reading, self._reading = self._reading, False
+        if status != "ok":
+            self.status_text.set(f"Error: {value}")
+            return
+        if reading:
+            self.start(value)
+            return
+        self.table.store(self._next, value)
+        self._next = self.table.done
+        self.progress.configure(value=self._next)
+        if self.offset < self._next and self.offset + TABLE_ROWS > self._next - BATCH_CHUNK:
+            self.refresh()  # The new chunk is on screen
+        self._submit_next()
+
+    def cancel(self):
+        self.worker.cancel()
+        self._reading = False
+        self._next = len(self.table)
+        self.status_text.set(f"Cancelled after {self.table.done} / {len(self.table)} rows")
+
+    def export_csv(self):
+        path = filedialog.asksaveasfilename(defaultextension=".csv",
+                                            filetypes=[("CSV", "*.csv")])
+        if path:
+            self._export(path, 0)
+
+    def _export(self, path, start):
+        """Write one chunk of rows, then yield to the event loop."""
+        stop = min(start + BATCH_CHUNK, len(self.table))
+        # The file is only open while a chunk is written, so it is closed
+        # even if writing raises
+        with open(path, "w" if start == 0 else "a", newline="") as f:
+            self.table.write_csv(f, start, stop, header=start == 0)
+        self.progress.configure(maximum=max(len(self.table), 1), value=stop)
+        if stop < len(self.table):
+            self.status_text.set(f"Exporting {stop} / {len(self.table)}")
+            self.frame.after(1, self._export, path, stop)
+        else:
+            self.status_text.set(f"Exported {len(self.table)} rows")
+
+
+# Conversion jobs, run in the worker process (module-level so they pickle)
+
+def expression_task(user_input, round):
+    from float64_converter.expression import compile_expression
+    # Safely evaluate mathematical expression (compiled once, cached)
+    number = compile_expression(user_input)()
+    return converter.real_to_float64(number, round=round)
+
+
+def binary_task(user_input):
+    # Shortest string that converts back to the same bits
+    return converter.float64_to_str(user_input)
+
+
+def sweep_task(user_input, start, stop, num, round, max_rows=20):
+    """
+    Evaluate the expression over the range and format the first max_rows
+    points as "x = ... f(x) = ... bits" lines.
+    """
+    from float64_converter.expression import sweep
+    xs, values, bits = sweep(user_input, start, stop, num, round=round)
+    lines = [f"x = {x!r:<24} f(x) = {y!r:<24} {b.decode()}"
+             for x, y, b in zip(xs[:max_rows].tolist(), values[:max_rows].tolist(),
+                                bits[:max_rows].tolist())]
+    if num > max_rows:
+        lines.append(f"... ({num} points)")
+    return "\n".join(lines)
+
+
 if __name__ == "__main__":
     root = tk.Tk()
     app = IEEE754ConverterApp(root)
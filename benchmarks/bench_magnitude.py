@@ -0,0 +1,55 @@
+"""
+benchmarks/bench_magnitude.py
+
+Magnitude sweep for real_to_float64: times one conversion of a 17-digit
+decimal at every power of ten from 1e-308 to 1e308, in both chopping and
+rounding mode. With the integer normalization the per-call latency should
+stay flat across the whole range.
+
+Run:
+    python benchmarks/bench_magnitude.py [step]
+"""
+
+import os, sys, timeit
+from decimal import Decimal
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter.converter import real_to_float64
+
+
+def magnitude_sweep(step=44, number=2000, repeat=5):
+    """
+    Time real_to_float64 for inputs 1.2345678901234567 * 10^k.
+
+    Input:
+        step (int): Spacing between the sampled decimal exponents k.
+        number (int): Calls per timing run.
+        repeat (int): Timing runs per value (the best one is kept).
+    Returns:
+        list: (k, chop_us, round_us) rows, latencies in microseconds per call.
+    """
+    rows = []
+    for k in sorted(set(range(-308, 309, step)) | {308}):
+        x = Decimal(f"1.2345678901234567e{k}")
+        timings = []
+        for rounding in (False, True):
+            best = min(timeit.repeat(lambda: real_to_float64(x, round=rounding),
+                                     number=number, repeat=repeat))
+            timings.append(best / number * 1e6)
+        rows.append((k, *timings))
+    return rows
+
+
+if __name__ == "__main__":
+    step = int(sys.argv[1]) if len(sys.argv) > 1 else 44
+    rows = magnitude_sweep(step)
+
+    print(f"{'x':>10} {'chop (us)':>10} {'round (us)':>11}")
+    for k, chop_us, round_us in rows:
+        print(f"{'1e' + str(k):>10} {chop_us:10.2f} {round_us:11.2f}")
+
+    latencies = [t for row in rows for t in row[1:]]
+    print(f"\nmax/min latency ratio: {max(latencies) / min(latencies):.2f}")
@@ -0,0 +1,234 @@
+"""
+benchmarks/suite.py
+
+Throughput benchmarks for the converter with JSON baselines and a
+regression gate.
+
+Each benchmark converts a fixed list of inputs of one class (near 1, large
+and small magnitudes, subnormal range, special values; str, float and
+Decimal inputs; chop and round) through one path: the scalar functions,
+the LRU caches, the NumPy batch functions or the pools of convert_many.
+A benchmark is timed over many rounds; ops/sec comes from the median round
+and the latency percentiles are per conversion, over rounds.
+
+Run:
+    python benchmarks/suite.py run [-o results.json] [--quick] [-k FILTER]
+    python benchmarks/suite.py compare baseline.json results.json [--threshold 0.15]
+
+compare exits with status 1 if any metric is worse than the baseline by
+more than the threshold (ops/sec lower, or a latency percentile higher),
+or if a benchmark or metric of the baseline is missing from the results.
+"""
+
+import os, sys, json, time, argparse, platform
+from decimal import Decimal
+
+import numpy as np
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter import cache
+from float64_converter.converter import real_to_float64, float64_to_real
+from float64_converter.batch import real_to_float64_array, float64_to_real_array
+from float64_converter.parallel import convert_many
+
+N_VALUES = 200
+
+# Metrics where a larger value is better; every other metric is a latency
+HIGHER_IS_BETTER = {"ops_per_sec"}
+
+
+def _input_classes():
+    """Float inputs of each magnitude class, N_VALUES each."""
+    rng = np.random.default_rng(2024)
+    mantissas = rng.uniform(1, 10, N_VALUES)
+    return {
+        "near_one": (mantissas / 5).tolist(),
+        "large": (mantissas * 10.0 ** rng.integers(250, 308, N_VALUES)).tolist(),
+        "small": (mantissas * 10.0 ** rng.integers(-307, -250, N_VALUES)).tolist(),
+        "subnormal": (mantissas * 1e-315).tolist(),
+        "special": [0.0, -0.0, float("inf"), float("-inf"), float("nan")] * (N_VALUES // 5),
+    }
+
+
+def _as_type(values, kind):
+    if kind == "float":
+        return values
+    if kind == "str":
+        return [repr(x) for x in values]
+    return [Decimal(repr(x)) for x in values]
+
+
+def build_benchmarks(quick=False):
+    """
+    Return a dict mapping benchmark names to (function, ops) where calling
+    function() performs ops conversions.
+    """
+    benchmarks = {}
+    classes = _input_classes()
+
+    # Scalar encode: every input class x input type x mode
+    for class_name, values in classes.items():
+        for kind in ("float", "str", "Decimal"):
+            inputs = _as_type(values, kind)
+            for rounding in (False, True):
+                mode = "round" if rounding else "chop"
+                benchmarks[f"encode/scalar/{class_name}/{kind}/{mode}"] = (
+                    lambda inputs=inputs, rounding=rounding:
+                        [real_to_float64(x, round=rounding) for x in inputs],
+                    len(inputs))
+
+    # Scalar decode: Decimal result and float result
+    for class_name, values in classes.items():
+        patterns = [real_to_float64(x) for x in values]
+        benchmarks[f"decode/scalar/{class_name}/Decimal"] = (
+            lambda patterns=patterns: [float64_to_real(b) for b in patterns], len(patterns))
+        benchmarks[f"decode/scalar/{class_name}/float"] = (
+            lambda patterns=patterns: [float64_to_real(b, as_float=True) for b in patterns],
+            len(patterns))
+
+    # Cached paths (after warm-up every call is a hit)
+    strings = _as_type(classes["near_one"], "str")
+    patterns = [real_to_float64(x) for x in strings]
+    encode, decode = cache.cached_real_to_float64(), cache.cached_float64_to_real()
+    benchmarks["encode/cached/near_one/str/round"] = (
+        lambda: [encode(x, round=True) for x in strings], len(strings))
+    benchmarks["decode/cached/near_one/Decimal"] = (
+        lambda: [decode(b) for b in patterns], len(patterns))
+
+    # Batch paths
+    n_batch = 10_000 if quick else 1_000_000
+    array = np.random.default_rng(7).standard_normal(n_batch)
+    bit_strings = real_to_float64_array(array)
+    benchmarks["encode/batch/normal/float64"] = (lambda: real_to_float64_array(array), n_batch)
+    benchmarks["decode/batch/normal/S64"] = (lambda: float64_to_real_array(bit_strings), n_batch)
+
+    # Pools (long decimal strings through the exact Decimal engine)
+    if not quick:
+        long_strings = [f"{k}.{k * 7919 % 10**40:040d}e{k % 600 - 300}" for k in range(1, 20_001)]
+        for backend in ("process", "thread"):
+            benchmarks[f"encode/parallel-{backend}/long/str/round"] = (
+                lambda backend=backend: convert_many(long_strings, round=True, workers=2, backend=backend),
+                len(long_strings))
+
+    return benchmarks
+
+
+def measure(function, ops, min_time=0.2, min_rounds=5):
+    """
+    Time function() over rounds until min_time has passed.
+
+    Returns:
+        dict: ops_per_sec, and p50/p90/p99 latency per conversion in microseconds.
+    """
+    function()  # warm-up
+    per_op = []
+    start = time.perf_counter()
+    while len(per_op) < min_rounds or time.perf_counter() - start < min_time:
+        t0 = time.perf_counter()
+        function()
+        per_op.append((time.perf_counter() - t0) / ops)
+
+    per_op = np.array(per_op)
+    return {
+        "ops_per_sec": float(1 / np.median(per_op)),
+        "p50_us": float(np.percentile(per_op, 50) * 1e6),
+        "p90_us": float(np.percentile(per_op, 90) * 1e6),
+        "p99_us": float(np.percentile(per_op, 99) * 1e6),
+    }
+
+
+def run(quick=False, name_filter=None):
+    """Run the suite and return the results document."""
+    results = {}
+    for name, (function, ops) in build_benchmarks(quick).items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = measure(function, ops, min_time=0.05 if quick else 0.2)
+        print(f"{name:45} {results[name]['ops_per_sec']:14,.0f} ops/s"
+              f"  p99 {results[name]['p99_us']:10.3f} us", file=sys.stderr)
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=0.15):
+    """
+    Compare two results documents.
+
+    Returns:
+        tuple: (regressions, missing). regressions lists (benchmark, metric,
+        baseline value, current value, relative change) for every metric
+        that got worse by more than threshold; missing lists (benchmark,
+        metric) for what the baseline has and current lacks (metric None
+        for a whole benchmark).
+    """
+    regressions = []
+    missing = []
+    for name, base_metrics in baseline["results"].items():
+        metrics = current["results"].get(name)
+        if metrics is None:
+            missing.append((name, None))
+            continue
+        for metric, base in base_metrics.items():
+            value = metrics.get(metric)
+            if value is None:
+                missing.append((name, metric))
+                continue
+            if metric in HIGHER_IS_BETTER:
+                change = (base - value) / base
+            else:
+                change = (value - base) / base
+            if change > threshold:
+                regressions.append((name, metric, base, value, change))
+    return regressions, missing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write JSON results")
+    run_parser.add_argument("-o", "--output", default="-", help="results file (default: stdout)")
+    run_parser.add_argument("--quick", action="store_true", help="short runs, no pools")
+    run_parser.add_argument("-k", dest="name_filter", help="only run benchmarks containing FILTER")
+
+    compare_parser = commands.add_parser("compare", help="fail if results regress against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.15,
+                                help="allowed relative slowdown per metric (default: 0.15)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        document = json.dumps(run(args.quick, args.name_filter), indent=2, sort_keys=True)
+        if args.output == "-":
+            print(document)
+        else:
+            with open(args.output, "w") as f:
+                f.write(document + "\n")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    regressions, missing = compare(baseline, current, args.threshold)
+    for name, metric, base, value, change in regressions:
+        print(f"REGRESSION {name} {metric}: {base:.6g} -> {value:.6g} ({change:+.1%})")
+    for name, metric in missing:
+        print(f"MISSING {name}" + (f" {metric}" if metric else ""))
+    print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}, {len(missing)} missing")
+    return 1 if regressions or missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,16 +11,83 @@ Includes:
 
 Modules:
     converter.py : main conversion functions
+    formats.py   : descriptors of binary16, bfloat16, binary32 and custom formats
+    rounding.py  : rounding modes (directed, ties-away, stochastic) and their RNG
+    batch.py     : vectorized conversions of NumPy arrays and chop()
+    parallel.py  : process-pool conversion of large Decimal workloads
+    cache.py     : opt-in LRU caches around the converter functions
+    instrument.py: opt-in stage timers, branch counters and hooks
+    expression.py: safe compiled math expressions and NumPy sweeps
+    worker.py    : background worker process for non-blocking conversions
+    table.py     : chunked bulk-conversion table behind the GUI batch tab
+    analysis.py  : parallel batch study of chop and round errors
+    verify.py    : sharded differential check against native doubles
+    mapped.py    : memory-mapped bit dumps of raw and .npy files of doubles
+    server.py    : local asyncio NDJSON server with micro-batching
+    ulp.py       : next_up/next_down, ulp, ULP distances and ordinals of patterns
+    accuracy.py  : parallel ULP-error measurement of math functions
+    export.py    : streamed LaTeX/CSV/Markdown tables of chop and round errors
     utils.py     : helper tools for display and testing
+
+Only converter.py, formats.py and rounding.py are imported with the package; the
+NumPy-backed names exported here are imported on first access.
 """
 
 # __init__.py
 from .converter import (
     real_to_float64,
-    float64_to_real
+    float64_to_real,
+    float64_to_str,
+    real_to_bits,
+    bits_to_real
+)
+from .formats import (
+    FloatFormat,
+    BINARY16,
+    BFLOAT16,
+    BINARY32,
+    BINARY64
 )
+from .rounding import RoundingMode
+
+# NumPy and the process pools load on first use of these names, so that
+# importing the package (the scalar converter) stays fast
+_LAZY = {
+    "real_to_float64_array": "batch",
+    "float64_to_real_array": "batch",
+    "float64_to_str_array": "batch",
+    "chop": "batch",
+    "convert_many": "parallel",
+}
 
 __all__ = [
     "real_to_float64",
     "float64_to_real",
+    "float64_to_str",
+    "real_to_bits",
+    "bits_to_real",
+    "FloatFormat",
+    "BINARY16",
+    "BFLOAT16",
+    "BINARY32",
+    "BINARY64",
+    "RoundingMode",
+    "real_to_float64_array",
+    "float64_to_real_array",
+    "float64_to_str_array",
+    "chop",
+    "convert_many",
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        from importlib import import_module
+        value = getattr(import_module(f".{_LAZY[name]}", __name__), name)
+        globals()[name] = value  # Later lookups skip __getattr__
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
@@ -0,0 +1,172 @@
+"""
+__main__.py
+
+Command-line entry point for streaming conversions:
+
+    python -m float64_converter [FILE] --mode encode|decode [--round|--chop]
+                                [--format shortest|exact|decimal]
+
+Reads one number (encode) or one 64-bit string (decode) per line from FILE
+or stdin and writes one result per line to stdout. Decoded values are
+written as the shortest decimal string that converts back to the same
+bits, or with --format exact as their complete decimal expansion (decimal
+gives the 70-digit Decimal of float64_to_real). Input is processed in
+chunks of lines with buffered writes, so memory use does not grow with the
+size of the input. Malformed lines are reported on the error channel
+(stderr by default) and skipped; the exit status is 1 if any were found.
+
+Binary files of doubles are handled through memory maps (see mapped.py):
+
+    python -m float64_converter FILE --mode dump [--byteorder big] [--fields] [--raw]
+    python -m float64_converter DUMP --mode load -o FILE.npy [--byteorder big]
+
+dump writes the 64-bit string of every double in a raw or .npy FILE, and
+load writes a dump back into a raw or .npy file.
+"""
+
+import argparse
+import sys
+from itertools import islice
+
+from .converter import real_to_float64, float64_to_real, float64_to_str
+
+BUFFER_SIZE = 1 << 20
+FORMATS = ("shortest", "exact", "decimal")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m float64_converter",
+        description="Convert real numbers to and from 64-bit IEEE 754 binary strings, one per line.",
+    )
+    parser.add_argument("input", nargs="?", default="-",
+                        help="input file (default: stdin)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="output file (default: stdout)")
+    parser.add_argument("--mode", choices=["encode", "decode", "dump", "load"], default="encode",
+                        help="encode numbers to bits or decode bits to numbers, dump a binary "
+                             "file of doubles to bits or load a dump into one (default: encode)")
+    method = parser.add_mutually_exclusive_group()
+    method.add_argument("--round", dest="round", action="store_true",
+                        help="round to nearest, ties to even")
+    method.add_argument("--chop", dest="round", action="store_false",
+                        help="chop extra bits (default)")
+    parser.add_argument("--format", choices=FORMATS, default="shortest",
+                        help="decode: shortest round-trip string, exact expansion, "
+                             "or 70-digit Decimal (default: shortest)")
+    parser.add_argument("--errors", default="-",
+                        help="file for malformed-line reports (default: stderr)")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="lines converted per buffered write (default: 8192, "
+                             "or 262144 for dump and load)")
+    parser.add_argument("--byteorder", choices=["big", "little"], default="little",
+                        help="byte order of raw binary files for dump and load (default: little)")
+    parser.add_argument("--fields", action="store_true",
+                        help="dump: write sign, exponent and fraction separated by spaces")
+    parser.add_argument("--raw", action="store_true",
+                        help="dump: keep the stored bits of NaNs and subnormals")
+    return parser
+
+
+def convert_stream(lines, out, errors, mode="encode", round=False, chunk_size=8192,
+                   format="shortest"):
+    """
+    Convert an iterable of lines chunk by chunk.
+
+    Input:
+        lines (iterable of str): Input lines.
+        out (file): Text stream receiving one result per line.
+        errors (file): Text stream receiving one report per malformed line.
+        mode (str): "encode" or "decode".
+        round (boolean): Round if True, chop if False (encode only).
+        chunk_size (int): Lines converted per write.
+        format (str): "shortest", "exact" or "decimal" (decode only).
+    Returns:
+        int: Number of malformed lines.
+    """
+    if mode == "encode":
+        convert = lambda text: real_to_float64(text, round=round)
+    elif format == "decimal":
+        convert = lambda text: str(float64_to_real(text))
+    else:
+        exact = format == "exact"
+        convert = lambda text: float64_to_str(text, exact=exact)
+
+    lines = iter(lines)
+    lineno = 0
+    n_errors = 0
+
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            break
+
+        results = []
+        for line in chunk:
+            lineno += 1
+            text = line.strip()
+            if not text:
+                continue
+            try:
+                results.append(convert(text) + "\n")
+            except ArithmeticError:
+                # decimal.InvalidOperation from an unparsable number
+                n_errors += 1
+                errors.write(f"line {lineno}: {text!r}: not a valid number\n")
+            except ValueError as e:
+                n_errors += 1
+                errors.write(f"line {lineno}: {text!r}: {e}\n")
+
+        out.write("".join(results))
+
+    return n_errors
+
+
+def _open(path, mode, std):
+    if path == "-":
+        return std
+    return open(path, mode, buffering=BUFFER_SIZE)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.mode in ("dump", "load"):
+        from . import mapped  # NumPy is only needed for binary files
+        if args.input == "-":
+            parser.error(f"--mode {args.mode} needs an input file")
+        chunk_size = args.chunk_size or mapped.CHUNK_SIZE
+        if args.mode == "load":
+            if args.output == "-":
+                parser.error("--mode load needs an output file (-o)")
+            mapped.load_bits(args.input, args.output, args.byteorder, chunk_size)
+            return 0
+        out = _open(args.output, "wb", sys.stdout.buffer)
+        try:
+            mapped.dump_bits(args.input, out, args.byteorder, args.fields, args.raw, chunk_size)
+            out.flush()
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+        return 0
+
+    source = _open(args.input, "r", sys.stdin)
+    out = _open(args.output, "w", sys.stdout)
+    errors = _open(args.errors, "w", sys.stderr)
+
+    try:
+        n_errors = convert_stream(source, out, errors, mode=args.mode,
+                                  round=args.round, chunk_size=args.chunk_size or 8192,
+                                  format=args.format)
+        out.flush()
+    finally:
+        for stream, std in ((source, sys.stdin), (out, sys.stdout), (errors, sys.stderr)):
+            if stream is not std:
+                stream.close()
+
+    return 1 if n_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
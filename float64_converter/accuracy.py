@@ -0,0 +1,487 @@
+"""
+accuracy.py
+
+Measures how many ULPs the math module's functions (the ones the GUI's
+expressions call) are off on this platform, over whole input ranges.
+
+For each function, inputs are drawn from its domain: log-uniform
+magnitudes over the range where the result is a normal double, plus one
+in four inputs within 2**16 ulps of hard points (where the result is
+near zero or changes regime: 1 for log, multiples of pi/2 for sin and
+cos, ±1 for asin and acos). A reference value is computed for each input
+with Decimal arithmetic at `digits` significant digits (plus guard
+digits); functions Decimal lacks are built from series (sin and cos by
+Taylor series after reduction by a high-precision pi, atan by its series
+after argument halving). The error of math.f(x) is then
+
+     (math.f(x) - reference) / ulp(reference)
+
+with ulp(reference) taken from the reference chopped to a double by
+real_to_float64, and the result counts as correctly rounded when it has
+the bits real_to_float64(reference, round=True) gives.
+
+Inputs are drawn in shards, each from its own seed, and run on a process
+pool; each shard comes back as a FunctionStudy (histogram of |error|,
+maximum, worst input) and the studies are merged. References are the
+expensive part, so with a cache directory they are saved per function in
+an .npz file (input patterns and reference strings) and only inputs not
+in it are computed: rerunning the same study costs only the math calls,
+and a larger one only its new shards.
+
+Run:
+    python -m float64_converter.accuracy --n 100000 --cache refs/
+"""
+
+import argparse
+import math
+import os
+import sys
+import zlib
+from collections import namedtuple
+from concurrent.futures import as_completed
+from decimal import Decimal, Context, localcontext, MAX_EMAX, MIN_EMIN
+from functools import lru_cache
+
+import numpy as np
+
+from .converter import real_to_float64, float64_to_real
+from .parallel import POOLS
+from . import ulp
+
+# Histogram bins of |error| in ulps; larger errors go in the last bin
+ULP_EDGES = np.linspace(0, 2, 81)
+
+DIGITS = 40
+SHARD_SIZE = 2000
+HARD_FRACTION = 0.25
+HARD_SPREAD = 2**16   # Hard-point inputs lie within this many ulps of the point
+
+_GUARD = 20           # Extra digits for the series and the final rounding
+_REDUCTION_GUARD = 80 # Digits lost when x is close to a multiple of pi/2
+_EXACT = Context(prec=1200, Emax=MAX_EMAX, Emin=MIN_EMIN)  # Exact for sums of doubles
+_XMIN = 2.0**-1022
+
+# A domain is a list of pieces (sign, low, high): inputs sign * 10**u with
+# u uniform in [low, high), one piece chosen at random per input, and the
+# hard points near which HARD_FRACTION of the inputs are placed
+Domain = namedtuple("Domain", ["pieces", "hard"])
+
+_BELOW_ONE = math.log10(1 - 2.0**-53)
+_HALF_PI = tuple(k * math.pi / 2 for k in range(1, 9))
+
+DOMAINS = {
+    "sqrt": Domain([(1, -300, 300)], (0.5, 1.0, 2.0)),
+    "cbrt": Domain([(1, -300, 300), (-1, -300, 300)], (1.0, 8.0)),
+    "exp": Domain([(1, -20, math.log10(709)), (-1, -20, math.log10(708))], (1.0,)),
+    "exp2": Domain([(1, -20, math.log10(1023)), (-1, -20, math.log10(1020))], (1.0,)),
+    "expm1": Domain([(1, -20, math.log10(709)), (-1, -20, math.log10(708))], (1.0,)),
+    "log": Domain([(1, -300, 300)], (1.0,)),
+    "log2": Domain([(1, -300, 300)], (1.0, 2.0)),
+    "log10": Domain([(1, -300, 300)], (1.0, 10.0)),
+    "log1p": Domain([(1, -20, 300), (-1, -20, _BELOW_ONE)], (1.0,)),
+    "sin": Domain([(1, -8, 15), (-1, -8, 15)], _HALF_PI),
+    "cos": Domain([(1, -8, 15), (-1, -8, 15)], _HALF_PI),
+    "tan": Domain([(1, -8, 15), (-1, -8, 15)], _HALF_PI),
+    "atan": Domain([(1, -20, 20), (-1, -20, 20)], (1.0,)),
+    "asin": Domain([(1, -20, _BELOW_ONE), (-1, -20, _BELOW_ONE)], (1.0, -1.0, 0.5)),
+    "acos": Domain([(1, -20, _BELOW_ONE), (-1, -20, _BELOW_ONE)], (1.0, -1.0, 0.5)),
+    "sinh": Domain([(1, -20, math.log10(709)), (-1, -20, math.log10(709))], (1.0,)),
+    "cosh": Domain([(1, -20, math.log10(709)), (-1, -20, math.log10(709))], (1.0,)),
+    "tanh": Domain([(1, -20, 2), (-1, -20, 2)], (1.0,)),
+}
+
+# math.cbrt and math.exp2 are new in Python 3.11
+FUNCTIONS = tuple(name for name in DOMAINS if hasattr(math, name))
+
+
+class FunctionStudy:
+    """
+    Aggregated ULP errors of one math function.
+
+    Attributes:
+        name (str): Function name.
+        count (int): Inputs measured.
+        skipped (int): Inputs whose result was not a normal double.
+        correctly_rounded (int): Results equal to the rounded reference.
+        ulp_counts (ndarray): Histogram of |error| over ULP_EDGES.
+        max_ulp, sum_ulp (float): Largest and total |error| in ulps.
+        worst (tuple): (x, math.f(x), reference str) of the largest error.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.skipped = 0
+        self.correctly_rounded = 0
+        self.ulp_counts = np.zeros(len(ULP_EDGES) - 1, dtype=np.int64)
+        self.max_ulp = 0.0
+        self.sum_ulp = 0.0
+        self.worst = None
+
+    def __repr__(self):
+        return (f"FunctionStudy({self.name}, count={self.count}, "
+                f"max {self.max_ulp:.3g} ulp, mean {self.mean_ulp():.3g} ulp)")
+
+    def mean_ulp(self):
+        """Mean |error| in ulps."""
+        return self.sum_ulp / self.count if self.count else 0.0
+
+    def add(self, x, y, reference, error, rounded):
+        """Add one measured input."""
+        error = abs(error)
+        self.count += 1
+        self.correctly_rounded += rounded
+        self.sum_ulp += error
+        index = min(int(np.searchsorted(ULP_EDGES, error, side="right")) - 1, len(self.ulp_counts) - 1)
+        self.ulp_counts[index] += 1
+        if self.worst is None or error > self.max_ulp:
+            self.max_ulp = error
+            self.worst = (x, y, reference)
+
+    def merge(self, other):
+        """Add the inputs of another study of the same function."""
+        self.count += other.count
+        self.skipped += other.skipped
+        self.correctly_rounded += other.correctly_rounded
+        self.ulp_counts += other.ulp_counts
+        self.sum_ulp += other.sum_ulp
+        if other.worst is not None and (self.worst is None or other.max_ulp > self.max_ulp):
+            self.max_ulp = other.max_ulp
+            self.worst = other.worst
+        return self
+
+
+def sample(name, n, rng):
+    """
+    Draw n inputs from a function's domain.
+
+    Returns:
+        ndarray: uint64 patterns of the inputs.
+    """
+    pieces, hard = DOMAINS[name]
+    signs, lows, highs = (np.array(column, dtype=np.float64) for column in zip(*pieces))
+    piece = rng.integers(0, len(pieces), n)
+    x = signs[piece] * 10.0 ** rng.uniform(lows[piece], highs[piece])
+    bits = x.view(np.uint64)
+
+    # Inputs near hard points, stepped a random number of ulps away
+    near = rng.random(n) < HARD_FRACTION
+    points = np.array(hard, dtype=np.float64)[rng.integers(0, len(hard), near.sum())]
+    steps = rng.integers(-HARD_SPREAD, HARD_SPREAD + 1, near.sum())
+    bits[near] = ulp.from_ordinal_array(ulp.ordinal_array(points.view(np.uint64)) + steps)
+
+    # Stepping past ±1 would leave the domains of asin and acos
+    if name in ("asin", "acos"):
+        bits[np.abs(bits.view(np.float64)) > 1] = np.float64(0.5).view(np.uint64)
+    return bits
+
+
+def reference(name, x, digits=DIGITS):
+    """
+    The value of a math function at a double, to `digits` significant digits.
+
+    Input:
+        name (str): A function in FUNCTIONS.
+        x (float): The input.
+        digits (int): Significant digits of the result.
+    Returns:
+        Decimal
+    """
+    prec = digits + _GUARD
+    with localcontext(Context(prec=prec, Emax=MAX_EMAX, Emin=MIN_EMIN)) as ctx:
+        result = _REFERENCES[name](Decimal(x), ctx)
+        ctx.prec = digits
+        return +result
+
+
+def measure(name, x, ref):
+    """
+    ULP error of math.<name>(x) against a reference value.
+
+    Returns:
+        tuple: (y, error in ulps, correctly rounded) or None if the
+        result or the reference is not a normal double.
+    """
+    y = getattr(math, name)(x)
+    if not _XMIN <= abs(y) <= sys.float_info.max or not _XMIN <= abs(ref) <= Decimal(sys.float_info.max):
+        return None
+
+    # The converters flush subnormals and saturate to inf, which the check above rules out
+    chopped = real_to_float64(ref)
+    spacing = float64_to_real(ulp.ulp(chopped), as_float=True)
+    with localcontext(_EXACT):
+        error = float((Decimal(y) - ref) / Decimal(spacing))
+    y_bits = format(int(np.float64(y).view(np.uint64)), "064b")
+    return y, error, y_bits == real_to_float64(ref, round=True)
+
+
+def run_shard(name, bits, cached, digits=DIGITS):
+    """
+    Measure one shard of inputs.
+
+    Input:
+        name (str): Function name.
+        bits (ndarray): uint64 patterns of the inputs.
+        cached (dict): Input pattern (int) -> reference string, for the
+        inputs whose reference is already known.
+        digits (int): Reference digits.
+    Returns:
+        tuple: (FunctionStudy, new) where new maps the patterns whose
+        references were computed here to their reference strings.
+    """
+    study = FunctionStudy(name)
+    new = {}
+    for p, x in zip(bits.tolist(), bits.view(np.float64).tolist()):
+        if p in cached:
+            ref = Decimal(cached[p])
+        else:
+            ref = reference(name, x, digits)
+            new[p] = str(ref)
+        result = measure(name, x, ref)
+        if result is None:
+            study.skipped += 1
+        else:
+            study.add(x, result[0], str(ref), result[1], result[2])
+    return study, new
+
+
+def characterize(functions=FUNCTIONS, n=10_000, seed=0, digits=DIGITS, workers=None,
+                 shard_size=SHARD_SIZE, cache_dir=None, backend="process", progress=None):
+    """
+    Measure the ULP errors of math functions over their domains.
+
+    Input:
+        functions (iterable of str): Names from FUNCTIONS.
+        n (int): Inputs per function.
+        seed (int): Root seed; shard i of a function always draws the same inputs.
+        digits (int): Significant digits of the references.
+        workers (int): Pool size (default: os.cpu_count()).
+        shard_size (int): Inputs per shard.
+        cache_dir (str): Directory of .npz reference caches (None: no cache).
+        backend (str): "process" or "thread".
+        progress (callable): Called with (name, FunctionStudy so far) after
+        each shard.
+    Returns:
+        dict: Function name -> FunctionStudy.
+    """
+    unknown = set(functions) - set(FUNCTIONS)
+    if unknown:
+        raise ValueError(f"Unknown functions: {sorted(unknown)}")
+    if backend not in POOLS:
+        raise ValueError(f"backend must be one of {sorted(POOLS)}")
+    workers = workers or os.cpu_count() or 1
+
+    studies = {name: FunctionStudy(name) for name in functions}
+    caches = {name: load_cache(cache_dir, name, digits) for name in functions}
+    tasks = []
+    for name in functions:
+        key = zlib.crc32(name.encode())
+        for index, start in enumerate(range(0, n, shard_size)):
+            rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(key, index)))
+            bits = sample(name, min(shard_size, n - start), rng)
+            cached = {p: caches[name][p] for p in bits.tolist() if p in caches[name]}
+            tasks.append((name, bits, cached, digits))
+
+    def finished(name, result):
+        study, new = result
+        studies[name].merge(study)
+        caches[name].update(new)
+        if progress:
+            progress(name, studies[name])
+
+    if workers == 1 or len(tasks) == 1:
+        for task in tasks:
+            finished(task[0], run_shard(*task))
+    else:
+        with POOLS[backend](max_workers=workers) as pool:
+            futures = {pool.submit(run_shard, *task): task[0] for task in tasks}
+            for future in as_completed(futures):
+                finished(futures[future], future.result())
+
+    for name in functions:
+        save_cache(cache_dir, name, digits, caches[name])
+    return studies
+
+
+def load_cache(cache_dir, name, digits):
+    """Return the cached references of a function as {pattern: str}."""
+    path = _cache_path(cache_dir, name, digits)
+    if path is None or not os.path.exists(path):
+        return {}
+    with np.load(path, allow_pickle=False) as data:
+        return dict(zip(data["bits"].tolist(), data["references"].tolist()))
+
+
+def save_cache(cache_dir, name, digits, cache):
+    """Write a function's references (atomically) if a cache directory is set."""
+    path = _cache_path(cache_dir, name, digits)
+    if path is None:
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    bits = np.fromiter(cache.keys(), dtype=np.uint64, count=len(cache))
+    references = np.array(list(cache.values()), dtype=str)
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, bits=bits, references=references)
+    os.replace(tmp, path)
+
+
+def _cache_path(cache_dir, name, digits):
+    if cache_dir is None:
+        return None
+    return os.path.join(cache_dir, f"{name}-{digits}.npz")
+
+
+# Reference functions: f(d, ctx) for the Decimal d of a double, computed
+# at ctx.prec digits (ctx also allows any exponent range)
+
+@lru_cache(maxsize=None)
+def _pi(prec):
+    """pi to prec digits, by Machin's formula."""
+    with localcontext(Context(prec=prec + 10)):
+        return +(16 * _atan_inverse(5) - 4 * _atan_inverse(239))
+
+
+def _atan_inverse(k):
+    """atan(1/k) for an integer k > 1, by its series."""
+    k2 = k * k
+    term = Decimal(1) / k
+    total, n = term, 1
+    while True:
+        term /= -k2
+        n += 2
+        new = total + term / n
+        if new == total:
+            return total
+        total = new
+
+
+def _series(first, ratio):
+    """Sum first + first*ratio(1) + ... until the terms stop changing the sum."""
+    total, term, n = first, first, 1
+    while True:
+        term *= ratio(n)
+        new = total + term
+        if new == total:
+            return total
+        total, n = new, n + 1
+
+
+def _sin_cos(d, ctx):
+    """(sin d, cos d), with d reduced by a multiple of pi/2 using enough digits of pi."""
+    prec = ctx.prec
+    extra = max(d.adjusted(), 0) + _REDUCTION_GUARD
+    with localcontext(ctx) as wide:
+        wide.prec = prec + extra
+        half_pi = _pi(wide.prec) / 2
+        k = int((d / half_pi).to_integral_value())
+        r = d - k * half_pi
+        r2 = r * r
+        sin = _series(r, lambda n: -r2 / ((2 * n) * (2 * n + 1)))
+        cos = _series(Decimal(1), lambda n: -r2 / ((2 * n - 1) * (2 * n)))
+    return [(sin, cos), (cos, -sin), (-sin, -cos), (-cos, sin)][k % 4]
+
+
+def _atan(d, ctx):
+    if d < 0:
+        return -_atan(-d, ctx)
+    if d > 1:
+        return _pi(ctx.prec) / 2 - _atan(1 / d, ctx)
+    # atan(z) = 2 atan(z / (1 + sqrt(1 + z^2))), three times, then the series
+    z = d
+    for _ in range(3):
+        z = z / (1 + (1 + z * z).sqrt())
+    z2 = z * z
+    total, term, n = z, z, 1
+    while True:
+        term *= -z2
+        n += 2
+        new = total + term / n
+        if new == total:
+            return 8 * total
+        total = new
+
+
+def _with_extra_digits(d, ctx, func):
+    """Evaluate func with more digits when |d| < 1, to cover cancellation."""
+    with localcontext(ctx) as wide:
+        wide.prec = ctx.prec + max(-d.adjusted(), 0)
+        return func()
+
+
+def _ln2():
+    return Decimal(2).ln()
+
+
+def _cbrt(d, ctx):
+    if d < 0:
+        return -_cbrt(-d, ctx)
+    y = (d.ln() / 3).exp()
+    return y - (y * y * y - d) / (3 * y * y)  # One Newton step
+
+
+def _asin(d, ctx):
+    if abs(d) <= Decimal("0.5"):
+        return _atan(d / (1 - d * d).sqrt(), ctx)
+    with localcontext(_EXACT):
+        half_gap = (1 - abs(d)) / 2
+    result = _pi(ctx.prec) / 2 - 2 * _asin(half_gap.sqrt(), ctx)
+    return result.copy_sign(d)
+
+
+def _acos(d, ctx):
+    if d == -1:
+        return _pi(ctx.prec)
+    with localcontext(_EXACT):
+        low, high = 1 - d, 1 + d
+    return 2 * _atan((low / high).sqrt(), ctx)
+
+
+_REFERENCES = {
+    "sqrt": lambda d, ctx: d.sqrt(),
+    "cbrt": _cbrt,
+    "exp": lambda d, ctx: d.exp(),
+    "exp2": lambda d, ctx: (d * _ln2()).exp(),
+    "expm1": lambda d, ctx: _with_extra_digits(d, ctx, lambda: d.exp() - 1),
+    "log": lambda d, ctx: d.ln(),
+    "log2": lambda d, ctx: d.ln() / _ln2(),
+    "log10": lambda d, ctx: d.log10(),
+    "log1p": lambda d, ctx: _EXACT.add(1, d).ln(),
+    "sin": lambda d, ctx: _sin_cos(d, ctx)[0],
+    "cos": lambda d, ctx: _sin_cos(d, ctx)[1],
+    "tan": lambda d, ctx: (lambda s, c: s / c)(*_sin_cos(d, ctx)),
+    "atan": _atan,
+    "asin": _asin,
+    "acos": _acos,
+    "sinh": lambda d, ctx: _with_extra_digits(d, ctx, lambda: (d.exp() - (-d).exp()) / 2),
+    "cosh": lambda d, ctx: (d.exp() + (-d).exp()) / 2,
+    "tanh": lambda d, ctx: _with_extra_digits(d, ctx, lambda: (lambda e: (e - 1) / (e + 1))((2 * d).exp())),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m float64_converter.accuracy",
+        description="Measure the ULP errors of math module functions against high-precision references.")
+    parser.add_argument("functions", nargs="*", default=list(FUNCTIONS),
+                        help=f"functions to measure (default: all of {', '.join(FUNCTIONS)})")
+    parser.add_argument("--n", type=int, default=10_000, help="inputs per function (default: 10000)")
+    parser.add_argument("--seed", type=int, default=0, help="root seed (default: 0)")
+    parser.add_argument("--digits", type=int, default=DIGITS,
+                        help=f"significant digits of the references (default: {DIGITS})")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--cache", default=None, help="directory for cached references")
+    args = parser.parse_args(argv)
+
+    studies = characterize(args.functions, args.n, args.seed, args.digits, args.workers,
+                           cache_dir=args.cache)
+    print(f"{'function':<8} {'inputs':>8} {'rounded':>8} {'mean ulp':>9} {'max ulp':>8}  worst input")
+    for study in studies.values():
+        rounded = study.correctly_rounded / study.count if study.count else 0.0
+        worst = repr(study.worst[0]) if study.worst else ""
+        print(f"{study.name:<8} {study.count:>8} {rounded:>8.2%} {study.mean_ulp():>9.4f} "
+              f"{study.max_ulp:>8.4f}  {worst}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+analysis.py
+
+Large-scale study of the errors made by chopping and rounding real
+numbers to 64-bit doubles, computed with NumPy in batches.
+
+A sample is a real number held exactly as a pair of doubles:
+
+     x = sign * (a + t * ulp(a))      with a >= 0 a double and 0 <= t < 1
+
+so a is x chopped to a double and t is the part cut off, in units of
+ulp(a). The chopped and rounded results then follow directly, with the
+same policy as real_to_float64 (ties to even, values below the smallest
+normal flushed to zero, rounding past the largest double gives inf), and
+the errors come out without any Decimal arithmetic:
+- ULP error: t when chopping, min(t, 1 - t) when rounding (exact)
+- Absolute error: ULP error * ulp(a) (exact, a power-of-two scaling,
+  unless it falls in the subnormal range)
+- Relative error: ULP error / (a / ulp(a) + t) (correct to about one ulp)
+
+Samples are drawn in shards, each from its own child of one
+SeedSequence, so a study draws the same samples (and gives the same
+histograms and maxima) for any number of workers. Every shard is reduced
+to fixed-bin histograms and a few totals (an ErrorStudy), and only these
+are sent back and merged.
+
+Distributions:
+    uniform     : a uniform in [low, high]
+    log-uniform : |x| = 10**u with u uniform in [low, high], random sign
+    near-ties   : log-uniform magnitudes with t within 2**-40 of 1/2,
+                  one in eight exactly 1/2
+"""
+
+import os
+from concurrent.futures import as_completed
+from decimal import Decimal, localcontext
+from functools import partial
+
+import numpy as np
+
+from .parallel import POOLS
+
+MODES = ("chop", "round")
+
+# Default ranges; low and high are values for "uniform" and powers of ten otherwise
+DISTRIBUTIONS = {
+    "uniform": (-1.0, 1.0),
+    "log-uniform": (-300.0, 300.0),
+    "near-ties": (-300.0, 300.0),
+}
+
+# Histogram bins: log10 of the relative error, and the ULP error
+REL_EDGES = np.linspace(-20, -15, 251)
+ULP_EDGES = np.linspace(0, 1, 101)
+
+SHARD_SIZE = 1_000_000
+CHUNK_SIZE = 250_000
+XMIN = np.finfo(np.float64).tiny
+XMAX = np.finfo(np.float64).max
+
+_TIE_WIDTH = 2.0**-40
+
+
+class ErrorStudy:
+    """
+    Aggregated chop and round errors of a set of samples.
+
+    Attributes:
+        count (int): Number of samples.
+        rel_counts, ulp_counts (dict): Per mode, histogram counts over
+        REL_EDGES (log10 relative error) and ULP_EDGES. Values outside the
+        range are counted in the first or last bin.
+        max_abs, max_rel, max_ulp, sum_rel (dict): Per mode, largest
+        absolute, relative and ULP errors, and the sum of relative errors.
+        worst (dict): Per mode, the (a, t, sign) sample with the largest
+        relative error.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.rel_counts = {mode: np.zeros(len(REL_EDGES) - 1, dtype=np.int64) for mode in MODES}
+        self.ulp_counts = {mode: np.zeros(len(ULP_EDGES) - 1, dtype=np.int64) for mode in MODES}
+        self.max_abs = dict.fromkeys(MODES, 0.0)
+        self.max_rel = dict.fromkeys(MODES, 0.0)
+        self.max_ulp = dict.fromkeys(MODES, 0.0)
+        self.sum_rel = dict.fromkeys(MODES, 0.0)
+        self.worst = dict.fromkeys(MODES)
+
+    def __repr__(self):
+        means = ", ".join(f"{mode}={self.mean_rel(mode):.3g}" for mode in MODES)
+        return f"ErrorStudy(count={self.count}, mean relative error: {means})"
+
+    def mean_rel(self, mode):
+        """Mean relative error of a mode."""
+        return self.sum_rel[mode] / self.count if self.count else 0.0
+
+    def add(self, a, t, sign):
+        """Add the errors of a batch of samples."""
+        self.count += len(a)
+        for mode, (abs_err, rel_err, ulp_err) in errors(a, t, sign).items():
+            with np.errstate(divide="ignore"):
+                log_rel = np.log10(rel_err)
+            self.rel_counts[mode] += _histogram(log_rel, REL_EDGES)
+            self.ulp_counts[mode] += _histogram(ulp_err, ULP_EDGES)
+            self.max_abs[mode] = max(self.max_abs[mode], float(abs_err.max(initial=0.0)))
+            self.max_ulp[mode] = max(self.max_ulp[mode], float(ulp_err.max(initial=0.0)))
+            self.sum_rel[mode] += float(rel_err.sum())
+            if len(a):
+                i = int(rel_err.argmax())
+                if rel_err[i] >= self.max_rel[mode]:
+                    self.max_rel[mode] = float(rel_err[i])
+                    self.worst[mode] = (float(a[i]), float(t[i]), float(sign[i]))
+
+    def merge(self, other):
+        """Add the samples of another study into this one."""
+        self.count += other.count
+        for mode in MODES:
+            self.rel_counts[mode] += other.rel_counts[mode]
+            self.ulp_counts[mode] += other.ulp_counts[mode]
+            self.max_abs[mode] = max(self.max_abs[mode], other.max_abs[mode])
+            self.max_ulp[mode] = max(self.max_ulp[mode], other.max_ulp[mode])
+            self.sum_rel[mode] += other.sum_rel[mode]
+            if other.max_rel[mode] >= self.max_rel[mode] and other.worst[mode] is not None:
+                self.max_rel[mode] = other.max_rel[mode]
+                self.worst[mode] = other.worst[mode]
+        return self
+
+
+def sample(distribution, n, rng, low=None, high=None):
+    """
+    Draw n samples.
+
+    Input:
+        distribution (str): "uniform", "log-uniform" or "near-ties".
+        n (int): Number of samples.
+        rng (numpy.random.Generator): Random source.
+        low, high (float): Range (default: DISTRIBUTIONS[distribution]).
+    Returns:
+        tuple: (a, t, sign) float64 arrays, x = sign * (a + t * ulp(a)).
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"distribution must be one of {sorted(DISTRIBUTIONS)}")
+    default_low, default_high = DISTRIBUTIONS[distribution]
+    low = default_low if low is None else low
+    high = default_high if high is None else high
+
+    if distribution == "uniform":
+        x = rng.uniform(low, high, n)
+        sign = np.where(np.signbit(x), -1.0, 1.0)
+        a = np.abs(x)
+        t = rng.random(n)
+    else:
+        a = 10.0 ** rng.uniform(low, high, n)
+        sign = np.where(rng.random(n) < 0.5, -1.0, 1.0)
+        if distribution == "log-uniform":
+            t = rng.random(n)
+        else:
+            t = 0.5 + rng.uniform(-_TIE_WIDTH, _TIE_WIDTH, n)
+            t[rng.random(n) < 0.125] = 0.5
+    return a, t, sign
+
+
+def errors(a, t, sign, rest=None):
+    """
+    Exact errors of chopping and rounding the samples x = sign * (a + t * ulp(a)).
+
+    Input:
+        a, t, sign (ndarray): Samples as returned by sample().
+        rest (ndarray): 1 - t correctly rounded, for t too close to 1 for
+        1.0 - t to keep its digits (default: 1.0 - t).
+    Returns:
+        dict: Per mode ("chop", "round"), a tuple of float64 arrays
+        (absolute error, relative error, ULP error).
+    """
+    ulp = _ulp(a)
+    # |x| in units of ulp(a); a / ulp(a) is exact
+    scaled = a / ulp + t
+
+    result = {}
+    for mode in MODES:
+        if mode == "chop":
+            ulp_err = t.copy()
+        else:
+            # Ties go to the even neighbour: up when a's last bit is 1
+            odd = (a.view(np.uint64) & np.uint64(1)).astype(bool)
+            up = (t > 0.5) | ((t == 0.5) & odd)
+            ulp_err = np.where(up, 1.0 - t if rest is None else rest, t)
+            # Rounding up from the largest double gives inf
+            ulp_err[up & (a == XMAX)] = np.inf
+
+        # Below the smallest normal the converter flushes to zero
+        flushed = a < XMIN
+        ulp_err[flushed] = scaled[flushed]
+
+        abs_err = ulp_err * ulp
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rel_err = np.where(scaled > 0, ulp_err / scaled, 0.0)
+        result[mode] = (abs_err, rel_err, ulp_err)
+    return result
+
+
+def to_decimal(a, t, sign):
+    """The exact value of one sample as a Decimal."""
+    with localcontext() as ctx:
+        ctx.prec = 1200  # Enough for any sum of two doubles
+        return Decimal(sign) * (Decimal(a) + Decimal(t) * Decimal(float(_ulp(np.float64(a)))))
+
+
+def run_shard(distribution, n, seed, low=None, high=None, chunk_size=CHUNK_SIZE):
+    """
+    Study n samples drawn from one seed, chunk by chunk.
+
+    Input:
+        seed (numpy.random.SeedSequence or int): Seed of this shard.
+    Returns:
+        ErrorStudy
+    """
+    rng = np.random.default_rng(seed)
+    study = ErrorStudy()
+    for start in range(0, n, chunk_size):
+        study.add(*sample(distribution, min(chunk_size, n - start), rng, low, high))
+    return study
+
+
+def iter_study(n, distribution="log-uniform", low=None, high=None, seed=0,
+               workers=None, shard_size=SHARD_SIZE, backend="process"):
+    """
+    Run a study of n samples in shards across a pool, yielding the merged
+    ErrorStudy after each shard completes (for progress and live plots).
+
+    Input:
+        n (int): Number of samples.
+        distribution (str), low, high: See sample().
+        seed (int): Root seed; the result does not depend on workers.
+        workers (int): Number of workers (default: os.cpu_count()).
+        shard_size (int): Samples per shard.
+        backend (str): "process" or "thread".
+    Yields:
+        ErrorStudy: The study of all shards completed so far.
+    """
+    if backend not in POOLS:
+        raise ValueError(f"backend must be one of {sorted(POOLS)}")
+
+    sizes = [min(shard_size, n - start) for start in range(0, n, shard_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    shard = partial(run_shard, distribution, low=low, high=high)
+    workers = workers or os.cpu_count() or 1
+
+    study = ErrorStudy()
+    if workers == 1 or len(sizes) == 1:
+        for size, shard_seed in zip(sizes, seeds):
+            yield study.merge(shard(size, shard_seed))
+        return
+
+    with POOLS[backend](max_workers=workers) as pool:
+        futures = [pool.submit(shard, size, shard_seed) for size, shard_seed in zip(sizes, seeds)]
+        for future in as_completed(futures):
+            yield study.merge(future.result())
+
+
+def run_study(n, distribution="log-uniform", **kwargs):
+    """Run a study (see iter_study) and return the final ErrorStudy."""
+    study = ErrorStudy()
+    for study in iter_study(n, distribution, **kwargs):
+        pass
+    return study
+
+
+def _ulp(a):
+    """Spacing of the doubles at a >= 0 (np.spacing overflows at the largest double)."""
+    e = np.frexp(a)[1] - 53
+    return np.where(a < XMIN, 2.0**-1074, np.ldexp(1.0, e))
+
+
+def _histogram(values, edges):
+    """Counts over edges, with out-of-range values in the end bins and NaN dropped."""
+    values = values[~np.isnan(values)]
+    index = np.searchsorted(edges, values, side="right") - 1
+    np.clip(index, 0, len(edges) - 2, out=index)
+    return np.bincount(index, minlength=len(edges) - 1)
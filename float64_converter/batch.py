@@ -0,0 +1,286 @@
+"""
+batch.py
+
+Vectorized versions of the converter functions for NumPy arrays.
+
+The arrays are reinterpreted as uint64 bit patterns and processed in one
+pass with NumPy, so no Python object is created per element. Results
+follow the same rules as the scalar functions in converter.py:
+- NaN is always encoded as the single quiet NaN pattern
+- Subnormals are chopped to a signed zero when encoding
+- Both zero patterns decode to 0.0
+
+float64_to_str_array() formats patterns as shortest round-trip or exact
+decimal strings, like float64_to_str.
+
+chop() rounds whole float64 arrays to the values of a lower-precision
+format, in the manner of MATLAB's chop.
+
+"""
+
+import math
+from decimal import Decimal
+from functools import lru_cache
+
+import numpy as np
+
+from .formats import BINARY16
+from .rounding import RoundingMode, resolve, mix, GAMMA, UNIFORM_BITS
+
+SIGN_MASK = np.uint64(0x8000000000000000)
+EXPONENT_MASK = np.uint64(0x7FF0000000000000)
+FRACTION_MASK = np.uint64(0x000FFFFFFFFFFFFF)
+QUIET_NAN = np.uint64(0x7FF8000000000000)
+
+_INTEGER_ROUNDING = {
+    RoundingMode.NEAREST_EVEN: np.rint,
+    RoundingMode.TOWARD_ZERO: np.trunc,
+    RoundingMode.TOWARD_POSITIVE: np.ceil,
+    RoundingMode.TOWARD_NEGATIVE: np.floor,
+}
+# Values per block of chop() (its few temporary arrays fit in L2)
+CHOP_BLOCK = 1 << 14
+_MASK64 = (1 << 64) - 1
+
+
+def real_to_float64_array(x, round=False, packed=False):
+    """
+    Convert an array of doubles to their 64-bit IEEE 754 representations.
+
+    Input:
+        x (ndarray): float64 values (other float dtypes are widened exactly),
+        or a uint64 array of raw bit patterns.
+        round (boolean): Accepted for symmetry with real_to_float64. Doubles
+        are exact, so chopping and rounding give the same bits.
+        packed (boolean): Return the patterns as a uint64 array instead of
+        an S64 array of bit strings.
+    Returns:
+        ndarray: S64 bit strings (or uint64 patterns) with the shape of x.
+    """
+    bits = _as_bits(x)
+
+    exponent = bits & EXPONENT_MASK
+    fraction = bits & FRACTION_MASK
+
+    # Zero or underflow to zero: keep only the sign
+    out = np.where(exponent == 0, bits & SIGN_MASK, bits)
+    # NaN: one quiet NaN pattern
+    out[(exponent == EXPONENT_MASK) & (fraction != 0)] = QUIET_NAN
+
+    if packed:
+        return out
+    return bits_to_strings(out)
+
+
+def float64_to_real_array(sixtyfour_bits):
+    """
+    Convert an array of 64-bit binary strings back to float64 values.
+
+    Input:
+        sixtyfour_bits (ndarray): S64 or U64 array of '0'/'1' strings.
+    Returns:
+        ndarray: float64 values with the shape of the input.
+    """
+    bits = strings_to_bits(sixtyfour_bits)
+    x = bits.view(np.float64)
+
+    # Both zeros decode to 0.0 and every NaN to a plain NaN
+    x = np.where(bits & ~SIGN_MASK == 0, 0.0, x)
+    x[np.isnan(x)] = np.nan
+    return x
+
+
+def float64_to_str_array(sixtyfour_bits, exact=False):
+    """
+    Format an array of 64-bit patterns as decimal strings, as
+    float64_to_str does: the shortest string that reads back to the same
+    bits, or the exact expansion of the value with exact=True.
+
+    Input:
+        sixtyfour_bits (ndarray): S64 or U64 array of '0'/'1' strings, or
+        uint64 patterns.
+        exact (boolean): Format the exact expansions.
+    Returns:
+        ndarray: str array with the shape of the input.
+    """
+    bits = np.asarray(sixtyfour_bits)
+    if bits.dtype != np.uint64:
+        bits = strings_to_bits(bits)
+    shape = bits.shape
+    values = np.ascontiguousarray(bits).view(np.float64).reshape(-1).tolist()
+
+    # float.__repr__ is the shortest round-trip form (and measures faster
+    # than numpy's astype(str), which gives the same strings)
+    if exact:
+        strings = [str(Decimal(v)) if math.isfinite(v) else repr(v) for v in values]
+    else:
+        strings = list(map(repr, values))
+    return np.array(strings, dtype=str).reshape(shape)
+
+
+def chop(x, fmt=BINARY16, mode="round", subnormal=True, seed=0, offset=0):
+    """
+    Round every element of an array to a value representable in a
+    lower-precision format, returned as float64. This emulates arithmetic
+    in fmt one operation at a time.
+
+    Same rules as real_to_bits: values whose exponent is above emax, or that
+    round up past xmax, become infinities; NaN and infinities pass through.
+
+    Input:
+        x (ndarray): float64 values (other float dtypes are widened exactly).
+        fmt (FloatFormat): Target format, e.g. BINARY16, BFLOAT16, BINARY32.
+        mode (RoundingMode or str): "round" (to nearest, ties to even),
+        "chop" (toward zero), "up", "down", "away" (to nearest, ties away
+        from zero) or "stochastic"; see rounding.py.
+        subnormal (boolean): Round to the subnormal grid below xmin if True,
+        or chop those values to a signed zero if False.
+        seed (int): Seed of stochastic rounding.
+        offset (int): Position of x[0] (in C order) in the whole computation,
+        so that chop(x[i:j], offset=i) is chop(x)[i:j] for any chunking.
+    Returns:
+        ndarray: float64 array with the shape of x.
+    """
+    mode = resolve(mode)
+    x = np.asarray(x, dtype=np.float64)
+    out = np.empty(x.shape)
+
+    # Work through blocks that stay in cache: the ten or so passes over
+    # each block then cost about one pass over memory
+    flat_x, flat_out = x.reshape(-1), out.reshape(-1)
+    for start in range(0, len(flat_x), CHOP_BLOCK):
+        block = slice(start, start + CHOP_BLOCK)
+        _chop_block(flat_x[block], flat_out[block], fmt, mode, subnormal, seed, offset + start)
+    return out
+
+
+def _chop_block(x, out, fmt, mode, subnormal, seed, offset):
+    """chop() of a 1-D block of values into out."""
+    t = fmt.fraction_bits
+
+    # Exponent of the leading bit: |x| = 2^e * fpart with 1 <= fpart < 2
+    e = np.frexp(x)[1]
+    e -= 1
+    if subnormal:
+        # Subnormals share the exponent emin (fixed spacing 2^(emin-t))
+        np.maximum(e, fmt.emin, out=e)
+
+    # Scale so the last kept bit is the units digit, round, scale back.
+    # ldexp by powers of two is exact.
+    with np.errstate(invalid="ignore"):  # NaN and infinities pass through
+        y = np.ldexp(x, t - e, out=out)
+        if mode in _INTEGER_ROUNDING:
+            _INTEGER_ROUNDING[mode](y, out=y)
+        else:
+            r = np.trunc(y)
+            # Part cut off (NaN for infinities, which then pass through)
+            np.subtract(y, r, out=y)
+            np.abs(y, out=y)
+            if mode is RoundingMode.NEAREST_AWAY:
+                np.greater_equal(y, 0.5, out=y, casting="unsafe")
+            else:
+                # Stochastic: up when u < the part cut off
+                np.greater(y, _uniform(seed, offset, len(y)), out=y, casting="unsafe")
+            np.copysign(y, r, out=y)  # 1.0 where rounding up, signed as x
+            y += r
+    np.ldexp(y, e - t, out=y)
+
+    with np.errstate(invalid="ignore"):
+        if not subnormal:
+            y[np.abs(x) < fmt.xmin] = 0.0
+            np.copysign(y, x, out=y)
+        overflow = np.abs(y) > fmt.xmax
+    y[overflow] = np.copysign(np.inf, x[overflow])
+
+
+def random_bits_array(seed, start, n):
+    """
+    Vectorized rounding.random_bits(seed, index) for index in [start, start + n).
+
+    Returns:
+        ndarray: uint64 random bits.
+    """
+    # z = mix(seed) + (start + i + 1) * GAMMA, all modulo 2^64
+    z = _steps(n) + np.uint64((mix(seed) + start * GAMMA) & _MASK64)
+    # splitmix64's output function, in place with one scratch array
+    tmp = np.empty_like(z)
+    for shift, multiplier in ((30, 0xBF58476D1CE4E5B9), (27, 0x94D049BB133111EB), (31, None)):
+        np.right_shift(z, np.uint64(shift), out=tmp)
+        z ^= tmp
+        if multiplier:
+            z *= np.uint64(multiplier)
+    return z
+
+
+@lru_cache(maxsize=8)
+def _steps(n):
+    """(i + 1) * GAMMA modulo 2^64 for i in [0, n), read-only."""
+    steps = np.arange(1, n + 1, dtype=np.uint64) * np.uint64(GAMMA)
+    steps.flags.writeable = False
+    return steps
+
+
+def _uniform(seed, start, n):
+    """Uniform doubles k * 2^-53 from the top 53 random bits of positions [start, start + n)."""
+    z = random_bits_array(seed, start, n)
+    z >>= np.uint64(64 - UNIFORM_BITS)
+    u = z.view(np.int64).astype(np.float64)  # Exact below 2^53
+    u *= 2.0**-UNIFORM_BITS
+    return u
+
+
+def bits_to_strings(bits):
+    """
+    Format uint64 bit patterns as an S64 array of '0'/'1' strings.
+
+    Input:
+        bits (ndarray): uint64 patterns.
+    Returns:
+        ndarray: S64 array with the shape of bits.
+    """
+    bits = np.asarray(bits, dtype=np.uint64)
+    shape = bits.shape
+
+    # Big-endian bytes put the sign bit first
+    octets = bits.reshape(-1).astype('>u8').view(np.uint8).reshape(-1, 8)
+    digits = np.unpackbits(octets, axis=1)
+    digits += ord('0')
+    return digits.view('S64').reshape(shape)
+
+
+def strings_to_bits(sixtyfour_bits):
+    """
+    Parse an S64 or U64 array of '0'/'1' strings into uint64 patterns.
+
+    Input:
+        sixtyfour_bits (ndarray): Array of 64-bit binary strings.
+    Returns:
+        ndarray: uint64 patterns with the shape of the input.
+    """
+    strings = np.ascontiguousarray(sixtyfour_bits)
+    shape = strings.shape
+
+    if strings.dtype == np.dtype('S64'):
+        codes = strings.reshape(-1).view(np.uint8)
+    elif strings.dtype == np.dtype('U64'):
+        codes = strings.reshape(-1).view(np.uint32)
+    else:
+        raise ValueError("Input must be an S64 or U64 array of 64-bit binary strings")
+
+    digits = (codes - ord('0')).reshape(-1, 64)
+    if (digits > 1).any():
+        raise ValueError("Input must be an array of 64-bit binary strings")
+
+    octets = np.packbits(digits.astype(np.uint8), axis=1)
+    return octets.view('>u8').astype(np.uint64).reshape(shape)
+
+
+def _as_bits(x):
+    """Return x as uint64 bit patterns, reinterpreting doubles without a copy."""
+    x = np.asarray(x)
+
+    if x.dtype == np.uint64:
+        return x
+    if x.dtype.kind != 'f':
+        raise TypeError("Input must be a float or uint64 array.")
+    return np.ascontiguousarray(x, dtype=np.float64).view(np.uint64)
@@ -0,0 +1,125 @@
+"""
+cache.py
+
+Opt-in memoization of the converter functions, for workloads that convert
+the same constants over and over.
+
+Each cache is a bounded LRU keyed on the input, its type and the
+conversion options. Keys are normalized so that 0.0 and -0.0 stay
+distinct and every NaN finds its cached entry. Caches are safe to share
+between threads.
+
+Usage:
+    from float64_converter import cache
+    bits = cache.real_to_float64(0.1, round=True)
+    cache.real_to_float64.cache_info()
+"""
+
+import threading
+from collections import OrderedDict, namedtuple
+from decimal import Decimal
+
+from . import converter
+from .rounding import RoundingMode, resolve
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+DEFAULT_MAXSIZE = 4096
+
+
+class ConversionCache:
+    """
+    A bounded, thread-safe LRU cache around one conversion function,
+    with cache_info() and cache_clear() in the style of functools.lru_cache.
+
+    Input:
+        func (callable): Conversion function to wrap.
+        make_key (callable): Builds the cache key from func's arguments, or
+        returns None for arguments that should not be cached.
+        maxsize (int): Maximum number of entries kept.
+    """
+
+    def __init__(self, func, make_key, maxsize=DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.__wrapped__ = func
+        self.__doc__ = func.__doc__
+        self._make_key = make_key
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __call__(self, *args, **kwargs):
+        key = self._make_key(*args, **kwargs)
+        if key is None:
+            return self.__wrapped__(*args, **kwargs)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+
+        # Convert outside the lock so other threads are not held up
+        result = self.__wrapped__(*args, **kwargs)
+
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def cache_info(self):
+        """Return hits, misses, maxsize and currsize as a CacheInfo tuple."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._maxsize, len(self._entries))
+
+    def cache_clear(self):
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+
+def _encode_key(x, round=False, seed=0, index=0):
+    """Key for real_to_float64: input type, normalized value, rounding mode."""
+    round = resolve(round)
+    if round is RoundingMode.STOCHASTIC:
+        return None  # Each (seed, index) draws its own rounding
+    if isinstance(x, float):
+        # The bit pattern separates 0.0 from -0.0 and is equal for equal NaNs
+        return (float, converter._UINT64.unpack(converter._DOUBLE.pack(x))[0], round)
+    if isinstance(x, Decimal):
+        if x.is_nan():
+            return (Decimal, "NaN", round)
+        return (Decimal, x.is_signed(), x, round)
+    if isinstance(x, (str, int)):
+        return (type(x), x, round)
+    return None
+
+
+def _decode_key(sixtyfour_bits, as_float=False, as_int=False):
+    """Key for float64_to_real: the bit string and the return mode."""
+    if not isinstance(sixtyfour_bits, str):
+        return None
+    return (sixtyfour_bits, bool(as_float), bool(as_int))
+
+
+def cached_real_to_float64(maxsize=DEFAULT_MAXSIZE):
+    """Return a new LRU-cached real_to_float64 holding up to maxsize results."""
+    return ConversionCache(converter.real_to_float64, _encode_key, maxsize)
+
+
+def cached_float64_to_real(maxsize=DEFAULT_MAXSIZE):
+    """Return a new LRU-cached float64_to_real holding up to maxsize results."""
+    return ConversionCache(converter.float64_to_real, _decode_key, maxsize)
+
+
+# Shared default caches
+real_to_float64 = cached_real_to_float64()
+float64_to_real = cached_float64_to_real()
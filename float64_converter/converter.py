@@ -8,120 +8,454 @@ Includes two conversion styles:
 - Chopping 
 - Rounding
 
+and, through the RoundingMode of rounding.py, rounding toward +inf or
+-inf, to nearest with ties away from zero, and stochastic rounding.
+
+The same engine encodes and decodes other binary formats (binary16,
+bfloat16, binary32, custom widths) through real_to_bits and bits_to_real,
+parameterized by a FloatFormat descriptor from formats.py.
+
 """
 
 import math
-from decimal import Decimal, getcontext, ROUND_DOWN, ROUND_HALF_EVEN
+import struct
+from decimal import Decimal, Context, localcontext
+
+from . import instrument
+from .formats import BINARY64
+from .rounding import (NEAREST_EVEN, TOWARD_ZERO, TOWARD_POSITIVE, TOWARD_NEGATIVE, STOCHASTIC,
+                       resolve, round_up, random_bits, UNIFORM_BITS)
+
+# Working precision of every Decimal conversion. It is applied through a
+# local context per call, so the caller's (thread-local) Decimal context is
+# neither read nor changed and results do not depend on it.
+DECIMAL_CONTEXT = Context(prec=70)
+
+# Big-endian views of the same 8 bytes as a double and as an unsigned int
+_DOUBLE = struct.Struct('>d')
+_UINT64 = struct.Struct('>Q')
 
-getcontext().prec = 70
+_LOG10_2 = math.log10(2)
 
+# Range of float() results taken by the str fast path, and the longest
+# literal it parses (int() refuses more than 4300 digits)
+_FAST_MIN = 2.0**-1021
+_FAST_MAX = 2.0**1023
+_MAX_FAST_LENGTH = 4000
 
+# Modes the str fast path handles, and the modes that may round a
+# magnitude up to the smallest subnormal
+_STR_MODES = (NEAREST_EVEN, TOWARD_ZERO)
+_UP_MODES = (TOWARD_POSITIVE, TOWARD_NEGATIVE, STOCHASTIC)
 
-def real_to_float64(x , round=False):
+# Exact powers of ten for the decimal exponents of in-range values
+_POW10 = [10**k for k in range(400)]
+
+# Powers of two 2^e for every exponent e in -1074..1023, computed once at
+# the working precision
+with localcontext(DECIMAL_CONTEXT):
+    _POW2 = [Decimal(2) ** e for e in range(-1074, 1024)]
+
+
+def real_to_float64(x , round=False, seed=0, index=0):
     """
-    Convert a real number (str, Decimal, or float) to 64-bit IEEE 754 using the formula: 
+    Convert a real number (str, Decimal, int, or float) to 64-bit IEEE 754
     using the formula:
     
      x =  (-1)^s * 2^(c-1023) * (f+1)
+
+    Floats already are doubles, so their bits are read directly, and ints are
+    scaled with exact integer arithmetic. Decimal literals in str inputs are
+    parsed by float() and, when chopping, checked against the exact value
+    (see _str_bits); other str inputs and Decimals go through the Decimal
+    engine. All paths give the same bits.
     
     Input:
-        x (str, Decimal, or float): Real number to convert.
+        x (str, Decimal, int, or float): Real number to convert.
         round (boolean): A Boolean indicating whether to round the 64th bit if True
-        or chop after the 64th bit if False.
+        or chop after the 64th bit if False, or a RoundingMode.
+        seed, index (int): Key of the random number of RoundingMode.STOCHASTIC
+        (see rounding.py); index is the position of x in a computation.
     Returns:
         str: 64-bit binary string representation.
     """
-    # 1. Convert input to Decimal for high-precision internal math
+    if instrument.enabled and not instrument.active():
+        return instrument.traced("encode", real_to_float64, x, round, seed, index)
+
+    # Fast path: a float is exact as it stands (chop and round agree)
+    if isinstance(x, float):
+        bits = _float_bits(x)
+        if instrument.enabled:
+            instrument.lap("fast_path")
+        return bits
+    mode = resolve(round)
+    if isinstance(x, str) and mode in _STR_MODES:
+        bits = _str_bits(x, mode is NEAREST_EVEN)
+        if bits is not None:
+            return bits
+    return _encode(x, mode, BINARY64, False, seed, index)
+
+
+def real_to_bits(x, fmt=BINARY64, round=False, subnormal=True, seed=0, index=0):
+    """
+    Convert a real number (str, Decimal, int, or float) to the bit string of
+    any binary floating-point format using the formula:
+
+     x =  (-1)^s * 2^(c-bias) * (f+1)
+
+    Input:
+        x (str, Decimal, int, or float): Real number to convert.
+        fmt (FloatFormat): Target format (default: binary64).
+        round (boolean): Round to nearest (ties to even) if True, chop if False,
+        or a RoundingMode.
+        subnormal (boolean): Produce subnormal numbers below the normal range
+        if True, or chop them to a signed zero (as real_to_float64 does) if False.
+        seed, index (int): Key of the random number of RoundingMode.STOCHASTIC.
+    Returns:
+        str: fmt.width-bit binary string representation.
+    """
+    if instrument.enabled and not instrument.active():
+        return instrument.traced("encode", real_to_bits, x, fmt, round, subnormal, seed, index)
+    return _encode(x, resolve(round), fmt, subnormal, seed, index)
+
+
+def _encode(x, mode, fmt, subnormal, seed=0, index=0):
+    """Encoding engine shared by real_to_float64 and real_to_bits."""
+    e, f = fmt.exponent_bits, fmt.fraction_bits
+
+    # 1. Convert input to exact integers num / den, or Decimal for str input
+    # (the rest of the engine is exact integer work that needs no context)
     if isinstance(x, str):
-        x = Decimal(x)
-    elif isinstance(x, (float, int)):
-        # Convert float to Decimal using its exact string representation
-        # to avoid double rounding errors on input.
-        x = Decimal.from_float(x)
-    elif isinstance(x, Decimal):
-        x = x
-    else:
+        with localcontext(DECIMAL_CONTEXT):
+            x = Decimal(x)
+    elif isinstance(x, float):
+        if x != x:
+            x = Decimal('NaN')
+        elif x in (math.inf, -math.inf) or x == 0:
+            x = Decimal(x)
+        else:
+            s = 1 if x < 0 else 0
+            num, den = abs(x).as_integer_ratio()
+            if instrument.enabled:
+                instrument.lap("widening")
+            return _pack(s, *_normalize(num, den, mode, fmt, subnormal, s, seed, index), fmt)
+    elif isinstance(x, int):
+        s = 1 if x < 0 else 0
+        x = abs(x)
+        if x == 0:
+            if instrument.enabled:
+                instrument.count("special_zero")
+            return "0"*fmt.width
+        # |x| >= 2^(emax+1) gives c >= max_exponent
+        if x.bit_length() > fmt.emax + 1:  # Overflow to infinity
+            if instrument.enabled:
+                instrument.count("overflow")
+            return f"{s}" + '1'*e + '0'*f
+        if instrument.enabled:
+            instrument.lap("widening")
+        return _pack(s, *_normalize(x, 1, mode, fmt, subnormal, s, seed, index), fmt)
+    elif not isinstance(x, Decimal):
         raise TypeError("Input must be a float, int, str, or Decimal.")
     
     
     # Check for The Following Special Cases
-    if x.is_nan():
-        # x is undefined or something we can't calculate
-        return "0" + "1" * 11 + "1" + "0" * 51  # NaN
-    
-    if x.is_infinite():
-        s = 1 if x.is_signed() else 0
-        return f"{s}" + "1"*11 + "0"*52
-    if x.is_zero():
-        s = 1 if x.is_signed() else 0
-        return f"{s}" + "0"*63
+    if not x.is_finite() or x.is_zero():
+        return _special_bits(x, fmt)
 
     #  Normal numbers: now it's safe to compute sign
     s = 1 if x.is_signed() else 0
     x = x.copy_abs()
 
-    
+    # Numbers outside the exponent range are decided by their decimal
+    # magnitude alone, before any big integers are built
+    # (for binary64: |x| < 10^-309 < 2^-1022 and |x| >= 10^310 > 2^1024)
+    if x.adjusted() < _min_decimal_exponent(fmt, subnormal):  # Underflow to zero
+        up = _tiny_rounds_up(x, mode, s, fmt, subnormal, seed, index)
+        if up:  # Unless directed or stochastic rounding goes up to the smallest subnormal
+            return f"{s}" + '0'*(e + f - 1) + '1'
+        if up is not None:
+            if instrument.enabled:
+                instrument.count("underflow")
+            return f"{s}" + '0'*(e + f)
+    if x.adjusted() > _max_decimal_exponent(fmt):  # Overflow to infinity
+        if instrument.enabled:
+            instrument.count("overflow")
+        return f"{s}" + '1'*e + '0'*f
+
     # Step 2: Find the c and f
     # We use the following Equation: |x| = 2^cpart * fpart
-    # Where cparts = c - 1023 and fpart = f + 1 with 1 < fpart <= 2
-    
-    cpart = 0
-    fpart = x
-    
-    # If x >= 2 we keep dividing it until we have |x| = 2^cpart * fpart
-    # with fpart <= 2
-    while fpart >= 2:
-        fpart /= 2
-        cpart += 1
-    
-    # If fpart < 1 we make a correction by simplifying |x| = 2^(cpart-1)*2*fpart
-    # We repeat this process until 1 < fpart <= 2
-    while fpart < 1:
-        fpart *= 2
-        cpart -= 1
-        
+    # Where cparts = c - bias and fpart = f + 1 with 1 <= fpart < 2
+    _, digits, exp10 = x.as_tuple()
+    # int() of an exponent-0 Decimal is exact and has no digit-count limit
+    coeff = int(Decimal((0, digits, 0)))
+
+    if exp10 >= 0:
+        num, den = coeff * _pow10(exp10), 1
+    else:
+        num, den = coeff, _pow10(-exp10)
+
+    if instrument.enabled:
+        instrument.lap("widening")
+    return _pack(s, *_normalize(num, den, mode, fmt, subnormal, s, seed, index), fmt)
+
+
+def _tiny_rounds_up(x, mode, s, fmt, subnormal, seed, index):
+    """
+    Whether a positive Decimal below a tenth of the smallest subnormal of
+    fmt rounds up to it, or None if only the engine can tell.
+    """
+    if not subnormal or mode not in _UP_MODES:
+        return False
+    if mode is STOCHASTIC:
+        # Below 10^-17 of the smallest subnormal the part cut off is less
+        # than 2^-53, so only a random number of 0 rounds it up
+        if x.adjusted() < _min_decimal_exponent(fmt, subnormal) - 17:
+            return random_bits(seed, index) >> (64 - UNIFORM_BITS) == 0
+        return None
+    return mode is (TOWARD_NEGATIVE if s else TOWARD_POSITIVE)
+
+
+def _special_bits(x, fmt):
+    """Bit string of a NaN, infinite or zero Decimal."""
+    e, f = fmt.exponent_bits, fmt.fraction_bits
+
+    if x.is_nan():
+        # x is undefined or something we can't calculate
+        if instrument.enabled:
+            instrument.count("special_nan")
+        return "0" + "1" * e + "1" + "0" * (f - 1)  # NaN
+
+    s = 1 if x.is_signed() else 0
+    if x.is_infinite():
+        if instrument.enabled:
+            instrument.count("special_inf")
+        return f"{s}" + "1"*e + "0"*f
+
+    if instrument.enabled:
+        instrument.count("special_zero")
+    return f"{s}" + "0"*(e + f)
+
+
+def _str_bits(text, round):
+    """
+    Fast path for decimal literals, or None to use the Decimal engine.
+
+    float() rounds a literal of any length correctly to nearest, ties to
+    even, which is the rounded result. The chopped result is the same
+    double, or the one below it in magnitude if float() rounded up; that
+    is decided by comparing the exact value D * 10^e10 of the literal with
+    the double's exact ratio n / d in integers.
+
+    Results near the ends of the range (below 2^-1021, from 2^1023 up)
+    are left to the Decimal engine, which applies the flush-to-zero and
+    overflow rules, as are specials (inf, nan), literals with underscores
+    and literals too long for int().
+    """
+    if len(text) > _MAX_FAST_LENGTH or "_" in text:
+        return None
+    try:
+        y = float(text)
+    except ValueError:
+        return None  # Not a float literal: let Decimal decide (or raise)
+    if not _FAST_MIN <= abs(y) < _FAST_MAX:
+        return None
+
+    bits = _UINT64.unpack(_DOUBLE.pack(y))[0]
+    if not round:
+        # float() accepted it, so text is [sign] digits [. digits] [e exponent]
+        mantissa, _, exponent = text.strip().lower().partition("e")
+        whole, _, fraction = mantissa.partition(".")
+        coeff = abs(int(whole + fraction))
+        exp10 = int(exponent or 0) - len(fraction)
+
+        n, d = abs(y).as_integer_ratio()
+        if exp10 >= 0:
+            above = n > coeff * _pow10(exp10) * d
+        else:
+            above = n * _pow10(-exp10) > coeff * d
+        bits -= above  # One step toward zero
+
+    if instrument.enabled:
+        instrument.lap("parsing")
+    return f"{bits:064b}"
+
+
+def _float_bits(x):
+    """
+    Read the 64 bits of a float directly, with the same special-value
+    handling as the Decimal engine: a single quiet NaN pattern and
+    subnormals chopped to a signed zero.
+    """
+    bits = _UINT64.unpack(_DOUBLE.pack(x))[0]
+    c = (bits >> 52) & 0x7FF
+
+    if c == 2047 and bits & (2**52 - 1):  # NaN
+        if instrument.enabled:
+            instrument.count("special_nan")
+        return "0" + "1" * 11 + "1" + "0" * 51
+    if c == 0:  # Zero or underflow to zero
+        if instrument.enabled:
+            instrument.count("underflow" if bits & (2**52 - 1) else "special_zero")
+        return f"{bits >> 63}" + "0"*63
+    if instrument.enabled and c == 2047:
+        instrument.count("special_inf")
+    return f"{bits:064b}"
+
+
+def _pack(s, cpart, q, fmt=BINARY64):
+    """
+    Assemble the bit string from the sign, cpart and the rounded
+    significand q returned by _normalize.
+    """
+    e, f = fmt.exponent_bits, fmt.fraction_bits
+
     # Calculate c from cpart
-    c = cpart + 1023
-    
-    # Calculate f from fpart
-    f = fpart - 1
-    
-    # Check for Overflow/Underflow (if we do NOT have 0 < c < 2047)
-    if c >= 2047: # Overflow to infinity
-        return f"{s}" + '1'*11 + '0'*52
+    c = cpart + fmt.bias
+
+    # Check for Overflow/Underflow (if we do NOT have 0 < c < max_exponent)
+    if c >= fmt.max_exponent: # Overflow to infinity
+        if instrument.enabled:
+            instrument.count("overflow")
+        return f"{s}" + '1'*e + '0'*f
     if c <= 0:  # Underflow to zero
-        return f"{s}" + '0'*63
-    
-    if round:
-        fiftytwo_int = (f * (2**52)).to_integral_value(rounding=ROUND_HALF_EVEN)
-    else:
-        fiftytwo_int = (f * (2**52)).to_integral_value(rounding=ROUND_DOWN)
-    
-    # Calculate f_scaled: This is the normalized fraction f, scaled by 2^52
-    f_scaled = f * (2**52) # f * 4503599627370496
-    
-    # ... Apply rounding ...
-    
-    if fiftytwo_int >= 2**52:
-        # 1. Reset mantissa to zero (52 zeros)
-        fiftytwo_int = 0
-        
+        if instrument.enabled:
+            instrument.count("underflow")
+        return f"{s}" + '0'*(e + f)
+
+    # Rounding may carry into the hidden bit (fpart rounds up to 2)
+    if q >= 2**(f + 1):
+        if instrument.enabled:
+            instrument.count("carry")
+
+        # 1. Reset mantissa to zero
+        q = 2**f
+
         # 2. Increment the exponent
         c += 1
-        
+
         # 3. Check for Exponent Overflow (Infinity)
-        if c >= 2047:
-            s = 1 if x.is_signed() else 0 # Use the original sign for infinity
-            return f"{s}" + '1'*11 + '0'*52
+        if c >= fmt.max_exponent:
+            if instrument.enabled:
+                instrument.count("overflow")
+            return f"{s}" + '1'*e + '0'*f
+
+    # Denormalized: no hidden bit, c = 0 (a rounded-up subnormal that
+    # reaches 2^f is the smallest normal number and keeps c = 1)
+    if q < 2**f:
+        if instrument.enabled:
+            instrument.count("subnormal")
+        c = 0
+
+    fraction_bits = format(q & (2**f - 1), f'0{f}b')
+    exponent_bits = format(c, f'0{e}b')
+
+    # Step 6: Combine sign, exponent, and fraction into one bit string
+    bits = f"{s}" + exponent_bits + fraction_bits
+    if instrument.enabled:
+        instrument.lap("formatting")
+    return bits
+
+
+def _normalize(num, den, mode=TOWARD_ZERO, fmt=BINARY64, subnormal=False,
+               negative=False, seed=0, index=0):
+    """
+    Find cpart and the rounded significand of a positive value given as the
+    exact fraction num / den (for a Decimal, its integer coefficient times
+    a power of ten).
+
+    The binary exponent is read off the bit lengths and a single integer
+    division by den yields fpart * 2^f. The cost no longer depends on how
+    far x is from 1.
+
+    Input:
+        num, den (int): Positive numerator and denominator of |x|.
+        mode (RoundingMode): How to round the significand.
+        fmt (FloatFormat): Target format, for f and emin.
+        subnormal (boolean): Below the normal range, keep cpart = emin and
+        round to the subnormal grid instead of letting cpart fall below it.
+        negative (boolean): Sign of x, for the directed modes.
+        seed, index (int): Key of the random number of stochastic rounding.
+    Returns:
+        tuple: (cpart, q) where q = fpart * 2^f after rounding, including
+        the hidden bit. q equals 2^(f+1) when rounding carries into fpart = 2,
+        and q < 2^f for subnormals.
+    """
+    # 2^(k-1) < num/den < 2^(k+1), so cpart is either k or k-1
+    cpart = num.bit_length() - den.bit_length()
+    if cpart >= 0:
+        if num < den << cpart:
+            cpart -= 1
+    elif num << -cpart < den:
+        cpart -= 1
+    if instrument.enabled:
+        instrument.count("normalize_steps", num.bit_length() - den.bit_length() - cpart + 1)
+
+    if subnormal and cpart < fmt.emin:
+        cpart = fmt.emin
+
+    # fpart * 2^f = num * 2^(f-cpart) / den, in [2^f, 2^(f+1)) for normal numbers
+    shift = fmt.fraction_bits - cpart
+    if shift >= 0:
+        num <<= shift
+    else:
+        den <<= -shift
+    q, r = divmod(num, den)
+    if instrument.enabled:
+        instrument.lap("normalization")
+
+    if mode is NEAREST_EVEN:
+        if 2*r > den or (2*r == den and q & 1):
+            q += 1
+    elif mode is not TOWARD_ZERO and round_up(mode, negative, q, r, den, seed, index):
+        q += 1
+    if instrument.enabled:
+        instrument.lap("rounding")
+
+    return cpart, q
+
+
+def _min_decimal_exponent(fmt, subnormal):
+    """Decimal exponent below which every value of fmt underflows to zero."""
+    lowest = fmt.emin - fmt.fraction_bits if subnormal else fmt.emin
+    return math.floor(lowest * _LOG10_2) - 1
 
-    fiftytwo_bits = format(int(fiftytwo_int), '052b')
-    eleven_bits = format(c, '011b')
 
-    # Step 6: Combine sign, exponent, and fraction into 64-bit string
-    return f"{s}" + eleven_bits + fiftytwo_bits
+def _max_decimal_exponent(fmt):
+    """Decimal exponent above which every value of fmt overflows."""
+    return math.ceil((fmt.emax + 1) * _LOG10_2) + 1
 
 
-def float64_to_real(sixtyfour_bits):
+def _bits_float(sixtyfour_bits):
+    """
+    Reinterpret a validated 64-bit string as a float, with the same
+    special values float64_to_real returns (0.0 for both zeros, a plain NaN).
+    """
+    bits = int(sixtyfour_bits, 2)
+
+    if bits & (2**63 - 1) == 0:  # Zero
+        return 0.0
+    x = _DOUBLE.unpack(_UINT64.pack(bits))[0]
+    if x != x:  # NaN
+        return float('nan')
+    return x
+
+
+def _pow10(k):
+    """Return 10^k, from the table when k is in range."""
+    return _POW10[k] if k < len(_POW10) else 10**k
+
+
+def _pow2(e):
+    """
+    Return the Decimal 2^e, from the table for -1074 <= e <= 1023.
+    Must be called under DECIMAL_CONTEXT.
+    """
+    if -1074 <= e <= 1023:
+        return _POW2[e + 1074]
+    return Decimal(2) ** e
+
+
+def float64_to_real(sixtyfour_bits, as_float=False, as_int=False):
     """
     Convert 64-bit IEEE 754 representation to real number x using the formula:
     
@@ -129,60 +463,147 @@ def float64_to_real(sixtyfour_bits):
     
     Input:
         sixtyfour_bits (str): 64-bit binary string
+        as_float (boolean): Return a float by reinterpreting the bits directly
+        instead of building a Decimal.
+        as_int (boolean): Return the exact value as an int. Raises ValueError
+        if the value is not a finite integer.
     
     Returns:
         x : Real number representation
     """
-    if len(sixtyfour_bits) != 64 or any(c not in '01' for c in sixtyfour_bits):
-        raise ValueError("Input must be a 64-bit binary string")
+    if instrument.enabled and not instrument.active():
+        return instrument.traced("decode", float64_to_real, sixtyfour_bits, as_float, as_int)
+
+    _check_bits(sixtyfour_bits)
+
+    if as_float and as_int:
+        raise ValueError("Choose at most one of as_float and as_int")
+    if as_float or as_int:
+        x = _bits_float(sixtyfour_bits)
+        if instrument.enabled:
+            instrument.lap("fast_path")
+        if not as_int:
+            return x
+        if not x.is_integer():
+            raise ValueError(f"{x} is not an integer")
+        return int(x)
     
     # Extract components
     s = int(sixtyfour_bits[0])
-    eleven_bits = sixtyfour_bits[1:12]
-    fiftytwo_bits = sixtyfour_bits[12:]
-    
-    sign = Decimal((-1) ** s)
-    c = int(eleven_bits, 2)
-    exponent = Decimal(c - 1023)
-    
+    c = int(sixtyfour_bits[1:12], 2)
+    m = int(sixtyfour_bits[12:], 2)
+    if instrument.enabled:
+        instrument.lap("parsing")
+    return _decode(s, c, m, BINARY64)
+
+
+def float64_to_str(sixtyfour_bits, exact=False):
+    """
+    Format the value of a 64-bit IEEE 754 representation as a decimal string.
+
+    By default the result is the shortest string that converts back to
+    the same 64 bits (at most 17 significant digits, as repr(float) gives:
+    "0.1", "-0.0", "1e+300"). With exact=True it is the complete decimal
+    expansion of the value, every digit of which is exact
+    ("0.1000000000000000055511151231257827021181583404541015625"); it can
+    be up to 767 significant digits long. Infinities give "inf" and
+    "-inf", and every NaN gives "nan".
+
+    Input:
+        sixtyfour_bits (str): 64-bit binary string
+        exact (boolean): Return the exact expansion instead of the shortest
+        round-trip string.
+
+    Returns:
+        str: The decimal string.
+    """
+    _check_bits(sixtyfour_bits)
+    x = _DOUBLE.unpack(_UINT64.pack(int(sixtyfour_bits, 2)))[0]
+    if exact and math.isfinite(x):
+        return str(Decimal(x))  # Decimal(float) is exact
+    return repr(x)
+
+
+def _check_bits(sixtyfour_bits):
+    if (not isinstance(sixtyfour_bits, str) or len(sixtyfour_bits) != 64
+            or sixtyfour_bits.strip('01')):
+        raise ValueError("Input must be a 64-bit binary string")
+
+
+def bits_to_real(bits, fmt=BINARY64):
+    """
+    Convert the bit string of any binary floating-point format to a real
+    number x using the formula:
+
+     x =  (-1)^s * 2^(c-bias) * (f+1)
+
+    Input:
+        bits (str): fmt.width-bit binary string.
+        fmt (FloatFormat): Format of the bits (default: binary64).
+    Returns:
+        x : Real number representation (Decimal, or float for zero,
+        infinity and NaN, as float64_to_real)
+    """
+    if instrument.enabled and not instrument.active():
+        return instrument.traced("decode", bits_to_real, bits, fmt)
+
+    if not isinstance(bits, str) or len(bits) != fmt.width or bits.strip('01'):
+        raise ValueError(f"Input must be a {fmt.width}-bit binary string")
+
+    e = fmt.exponent_bits
+    s, c, m = int(bits[0]), int(bits[1:1 + e], 2), int(bits[1 + e:], 2)
+    if instrument.enabled:
+        instrument.lap("parsing")
+    return _decode(s, c, m, fmt)
+
+
+def _decode(s, c, m, fmt):
+    """Decoding engine shared by float64_to_real and bits_to_real."""
+    f = fmt.fraction_bits
+
     # Check special cases
-    if eleven_bits == '1'*11:  # Infinity or NaN
-        if '1' in fiftytwo_bits:
+    if c == fmt.max_exponent:  # Infinity or NaN
+        if instrument.enabled:
+            instrument.count("special_nan" if m else "special_inf")
+        if m:
             return float('nan')
         else:
             return float('inf') if s == 0 else float('-inf')
 
-    elif eleven_bits == '0'*11:  # Zero or Denormalized
+    elif c == 0:  # Zero or Denormalized
         # Case where x=0
-        if fiftytwo_bits == '0'*52: 
+        if m == 0:
+            if instrument.enabled:
+                instrument.count("special_zero")
             return 0.0
-        
-        # Denormalized case (exponent is fixed at -1022, implicit '1' is '0')
-        E_denorm = Decimal(-1022) 
-        F_denorm = Decimal(0)
-        
-        # Calculate the fraction (0.f1 f2...)
-        for i, bit in enumerate(fiftytwo_bits):
-            F_denorm += Decimal(bit) * (Decimal(2) ** Decimal(-(i + 1)))
-        
-        # Denormalized value = sign * 2^-1022 * (0 + F)
-        x = sign * F_denorm * (Decimal(2) ** E_denorm)
-        
+
+        # Denormalized value = sign * 2^emin * (0 + F), implicit '1' is '0'
         # We return the raw Decimal object, which is better for error calculation
-        return x 
+        if instrument.enabled:
+            instrument.count("subnormal")
+        with localcontext(DECIMAL_CONTEXT):
+            x = _signed_fraction(s, m, f) * _pow2(fmt.emin)
 
-    # Normalized Case (The vast majority of numbers)
-    
-    # Calculate fpart (1.f1 f2...): Start with the implicit leading '1'
-    fpart = Decimal(1) 
-    
-    # Calculate the fraction part (f)
-    for i, bit in enumerate(fiftytwo_bits):
-        fpart += Decimal(bit) * (Decimal(2) ** Decimal(-(i + 1)))
+    else:
+        # Normalized Case (The vast majority of numbers)
+        # x = sign * fpart * 2^exponent with fpart = (2^f + m) / 2^f
+        # Return Decimal object for use in your table's error calculation
+        with localcontext(DECIMAL_CONTEXT):
+            x = _signed_fraction(s, 2**f + m, f) * _pow2(c - fmt.bias)
 
-    # Calculate x = sign * fpart * 2^exponent
-    x = sign * fpart * (Decimal(2) ** exponent)
-    
-    # Return Decimal object for use in your table's error calculation
+    if instrument.enabled:
+        instrument.lap("decimal")
     return x
 
+
+def _signed_fraction(s, n, f=52):
+    """
+    Return (-1)^s * n / 2^f as an exact Decimal with exponent -f.
+
+    n / 2^f = n * 5^f / 10^f, so the fraction is a plain decimal shift
+    of one integer. For binary64 the coefficient has at most 53 digits,
+    well inside the working precision, and matches the summed fraction
+    bits exactly. Must be called under DECIMAL_CONTEXT.
+    """
+    x = Decimal(n * 5**f).scaleb(-f)
+    return x.copy_negate() if s else x
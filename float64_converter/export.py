@@ -0,0 +1,286 @@
+"""
+export.py
+
+Streaming export of conversion tables: for every input number, its
+chopped and rounded doubles and their absolute and relative errors, as
+LaTeX, CSV or Markdown.
+
+Inputs are read in batches. The chopped and rounded values come from
+real_to_float64, and for the errors each number is split exactly into a
+pair of doubles (see analysis.py),
+
+     x = sign * (a + t * ulp(a))      with a = |x| chopped, 0 <= t < 1
+
+with one float() and a few integer operations per input, so that
+analysis.errors() gives the errors of the whole batch in NumPy array
+operations. Columns are formatted a whole column at a time and the rows
+of the batch are written before the next batch is read, so memory use
+does not depend on the number of rows.
+
+    with open("table.tex", "w") as f:
+        write_table(open("inputs.txt"), f, format="latex", caption="...")
+"""
+
+import csv
+import math
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+import numpy as np
+
+from . import analysis
+from .analysis import XMIN, XMAX
+from .converter import real_to_float64
+
+COLUMNS = ("Original Value", "Chopped Value", "Rounded Value",
+           "Abs. Error (Chop)", "Rel. Error (Chop)", "Abs. Error (Round)", "Rel. Error (Round)")
+FORMATS = ("latex", "csv", "markdown")
+BATCH_SIZE = 8192
+
+# |x| >= 2^1024 overflows to inf when chopped too
+_OVERFLOW = Decimal(2**1024)
+_TINY_EXPONENT = -1074
+# Below 10^-650, t = |x| / 2^-1074 < 10^-326 is below the smallest double
+_MIN_ADJUSTED = -650
+
+
+def split(value):
+    """
+    Split one number exactly into the parts (a, t, sign) of analysis.py,
+    with 1 - t correctly rounded as well (t near 1 loses it).
+
+    Input:
+        value (str, Decimal, int or float): The number.
+    Returns:
+        tuple: (a, t, 1 - t, sign) as floats. Numbers no double can hold
+        have a = inf (x infinite, t = 0; |x| >= 2^1024, t = inf) or
+        a = NaN (t = NaN).
+    Raises:
+        ValueError: If value is not a number.
+    """
+    try:
+        d = Decimal(value.strip() if isinstance(value, str) else value)
+    except (InvalidOperation, TypeError, ValueError):
+        raise ValueError(f"not a valid number: {value!r}") from None
+
+    sign = -1.0 if d.is_signed() else 1.0
+    if d.is_nan():
+        return math.nan, math.nan, math.nan, sign
+    if d.is_infinite():
+        return math.inf, 0.0, 0.0, sign
+    m = d.copy_abs()
+    if m >= _OVERFLOW:
+        return math.inf, math.inf, math.inf, sign
+    # Decided by the decimal exponent, before as_integer_ratio() builds
+    # integers as long as it (1e-9999999)
+    if m.adjusted() < _MIN_ADJUSTED:
+        if m.is_zero():
+            return 0.0, 0.0, 1.0, sign
+        return 0.0, 5e-324, math.nextafter(1.0, 0.0), sign  # As _fraction() has it
+
+    # float() rounds correctly (to the subnormal grid too), so a is it or
+    # the double below it; t = (m - a) / ulp(a) is an exact ratio num / den
+    a = min(float(m), float(XMAX))
+    ratio = m.as_integer_ratio()
+    num, den = _residue(a, *ratio)
+    if num < 0:
+        a = math.nextafter(a, 0.0)
+        num, den = _residue(a, *ratio)
+    return a, _fraction(num, den), _fraction(den - num, den), sign
+
+
+def _residue(a, num, den):
+    """(num / den - a) / ulp(a) as a ratio of integers."""
+    # Doubles below the smallest normal (and 0) are spaced 2^-1074 apart
+    exponent = math.frexp(a)[1] - 53 if a >= XMIN else _TINY_EXPONENT
+    digits = int(math.ldexp(a, -exponent))  # a = digits * 2^exponent exactly
+    if exponent >= 0:
+        den <<= exponent
+        return num - digits * den, den
+    return (num << -exponent) - digits * den, den
+
+
+def _fraction(num, den):
+    """num / den in [0, 1] correctly rounded, but only 1/2 at a tie, 1 at 1 and 0 at 0."""
+    t = num / den
+    if t == 0.5 and 2 * num != den:
+        return math.nextafter(0.5, 1.0 if 2 * num > den else 0.0)
+    if t == 1.0 and num != den:
+        return math.nextafter(1.0, 0.0)
+    if t == 0.0 and num:
+        return 5e-324
+    return t
+
+
+def convert_batch(values):
+    """
+    Chop and round a batch of numbers and compute their errors.
+
+    Input:
+        values (list): Numbers as str, Decimal, int or float.
+    Returns:
+        dict: float64 arrays "chopped" and "rounded" (the values of the
+        results, both zeros as 0.0), and "abs_chop", "rel_chop",
+        "abs_round" and "rel_round". The errors are inf for results that
+        overflow, 0 for infinite inputs and NaN for NaN.
+    Raises:
+        ValueError: If a value is not a number.
+    """
+    values = [value.strip() if isinstance(value, str) else value for value in values]
+    parts = np.array([split(value) for value in values], dtype=np.float64).reshape(-1, 4)
+    a, t, rest, sign = parts.T
+    special = ~np.isfinite(a)
+
+    table = {"chopped": _converted(values, False), "rounded": _converted(values, True)}
+    ordinary = np.where(special, 0.0, a), np.where(special, 0.0, t), sign, rest
+    for mode, (abs_err, rel_err, _) in analysis.errors(*ordinary).items():
+        # Infinite inputs are held exactly; overflow and NaN carry t (inf or NaN)
+        abs_err[special] = rel_err[special] = t[special]
+        table[f"abs_{mode}"], table[f"rel_{mode}"] = abs_err, rel_err
+    return table
+
+
+def _converted(values, round):
+    """The values of real_to_float64's results, both zeros as 0.0 (as float64_to_real)."""
+    bits = [int(real_to_float64(value, round=round), 2) for value in values]
+    return np.array(bits, dtype=np.uint64).view(np.float64) + 0.0
+
+
+def format_column(x):
+    """
+    Format a column of values for display: two significant decimals in
+    scientific notation below 1e3, all 17 significant digits above.
+
+    Input:
+        x (ndarray): float64 values.
+    Returns:
+        list: str of each value.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    small = np.abs(x) < 1e3
+    out = np.empty(len(x), dtype=object)
+    # One C-level map per format over the whole column
+    out[small] = list(map("{:.2e}".format, x[small].tolist()))
+    out[~small] = list(map("{:.17g}".format, x[~small].tolist()))
+    return out.tolist()
+
+
+def iter_rows(values, batch_size=BATCH_SIZE):
+    """
+    Convert numbers batch by batch and yield their formatted rows.
+
+    Input:
+        values (iterable): Numbers as str (e.g. the lines of a file; blank
+        ones are skipped), Decimal, int or float. Read lazily.
+        batch_size (int): Numbers converted at a time.
+    Yields:
+        list: The rows of a batch, tuples of str in COLUMNS order.
+    """
+    values = (v.strip() if isinstance(v, str) else v for v in values)
+    values = (v for v in values if v != "")
+    while True:
+        batch = list(islice(values, batch_size))
+        if not batch:
+            return
+        table = convert_batch(batch)
+        columns = [[str(v) for v in batch]]
+        columns += [format_column(table[key]) for key in
+                    ("chopped", "rounded", "abs_chop", "rel_chop", "abs_round", "rel_round")]
+        yield list(zip(*columns))
+
+
+class LatexWriter:
+    """
+    Writes a booktabs table, as pandas' DataFrame.to_latex does (cells
+    are not escaped).
+    """
+
+    def __init__(self, f, caption=None, label=None, column_format=None):
+        self.f = f
+        self.caption = caption
+        self.label = label
+        self.column_format = column_format
+
+    def header(self, columns):
+        f = self.f
+        if self.caption or self.label:
+            f.write("\\begin{table}\n")
+            if self.caption:
+                f.write(f"\\caption{{{self.caption}}}\n")
+            if self.label:
+                f.write(f"\\label{{{self.label}}}\n")
+        column_format = self.column_format or "l" + "r" * (len(columns) - 1)
+        f.write(f"\\begin{{tabular}}{{{column_format}}}\n\\toprule\n")
+        f.write(" & ".join(columns) + " \\\\\n\\midrule\n")
+
+    def rows(self, rows):
+        self.f.write("".join(" & ".join(row) + " \\\\\n" for row in rows))
+
+    def close(self):
+        self.f.write("\\bottomrule\n\\end{tabular}\n")
+        if self.caption or self.label:
+            self.f.write("\\end{table}\n")
+
+
+class CsvWriter:
+    """Writes comma-separated values with a header line."""
+
+    def __init__(self, f):
+        self.writer = csv.writer(f)
+
+    def header(self, columns):
+        self.writer.writerow(columns)
+
+    def rows(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        pass
+
+
+class MarkdownWriter:
+    """Writes a pipe table, numeric columns right-aligned."""
+
+    def __init__(self, f):
+        self.f = f
+
+    def header(self, columns):
+        self.f.write("| " + " | ".join(columns) + " |\n")
+        self.f.write("|:---|" + "---:|" * (len(columns) - 1) + "\n")
+
+    def rows(self, rows):
+        self.f.write("".join("| " + " | ".join(row) + " |\n" for row in rows))
+
+    def close(self):
+        pass
+
+
+WRITERS = {"latex": LatexWriter, "csv": CsvWriter, "markdown": MarkdownWriter}
+
+
+def write_table(values, f, format="latex", batch_size=BATCH_SIZE, **options):
+    """
+    Stream the conversion table of some numbers to a text file.
+
+    Input:
+        values (iterable): Numbers, see iter_rows().
+        f (file): Text file to write to (open CSV files with newline="").
+        format (str): "latex", "csv" or "markdown".
+        batch_size (int): Rows converted and written at a time.
+        **options: For LaTeX: caption, label and column_format.
+    Returns:
+        int: Number of rows written.
+    Raises:
+        ValueError: If a value is not a number (rows of earlier batches
+        have been written).
+    """
+    if format not in WRITERS:
+        raise ValueError(f"format must be one of {FORMATS}")
+    writer = WRITERS[format](f, **options)
+    writer.header(COLUMNS)
+    count = 0
+    for rows in iter_rows(values, batch_size):
+        writer.rows(rows)
+        count += len(rows)
+    writer.close()
+    return count
@@ -0,0 +1,165 @@
+"""
+expression.py
+
+Safe, compiled evaluation of the mathematical expressions typed into the
+GUI (e.g. sin(2), sqrt(5), e^3, 1+29*e).
+
+An expression is parsed once, checked against a whitelist of syntax
+nodes and names (numbers, arithmetic operators and the names in the math
+module), compiled, and cached. ^ is read as a power, as in the GUI
+instructions. Attribute access, subscripts, lambdas, comprehensions and
+any other names are rejected before anything is evaluated.
+
+A compiled expression can be evaluated for one value, or swept over a
+NumPy array of inputs, where the math functions are replaced by their
+NumPy counterparts so the whole array is evaluated at once.
+"""
+
+import ast
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from .batch import real_to_float64_array
+
+# Names available to expressions: everything in math (e, pi, sin, ...)
+MATH_NAMES = {k: getattr(math, k) for k in dir(math) if not k.startswith("__")}
+
+_OPERATORS = (
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.BitXor, ast.UAdd, ast.USub,
+)
+_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load,
+    ast.Constant,
+) + _OPERATORS
+
+
+class ExpressionError(ValueError):
+    """The expression is not valid or uses something that is not allowed."""
+
+
+class CompiledExpression:
+    """
+    A validated, compiled expression.
+
+    Attributes:
+        text (str): The source expression.
+        names (frozenset): Names the expression reads.
+        variables (frozenset): Names that are not math names, which must be
+        given when evaluating (e.g. x in a sweep).
+    """
+
+    def __init__(self, text, code, names):
+        self.text = text
+        self.code = code
+        self.names = frozenset(names)
+        self.variables = self.names - MATH_NAMES.keys()
+
+    def __repr__(self):
+        return f"CompiledExpression({self.text!r})"
+
+    def __call__(self, **variables):
+        """Evaluate with the math module functions, for scalar values."""
+        self._check_variables(variables)
+        return eval(self.code, {"__builtins__": {}}, {**MATH_NAMES, **variables})
+
+    def evaluate_array(self, **variables):
+        """
+        Evaluate with NumPy functions, so array variables are processed
+        element-wise in one pass. Returns a float64 array.
+        """
+        self._check_variables(variables)
+        arrays = {k: np.asarray(v, dtype=np.float64) for k, v in variables.items()}
+        shape = np.broadcast_shapes(*(a.shape for a in arrays.values())) if arrays else ()
+        with np.errstate(all="ignore"):
+            result = eval(self.code, {"__builtins__": {}}, {**NUMPY_NAMES, **arrays})
+        return np.broadcast_to(np.asarray(result, dtype=np.float64), shape)
+
+    def _check_variables(self, variables):
+        missing = self.variables - variables.keys()
+        if missing:
+            raise ExpressionError(f"Unknown name(s): {', '.join(sorted(missing))}")
+
+
+@lru_cache(maxsize=256)
+def compile_expression(text, variables=()):
+    """
+    Parse, validate and compile an expression, cached by its text.
+
+    Input:
+        text (str): The expression, e.g. "sin(x)**2 + 1".
+        variables (tuple of str): Extra names the expression may use.
+    Returns:
+        CompiledExpression
+    Raises:
+        ExpressionError: if the expression is malformed or not allowed.
+    """
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {e.msg}") from None
+
+    allowed_names = MATH_NAMES.keys() | set(variables)
+    names = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, _NODES):
+            raise ExpressionError(f"{type(node).__name__} is not allowed in expressions")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ExpressionError("Only numbers are allowed as constants")
+        if isinstance(node, ast.Call) and (node.keywords or not isinstance(node.func, ast.Name)):
+            raise ExpressionError("Only plain calls of math functions are allowed")
+        if isinstance(node, ast.Name):
+            if node.id not in allowed_names:
+                raise ExpressionError(f"Unknown name: {node.id}")
+            names.add(node.id)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.BitXor):
+            node.op = ast.Pow()  # e^3 means e**3
+
+    code = compile(tree, "<expression>", "eval")
+    return CompiledExpression(text, code, names)
+
+
+def sweep(text, start, stop, num=50, variable="x", round=False):
+    """
+    Evaluate an expression over np.linspace(start, stop, num) and convert
+    every result to its 64-bit representation in one batch.
+
+    Input:
+        text (str): Expression in the sweep variable, e.g. "sin(x)".
+        start, stop (float): Range of the variable.
+        num (int): Number of points.
+        variable (str): Name of the sweep variable.
+        round (boolean): Passed to the batch converter.
+    Returns:
+        tuple: (inputs, values, bits) arrays; bits is an S64 array.
+    """
+    expression = compile_expression(text, (variable,))
+    inputs = np.linspace(start, stop, num)
+    values = expression.evaluate_array(**{variable: inputs})
+    return inputs, values, real_to_float64_array(values, round=round)
+
+
+def _np_log(x, base=None):
+    return np.log(x) if base is None else np.log(x) / np.log(base)
+
+
+def _vectorized(function):
+    """NumPy stand-in for a math function without a ufunc equivalent."""
+    return np.vectorize(function, otypes=[np.float64])
+
+
+# math names mapped to NumPy equivalents for array evaluation
+NUMPY_NAMES = {k: (_vectorized(v) if callable(v) else v) for k, v in MATH_NAMES.items()}
+NUMPY_NAMES.update({
+    "acos": np.arccos, "acosh": np.arccosh, "asin": np.arcsin, "asinh": np.arcsinh,
+    "atan": np.arctan, "atan2": np.arctan2, "atanh": np.arctanh, "cbrt": np.cbrt,
+    "ceil": np.ceil, "copysign": np.copysign, "cos": np.cos, "cosh": np.cosh,
+    "degrees": np.degrees, "exp": np.exp, "exp2": np.exp2, "expm1": np.expm1,
+    "fabs": np.fabs, "floor": np.floor, "fmod": np.fmod, "hypot": np.hypot,
+    "isfinite": np.isfinite, "isinf": np.isinf, "isnan": np.isnan, "ldexp": np.ldexp,
+    "log": _np_log, "log10": np.log10, "log1p": np.log1p, "log2": np.log2,
+    "pow": np.power, "radians": np.radians, "sin": np.sin, "sinh": np.sinh,
+    "sqrt": np.sqrt, "tan": np.tan, "tanh": np.tanh, "trunc": np.trunc,
+})
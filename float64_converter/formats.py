@@ -0,0 +1,78 @@
+"""
+formats.py
+
+Descriptors of binary floating-point formats, used to parameterize the
+encode/decode engine in converter.py and the vectorized chop in batch.py.
+
+A format is given by its exponent and fraction widths; the bias, the
+exponent range and the extreme values follow from these as in IEEE 754:
+
+     x =  (-1)^s * 2^(c-bias) * (f+1)     for 0 < c < 2^exponent_bits - 1
+
+Predefined formats: BINARY16 (fp16), BFLOAT16, BINARY32 (fp32) and
+BINARY64 (fp64). Custom formats are made with FloatFormat(name, e, f).
+"""
+
+import math
+
+
+class FloatFormat:
+    """
+    A binary floating-point format with 1 sign bit, exponent_bits exponent
+    bits and fraction_bits stored fraction bits (precision fraction_bits + 1).
+
+    Attributes:
+        bias (int): Exponent bias, 2^(exponent_bits-1) - 1.
+        max_exponent (int): Biased exponent of infinity and NaN.
+        emin, emax (int): Smallest and largest unbiased normal exponents.
+        width (int): Total number of bits.
+        xmax (float): Largest finite value.
+        xmin (float): Smallest positive normal value.
+        xmins (float): Smallest positive subnormal value.
+    """
+
+    def __init__(self, name, exponent_bits, fraction_bits):
+        if exponent_bits < 2 or fraction_bits < 1:
+            raise ValueError("A format needs at least 2 exponent bits and 1 fraction bit")
+
+        self.name = name
+        self.exponent_bits = exponent_bits
+        self.fraction_bits = fraction_bits
+
+        self.bias = 2**(exponent_bits - 1) - 1
+        self.max_exponent = 2**exponent_bits - 1
+        self.emin = 1 - self.bias
+        self.emax = self.bias
+        self.width = 1 + exponent_bits + fraction_bits
+
+        # As floats (inf or 0.0 where the format is wider than a double)
+        self.xmax = _ldexp(2 - 2.0**-fraction_bits, self.emax)
+        self.xmin = _ldexp(1.0, self.emin)
+        self.xmins = _ldexp(1.0, self.emin - fraction_bits)
+
+    def __repr__(self):
+        return (f"FloatFormat({self.name!r}, exponent_bits={self.exponent_bits}, "
+                f"fraction_bits={self.fraction_bits})")
+
+    def __eq__(self, other):
+        if not isinstance(other, FloatFormat):
+            return NotImplemented
+        return (self.exponent_bits, self.fraction_bits) == (other.exponent_bits, other.fraction_bits)
+
+    def __hash__(self):
+        return hash((self.exponent_bits, self.fraction_bits))
+
+
+def _ldexp(m, e):
+    try:
+        return math.ldexp(m, e)
+    except OverflowError:
+        return math.inf
+
+
+BINARY16 = FloatFormat("binary16", 5, 10)
+BFLOAT16 = FloatFormat("bfloat16", 8, 7)
+BINARY32 = FloatFormat("binary32", 8, 23)
+BINARY64 = FloatFormat("binary64", 11, 52)
+
+FORMATS = {fmt.name: fmt for fmt in (BINARY16, BFLOAT16, BINARY32, BINARY64)}
@@ -0,0 +1,205 @@
+"""
+instrument.py
+
+Opt-in instrumentation of the conversion hot paths.
+
+When enabled, every real_to_float64 / float64_to_real / real_to_bits /
+bits_to_real call is traced: the time spent in each stage (input widening,
+exponent normalization, rounding, string formatting, decoding) is
+accumulated, branch counters (special values, overflow, underflow,
+rounding carries, subnormals, normalization steps) are incremented, and
+registered hooks receive a record of the call.
+
+When disabled (the default) the converter only tests the module flag
+`enabled`, so the overhead is a few attribute lookups per call.
+
+Usage:
+    from float64_converter import instrument
+    instrument.enable()
+    ...
+    instrument.stats()          # aggregated stats as a dict
+    instrument.to_prometheus()  # the same in Prometheus text format
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+enabled = False
+
+_lock = threading.Lock()
+_local = threading.local()
+_hooks = []
+
+_calls = defaultdict(int)
+_errors = defaultdict(int)
+_call_seconds = defaultdict(float)
+_stage_calls = defaultdict(int)
+_stage_seconds = defaultdict(float)
+_stage_max = defaultdict(float)
+_counters = defaultdict(int)
+
+
+def enable():
+    """Start tracing conversions."""
+    global enabled
+    enabled = True
+
+
+def disable():
+    """Stop tracing conversions (aggregated stats are kept)."""
+    global enabled
+    enabled = False
+
+
+def reset():
+    """Clear all aggregated stats."""
+    with _lock:
+        for table in (_calls, _errors, _call_seconds, _stage_calls,
+                      _stage_seconds, _stage_max, _counters):
+            table.clear()
+
+
+def add_hook(hook):
+    """
+    Register hook(event, record), called after every traced conversion.
+
+    event is "encode" or "decode"; record is a dict with the total
+    "seconds", per-stage "stages" seconds, branch "counters" and whether
+    the call raised ("error").
+    """
+    with _lock:
+        _hooks.append(hook)
+
+
+def remove_hook(hook):
+    """Unregister a hook added with add_hook."""
+    with _lock:
+        _hooks.remove(hook)
+
+
+class _Call:
+    """Timing and counters of one traced conversion."""
+
+    def __init__(self, event):
+        self.event = event
+        self.start = self.last = time.perf_counter_ns()
+        self.stages = {}
+        self.counters = {}
+
+    def lap(self, stage):
+        now = time.perf_counter_ns()
+        self.stages[stage] = self.stages.get(stage, 0) + now - self.last
+        self.last = now
+
+    def count(self, name, n):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+
+def traced(event, func, *args):
+    """Run func(*args) as one traced conversion of the given event."""
+    call = _Call(event)
+    outer, _local.call = getattr(_local, "call", None), call
+    error = False
+    try:
+        return func(*args)
+    except Exception:
+        error = True
+        raise
+    finally:
+        _local.call = outer
+        _finish(call, error)
+
+
+def active():
+    """Return True while a traced conversion runs in this thread."""
+    return getattr(_local, "call", None) is not None
+
+
+def lap(stage):
+    """Attribute the time since the previous lap of the current call to stage."""
+    call = getattr(_local, "call", None)
+    if call is not None:
+        call.lap(stage)
+
+
+def count(name, n=1):
+    """Increment a branch counter for the current call."""
+    call = getattr(_local, "call", None)
+    if call is not None:
+        call.count(name, n)
+
+
+def _finish(call, error):
+    seconds = (time.perf_counter_ns() - call.start) / 1e9
+    stages = {stage: ns / 1e9 for stage, ns in call.stages.items()}
+
+    with _lock:
+        _calls[call.event] += 1
+        _call_seconds[call.event] += seconds
+        if error:
+            _errors[call.event] += 1
+        for stage, stage_seconds in stages.items():
+            _stage_calls[stage] += 1
+            _stage_seconds[stage] += stage_seconds
+            _stage_max[stage] = max(_stage_max[stage], stage_seconds)
+        for name, n in call.counters.items():
+            _counters[name] += n
+        hooks = list(_hooks)
+
+    if hooks:
+        record = {"seconds": seconds, "stages": stages,
+                  "counters": dict(call.counters), "error": error}
+        for hook in hooks:
+            hook(call.event, record)
+
+
+def stats():
+    """
+    Return the aggregated stats as a dict:
+        calls / errors / seconds: per event ("encode", "decode")
+        stages: per stage, calls, total_seconds and max_seconds
+        counters: branch counters
+    """
+    with _lock:
+        return {
+            "calls": dict(_calls),
+            "errors": dict(_errors),
+            "seconds": dict(_call_seconds),
+            "stages": {
+                stage: {
+                    "calls": _stage_calls[stage],
+                    "total_seconds": _stage_seconds[stage],
+                    "max_seconds": _stage_max[stage],
+                }
+                for stage in _stage_calls
+            },
+            "counters": dict(_counters),
+        }
+
+
+def to_prometheus(prefix="float64_converter"):
+    """Return the aggregated stats in the Prometheus text exposition format."""
+    data = stats()
+    lines = []
+
+    def metric(name, kind, help_text, label, values):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for key, value in sorted(values.items()):
+            lines.append(f'{prefix}_{name}{{{label}="{key}"}} {value}')
+
+    metric("calls_total", "counter", "Traced conversions.", "event", data["calls"])
+    metric("errors_total", "counter", "Traced conversions that raised.", "event", data["errors"])
+    metric("seconds_total", "counter", "Time spent in traced conversions.", "event", data["seconds"])
+    stages = data["stages"]
+    metric("stage_calls_total", "counter", "Conversions that ran each stage.", "stage",
+           {stage: s["calls"] for stage, s in stages.items()})
+    metric("stage_seconds_total", "counter", "Time spent in each stage.", "stage",
+           {stage: s["total_seconds"] for stage, s in stages.items()})
+    metric("stage_max_seconds", "gauge", "Slowest single run of each stage.", "stage",
+           {stage: s["max_seconds"] for stage, s in stages.items()})
+    metric("branch_total", "counter", "Branches taken in the conversion engine.", "branch",
+           data["counters"])
+
+    return "\n".join(lines) + "\n"
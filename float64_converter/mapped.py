@@ -0,0 +1,179 @@
+"""
+mapped.py
+
+Bit-level dumps of large files of doubles through memory maps.
+
+A raw file of little- or big-endian doubles, or a .npy array of float64
+(or uint64) values, is mapped and reinterpreted as uint64 patterns
+without copying. dump_bits() writes one 64-bit string per line, or the
+sign, exponent and fraction fields separated by spaces. load_bits() reads
+such a dump back into a raw or .npy file. The values of a .npy array of
+any shape are taken in C order (Fortran-order arrays are rejected).
+
+Both work one window of the file at a time: each chunk is mapped, turned
+into (or parsed from) a block of text in NumPy, written, and unmapped, so
+memory use stays constant whatever the file size.
+
+Dumps follow real_to_float64 by default (one quiet NaN pattern,
+subnormals chopped to a signed zero); with raw=True the stored bits are
+written unchanged, so a dump loads back to an identical file.
+"""
+
+import os
+
+import numpy as np
+
+from .batch import real_to_float64_array
+
+BYTEORDERS = {"little": "<", "big": ">"}
+CHUNK_SIZE = 1 << 18
+
+# Line layouts of a dump: digit columns and line length (with the newline)
+_BITS_LINE = 65
+_FIELDS_LINE = 67
+_FIELD_COLUMNS = np.r_[0, 2:13, 14:66]
+
+
+def map_doubles(path, byteorder="little"):
+    """
+    Map a raw or .npy file of doubles as a read-only uint64 array, without
+    copying.
+
+    Input:
+        path (str): A .npy file, or a raw file of 8-byte doubles.
+        byteorder (str): "little" or "big", for raw files (a .npy file
+        records its own).
+    Returns:
+        numpy.memmap: uint64 patterns, flat, in storage order.
+    """
+    dtype, offset, count = _layout(path, byteorder)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+
+def dump_bits(path, out, byteorder="little", fields=False, raw=False, chunk_size=CHUNK_SIZE):
+    """
+    Write the 64-bit strings of every double in a file, one per line.
+
+    Input:
+        path (str): A .npy file, or a raw file of doubles.
+        out (binary file): Receives the lines (e.g. sys.stdout.buffer).
+        byteorder (str): "little" or "big", for raw files.
+        fields (boolean): Write "s eeeeeeeeeee ffff...f" instead of the
+        plain 64-bit string.
+        raw (boolean): Write the stored bits instead of the patterns
+        real_to_float64 gives.
+        chunk_size (int): Values per mapped window.
+    Returns:
+        int: Number of values written.
+    """
+    dtype, offset, count = _layout(path, byteorder)
+    width = _FIELDS_LINE if fields else _BITS_LINE
+
+    for start, window in _windows(path, dtype, offset, count, chunk_size, "r"):
+        bits = window.astype(np.uint64)
+        if not raw:
+            bits = real_to_float64_array(bits, packed=True)
+
+        octets = bits.astype('>u8').view(np.uint8).reshape(-1, 8)
+        lines = np.full((len(bits), width), ord(' '), dtype=np.uint8)
+        lines[:, -1] = ord('\n')
+        digit_columns = _FIELD_COLUMNS if fields else slice(0, 64)
+        lines[:, digit_columns] = np.unpackbits(octets, axis=1) + ord('0')
+        out.write(lines.tobytes())
+        del window
+
+    return count
+
+
+def load_bits(source, path, byteorder="little", chunk_size=CHUNK_SIZE):
+    """
+    Read a dump written by dump_bits (plain or field-split lines, "\\n"
+    line ends) back into a binary file of doubles.
+
+    Input:
+        source (str): The dump file.
+        path (str): Output file; a .npy file if it ends in .npy, raw otherwise.
+        byteorder (str): "little" or "big", for the doubles written.
+        chunk_size (int): Lines per mapped window.
+    Returns:
+        int: Number of values written.
+    Raises:
+        ValueError: if the dump is not made of 64-bit binary lines.
+    """
+    width, count = _dump_layout(source)
+    order = _byteorder(byteorder)
+    digit_columns = _FIELD_COLUMNS if width == _FIELDS_LINE else slice(0, 64)
+
+    # Create the output at its full size, then fill it window by window
+    if path.endswith(".npy"):
+        header = np.lib.format.open_memmap(path, mode="w+", dtype=order + "f8", shape=(count,))
+        offset = header.offset
+        del header
+    else:
+        offset = 0
+        with open(path, "wb") as f:
+            f.truncate(count * 8)
+
+    for start, window in _windows(path, order + "u8", offset, count, chunk_size, "r+"):
+        lines = np.memmap(source, dtype=np.uint8, mode="r", offset=start * width,
+                          shape=(len(window), width))
+        digits = lines[:, digit_columns] - ord('0')
+        bad = (digits > 1).any(axis=1) | (lines[:, -1] != ord('\n'))
+        if bad.any():
+            raise ValueError(f"line {start + int(bad.argmax()) + 1}: not a 64-bit binary string")
+        window[:] = np.ascontiguousarray(np.packbits(digits, axis=1)).view('>u8').reshape(-1)
+        window.flush()
+        del window, lines
+
+    return count
+
+
+def _byteorder(byteorder):
+    if byteorder not in BYTEORDERS:
+        raise ValueError(f"byteorder must be one of {sorted(BYTEORDERS)}")
+    return BYTEORDERS[byteorder]
+
+
+def _layout(path, byteorder):
+    """Return (uint64 dtype with the file's byte order, data offset, count)."""
+    if not path.endswith(".npy"):
+        order = _byteorder(byteorder)
+        return np.dtype(order + "u8"), 0, os.path.getsize(path) // 8
+
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        elif version in ((2, 0), (3, 0)):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        else:
+            raise ValueError(f"{path} is a .npy file of unsupported version {version}")
+        offset = f.tell()
+
+    if dtype.kind not in "fu" or dtype.itemsize != 8:
+        raise ValueError(f"{path} holds {dtype}, not float64 or uint64 values")
+    # Values are mapped in storage order, which is C order only when the
+    # array is not stored column-major
+    if fortran_order and sum(n > 1 for n in shape) > 1:
+        raise ValueError(f"{path} holds a Fortran-order array; save it in C order")
+    return np.dtype("u8").newbyteorder(dtype.byteorder), offset, int(np.prod(shape))
+
+
+def _dump_layout(source):
+    """Return (line length, number of lines) of a dump file."""
+    size = os.path.getsize(source)
+    if size == 0:
+        return _BITS_LINE, 0
+    with open(source, "rb") as f:
+        width = len(f.readline())
+    if width not in (_BITS_LINE, _FIELDS_LINE) or size % width:
+        raise ValueError(f"{source} is not a dump of 64-bit binary lines")
+    return width, size // width
+
+
+def _windows(path, dtype, offset, count, chunk_size, mode):
+    """Yield (start, memmap) for consecutive windows of count values."""
+    itemsize = np.dtype(dtype).itemsize
+    for start in range(0, count, chunk_size):
+        n = min(chunk_size, count - start)
+        yield start, np.memmap(path, dtype=dtype, mode=mode, offset=offset + start * itemsize, shape=(n,))
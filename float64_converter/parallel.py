@@ -0,0 +1,66 @@
+"""
+parallel.py
+
+Pool-based conversion for workloads that must go through the exact
+Decimal engine of real_to_float64 (long decimal strings, Decimals).
+
+Values are sent to the workers in chunks rather than one at a time to
+keep pickling and IPC overhead low, and the results come back in input
+order. Small batches are converted in the calling process, since starting
+a pool costs more than it saves.
+
+Conversions run under their own local Decimal context, so a thread pool
+can be used next to other Decimal code. Threads avoid pickling entirely
+and scale on free-threaded CPython builds; processes scale everywhere.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from .converter import real_to_float64
+
+# Below this many values a pool is not worth starting
+SERIAL_THRESHOLD = 2000
+
+POOLS = {"process": ProcessPoolExecutor, "thread": ThreadPoolExecutor}
+
+
+def convert_many(values, round=False, workers=None, chunksize=None, backend="process", seed=0):
+    """
+    Convert many real numbers to 64-bit IEEE 754 strings in parallel.
+
+    Input:
+        values (iterable): Numbers accepted by real_to_float64.
+        round (boolean): Round if True, chop if False, or a RoundingMode.
+        workers (int): Number of workers (default: os.cpu_count()).
+        chunksize (int): Values per task sent to a worker (default: about
+        four chunks per worker).
+        backend (str): "process" for a process pool, "thread" for a thread pool.
+        seed (int): Seed of stochastic rounding. Each value is keyed on its
+        position in values, so results do not depend on workers or chunksize.
+    Returns:
+        list: 64-bit binary strings in the same order as values.
+    """
+    if backend not in POOLS:
+        raise ValueError(f"backend must be one of {sorted(POOLS)}")
+
+    values = list(values)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(values) < SERIAL_THRESHOLD:
+        return _convert_chunk(values, 0, round, seed)
+
+    if chunksize is None:
+        chunksize = max(1, -(-len(values) // (workers * 4)))
+    starts = range(0, len(values), chunksize)
+    chunks = [values[i:i + chunksize] for i in starts]
+
+    with POOLS[backend](max_workers=workers) as pool:
+        results = pool.map(partial(_convert_chunk, round=round, seed=seed), chunks, starts)
+        return [bits for chunk in results for bits in chunk]
+
+
+def _convert_chunk(values, start=0, round=False, seed=0):
+    """Convert one chunk, starting at position start, in the current worker."""
+    return [real_to_float64(x, round, seed, start + i) for i, x in enumerate(values)]
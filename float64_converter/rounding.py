@@ -0,0 +1,137 @@
+"""
+rounding.py
+
+Rounding modes of the converter and of chop(), and the counter-based
+random numbers behind stochastic rounding.
+
+Every function that takes round=True/False (round to nearest, ties to
+even / chop) also takes a RoundingMode:
+
+    NEAREST_EVEN     to nearest, ties to even (round=True)
+    TOWARD_ZERO      chop (round=False)
+    TOWARD_POSITIVE  up, toward +inf
+    TOWARD_NEGATIVE  down, toward -inf
+    NEAREST_AWAY     to nearest, ties away from zero
+    STOCHASTIC       up in magnitude with probability equal to the part
+                     cut off, in units of the last place kept (so the
+                     result is exact on average)
+
+Values that leave the exponent range follow the converter's rules in
+every mode: they become signed infinities above it and, where subnormals
+are flushed, signed zeros below it.
+
+Stochastic rounding draws its random number for the value at position
+index of a computation from splitmix64, keyed on (seed, index) alone:
+
+    u = splitmix64(mix(seed) + (index + 1) * GAMMA) >> 11     (53 bits)
+
+and rounds up when u * 2^-53 < the part cut off. As nothing depends on
+the order in which values are visited, results are the same however an
+array is split into chunks or shared among workers, and the scalar
+converter, given the same seed and index, makes the same decision as
+the vectorized chop().
+"""
+
+import enum
+
+_MASK = (1 << 64) - 1
+GAMMA = 0x9E3779B97F4A7C15
+UNIFORM_BITS = 53
+
+
+class RoundingMode(enum.Enum):
+    """IEEE 754 rounding directions, ties-away and stochastic rounding."""
+    NEAREST_EVEN = "round"
+    TOWARD_ZERO = "chop"
+    TOWARD_POSITIVE = "up"
+    TOWARD_NEGATIVE = "down"
+    NEAREST_AWAY = "away"
+    STOCHASTIC = "stochastic"
+
+
+# Module-level names of the members (also quicker to look up than
+# attributes of the enum class)
+NEAREST_EVEN = RoundingMode.NEAREST_EVEN
+TOWARD_ZERO = RoundingMode.TOWARD_ZERO
+TOWARD_POSITIVE = RoundingMode.TOWARD_POSITIVE
+TOWARD_NEGATIVE = RoundingMode.TOWARD_NEGATIVE
+NEAREST_AWAY = RoundingMode.NEAREST_AWAY
+STOCHASTIC = RoundingMode.STOCHASTIC
+
+
+def resolve(round):
+    """
+    The RoundingMode meant by a round argument.
+
+    Input:
+        round (bool, RoundingMode or str): True (to nearest, ties to even),
+        False (chop), a RoundingMode or its value (e.g. "up").
+    Returns:
+        RoundingMode
+    """
+    if round is True:
+        return NEAREST_EVEN
+    if round is False:
+        return TOWARD_ZERO
+    if isinstance(round, RoundingMode):
+        return round
+    if isinstance(round, str):
+        try:
+            return RoundingMode(round)
+        except ValueError:
+            modes = ", ".join(repr(mode.value) for mode in RoundingMode)
+            raise ValueError(f"rounding mode must be one of {modes}") from None
+    return NEAREST_EVEN if round else TOWARD_ZERO
+
+
+def mix(z):
+    """splitmix64's output function on a 64-bit integer."""
+    z &= _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+def random_bits(seed, index):
+    """
+    The 64 random bits for position index under seed.
+
+    Input:
+        seed (int): Seed of the computation (any int, taken modulo 2^64).
+        index (int): Position of the value, >= 0.
+    Returns:
+        int: In [0, 2^64).
+    """
+    return mix(mix(seed) + (index + 1) * GAMMA)
+
+
+def round_up(mode, negative, q, r, den, seed=0, index=0):
+    """
+    Whether to add one unit in the last place to a truncated magnitude.
+
+    Input:
+        mode (RoundingMode): Rounding mode.
+        negative (bool): Sign of the value.
+        q (int): The truncated magnitude in units in the last place.
+        r, den (int): The part cut off is r / den units, 0 <= r < den.
+        seed, index (int): Key of the random number (STOCHASTIC only).
+    Returns:
+        bool
+    """
+    if r == 0:
+        return False
+    if mode is NEAREST_EVEN:
+        return 2*r > den or (2*r == den and q & 1 == 1)
+    if mode is TOWARD_ZERO:
+        return False
+    if mode is NEAREST_AWAY:
+        return 2*r >= den
+    if mode is TOWARD_POSITIVE:
+        return not negative
+    if mode is TOWARD_NEGATIVE:
+        return negative
+    if mode is STOCHASTIC:
+        # u < r / den with u = k * 2^-53, so k < r * 2^53 / den
+        k = random_bits(seed, index) >> (64 - UNIFORM_BITS)
+        return k * den < r << UNIFORM_BITS
+    raise ValueError(f"unknown rounding mode {mode!r}")
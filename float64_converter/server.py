@@ -0,0 +1,402 @@
+"""
+server.py
+
+A local conversion service, so that tools calling the converter share one
+warmed-up process instead of each paying the import and start-up costs.
+
+The server listens on a Unix socket (or a localhost TCP port) and speaks
+newline-delimited JSON. Each request line gets one response line with
+the same id; a connection may send many requests without waiting:
+
+    {"id": 1, "op": "encode", "value": "0.1", "round": true}
+    {"id": 1, "result": "0011111110111001100110011001100110011001100110011001100110011010"}
+
+    {"id": 2, "op": "decode", "value": "0100000000001001000000000000000000000000000000000000000000000000"}
+    {"id": 2, "result": "3.125"}
+
+    {"id": 3, "op": "stats"}
+    {"id": 3, "result": {"requests": 2, "p50_ms": 0.41, ...}}
+
+Errors come back as {"id": ..., "error": "..."}. encode calls
+real_to_float64 (value: a number or a decimal string; round: true, false
+or a rounding mode such as "up", see rounding.py) and decode returns
+str(float64_to_real(value)). Stochastic rounding draws its random number
+under the server's seed at the position of the request among the
+server's stochastic requests, so each one is rounded independently.
+
+Concurrent requests are gathered into micro-batches: the dispatcher sends
+whatever is queued (up to max_batch requests) as one job to an executor,
+and keeps at most one batch per worker in flight, so under load batches
+grow on their own and the per-job cost is shared. Identical requests that
+are waiting or in flight are coalesced and answered by one conversion
+(except stochastic ones, which each need their own draw).
+The event loop only parses and routes; every conversion runs in the
+executor, a process pool by default.
+
+Run:
+    python -m float64_converter.server serve --socket /tmp/f64.sock
+    python -m float64_converter.server load --socket /tmp/f64.sock --clients 1 8 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import deque
+
+from .converter import real_to_float64, float64_to_real
+from .parallel import POOLS
+from .rounding import resolve, STOCHASTIC
+
+OPS = ("encode", "decode")
+
+MAX_BATCH = 256
+LATENCY_WINDOW = 10_000  # Latest requests the percentiles are taken over
+LINE_LIMIT = 1 << 20     # Longest request line accepted, in bytes
+
+
+def convert_batch(requests):
+    """
+    Convert a batch of requests; this is the job run by the executor.
+
+    Input:
+        requests (list): (op, value, round, seed, index) tuples.
+    Returns:
+        list: ("result", str) or ("error", message) per request.
+    """
+    results = []
+    for op, value, round, seed, index in requests:
+        try:
+            if op == "encode":
+                results.append(("result", real_to_float64(value, round, seed, index)))
+            else:
+                results.append(("result", str(float64_to_real(value))))
+        except ArithmeticError:
+            # decimal.InvalidOperation from an unparsable number
+            results.append(("error", "not a valid number"))
+        except ValueError as e:
+            results.append(("error", str(e)))
+    return results
+
+
+class ConversionServer:
+    """
+    Micro-batching NDJSON conversion server.
+
+    Attributes:
+        backend (str): "process" or "thread" executor.
+        workers (int): Executor workers, and batches kept in flight.
+        max_batch (int): Most requests sent in one job.
+        max_delay (float): Seconds the dispatcher waits after the first
+        request of a batch for more to arrive (0: send what is queued).
+        seed (int): Seed of stochastic rounding.
+    """
+
+    def __init__(self, backend="process", workers=None, max_batch=MAX_BATCH, max_delay=0.0, seed=0):
+        if backend not in POOLS:
+            raise ValueError(f"backend must be one of {sorted(POOLS)}")
+        self.backend = backend
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.seed = seed
+
+        self._executor = None
+        self._server = None
+        self._dispatcher = None
+        self._queue = None
+        self._pending = {}   # Request key -> future, until answered
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._counts = dict.fromkeys(("requests", "errors", "coalesced", "batches", "batched"), 0)
+        self._max_queue_depth = 0
+        self._draws = 0      # Stochastic requests so far, the index of the next
+
+    async def start(self, path=None, host="127.0.0.1", port=0):
+        """
+        Start the executor (warmed up) and listen.
+
+        Input:
+            path (str): Unix socket path; if None, listen on host:port.
+            port (int): TCP port, 0 for any free one.
+        Returns:
+            str or tuple: The socket path, or the (host, port) bound.
+        """
+        loop = asyncio.get_running_loop()
+        self._executor = POOLS[self.backend](max_workers=self.workers)
+        await asyncio.gather(*(loop.run_in_executor(self._executor, convert_batch, [("encode", "1", False, 0, 0)])
+                               for _ in range(self.workers)))
+
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path, limit=LINE_LIMIT)
+            return path
+        self._server = await asyncio.start_server(self._handle, host, port, limit=LINE_LIMIT)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self):
+        """Stop listening and shut the executor down."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def convert(self, op, value, round=False):
+        """
+        Convert one value through the batching queue.
+
+        Returns:
+            str: The result.
+        Raises:
+            ValueError: if the value cannot be converted.
+        """
+        if op not in OPS:
+            raise ValueError(f"op must be one of {OPS + ('stats',)}")
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise ValueError("value must be a number or a string")
+
+        start = time.perf_counter()
+        self._counts["requests"] += 1
+        round = resolve(round)
+        index = 0
+        if op == "encode" and round is STOCHASTIC:
+            index = self._draws
+            self._draws += 1
+        # repr keeps apart values that compare equal but convert differently
+        # (0.0, -0.0); the index keeps stochastic requests apart
+        key = (op, type(value), repr(value), round, index)
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            self._queue.put_nowait((key, (op, value, round, self.seed, index)))
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        else:
+            self._counts["coalesced"] += 1
+
+        try:
+            kind, result = await asyncio.shield(future)
+        finally:
+            self._latencies.append(time.perf_counter() - start)
+        if kind == "error":
+            self._counts["errors"] += 1
+            raise ValueError(result)
+        return result
+
+    def stats(self):
+        """
+        Returns:
+            dict: Request, batch and coalescing counts, the current and
+            largest queue depth, and p50/p99 latency (ms) over the latest
+            LATENCY_WINDOW requests.
+        """
+        latencies = sorted(self._latencies)
+        batches = self._counts["batches"]
+        return {
+            **self._counts,
+            "mean_batch": self._counts["batched"] / batches if batches else 0.0,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "in_flight": len(self._pending),
+            "max_queue_depth": self._max_queue_depth,
+            "p50_ms": _percentile(latencies, 0.50) * 1000,
+            "p99_ms": _percentile(latencies, 0.99) * 1000,
+        }
+
+    async def _dispatch(self):
+        """Send queued requests to the executor in batches, one per free worker."""
+        while True:
+            keys = [await self._queue.get()]
+            if self.max_delay:
+                await asyncio.sleep(self.max_delay)
+            # Requests keep queuing while every worker is busy
+            await self._slots.acquire()
+            while len(keys) < self.max_batch and not self._queue.empty():
+                keys.append(self._queue.get_nowait())
+            asyncio.create_task(self._run_batch(keys))
+
+    async def _run_batch(self, keys):
+        self._counts["batches"] += 1
+        self._counts["batched"] += len(keys)
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self._executor, convert_batch,
+                                                 [request for _, request in keys])
+        except Exception as e:
+            results = [("error", f"conversion failed: {e}")] * len(keys)
+        finally:
+            self._slots.release()
+        for (key, _), result in zip(keys, results):
+            future = self._pending.pop(key)
+            if not future.done():
+                future.set_result(result)
+
+    async def _handle(self, reader, writer):
+        """Serve one connection: answer each request line as it completes."""
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    task = asyncio.create_task(self._respond(line, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        except (ConnectionError, ValueError):
+            pass  # Client went away, or sent a line over LINE_LIMIT
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def _respond(self, line, writer):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            request_id = request.get("id")
+            if request.get("op") == "stats":
+                response = {"id": request_id, "result": self.stats()}
+            else:
+                result = await self.convert(request.get("op"), request.get("value"), request.get("round", False))
+                response = {"id": request_id, "result": result}
+        except ValueError as e:  # json.JSONDecodeError is a ValueError
+            response = {"id": request_id, "error": str(e)}
+
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+
+
+async def connect(address):
+    """Open a connection to a server at a socket path or (host, port)."""
+    if isinstance(address, str):
+        return await asyncio.open_unix_connection(address, limit=LINE_LIMIT)
+    return await asyncio.open_connection(*address, limit=LINE_LIMIT)
+
+
+async def load(address, clients=8, requests=2000, op="encode", round=False, seed=0):
+    """
+    Load generator: clients connections each send their share of requests
+    one at a time (the next once the previous is answered).
+
+    Input:
+        address (str or tuple): Server socket path or (host, port).
+        clients (int): Concurrent connections.
+        requests (int): Total requests, split between the clients.
+        op (str): "encode" (random decimal strings) or "decode" (random
+        64-bit strings). Every value is distinct, so nothing is coalesced.
+    Returns:
+        dict: clients, requests, errors, seconds, throughput (requests/s)
+        and the client-side p50_ms and p99_ms.
+    """
+    rng = random.Random(seed)
+    if op == "encode":
+        values = [repr(rng.uniform(-1e6, 1e6)) for _ in range(requests)]
+    else:
+        values = [format(rng.getrandbits(64), "064b") for _ in range(requests)]
+    latencies = []
+    errors = [0]
+
+    async def client(share):
+        reader, writer = await connect(address)
+        try:
+            for i, value in share:
+                start = time.perf_counter()
+                writer.write(json.dumps({"id": i, "op": op, "value": value, "round": round}).encode() + b"\n")
+                response = json.loads(await reader.readline())
+                latencies.append(time.perf_counter() - start)
+                errors[0] += "error" in response
+        finally:
+            writer.close()
+
+    shares = [list(enumerate(values))[c::clients] for c in range(clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(client(share) for share in shares))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "clients": clients,
+        "requests": requests,
+        "errors": errors[0],
+        "seconds": seconds,
+        "throughput": requests / seconds,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+
+def _percentile(ordered, q):
+    """The q-quantile of a sorted list (nearest rank), 0.0 if empty."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _serve_forever(args):
+    server = ConversionServer(args.backend, args.workers, args.max_batch, args.max_delay, args.seed)
+    address = await server.start(args.socket, port=args.port)
+    print(f"listening on {address}", file=sys.stderr)
+    try:
+        while True:
+            await asyncio.sleep(args.stats_every or 3600)
+            if args.stats_every:
+                print(json.dumps(server.stats()), file=sys.stderr)
+    finally:
+        await server.close()
+        if args.socket:
+            os.unlink(args.socket)
+
+
+async def _load_all(args):
+    address = args.socket or ("127.0.0.1", args.port)
+    for clients in args.clients:
+        report = await load(address, clients, args.requests, args.op, args.round)
+        print(f"{clients:>4} clients: {report['throughput']:>10,.0f} req/s  "
+              f"p50 {report['p50_ms']:.2f} ms  p99 {report['p99_ms']:.2f} ms  "
+              f"{report['errors']} errors")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m float64_converter.server",
+        description="Local NDJSON conversion server with micro-batching, and a load generator.")
+    parser.add_argument("command", choices=["serve", "load"])
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument("--socket", help="Unix socket path")
+    address.add_argument("--port", type=int, help="TCP port on 127.0.0.1")
+    parser.add_argument("--backend", choices=sorted(POOLS), default="process",
+                        help="serve: executor for conversions (default: process)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="serve: executor workers (default: CPU count)")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH,
+                        help=f"serve: most requests per batch (default: {MAX_BATCH})")
+    parser.add_argument("--max-delay", type=float, default=0.0,
+                        help="serve: seconds to wait for a batch to fill (default: 0)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="serve: seed of stochastic rounding (default: 0)")
+    parser.add_argument("--stats-every", type=float, default=0.0,
+                        help="serve: print stats to stderr every this many seconds")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32],
+                        help="load: client counts to run (default: 1 8 32)")
+    parser.add_argument("--requests", type=int, default=5000,
+                        help="load: requests per run (default: 5000)")
+    parser.add_argument("--op", choices=OPS, default="encode", help="load: operation (default: encode)")
+    parser.add_argument("--round", action="store_true", help="load: round instead of chop")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(_serve_forever(args) if args.command == "serve" else _load_all(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+"""
+table.py
+
+Storage for bulk conversions shown in the GUI batch tab.
+
+A ConversionTable keeps one row per input number in flat arrays: the
+inputs as one bytes buffer with int64 offsets (InputLines, so a long line
+costs only its own length), the chopped and rounded 64-bit patterns as
+uint64, and a sparse dict of error messages for inputs that are not numbers.
+Display strings (sign/exponent/fraction fields, decimal values) are made
+only for the rows asked for, so a million rows cost a few tens of MB
+and the view never formats more than what is on screen.
+
+read_file() reads a file of numbers in chunks; it and convert_lines(),
+which converts one chunk of inputs, are the jobs the GUI sends to its
+worker process (convert_lines chunk by chunk, to drive a progress bar).
+"""
+
+import csv
+from array import array
+
+import numpy as np
+
+from .batch import bits_to_strings, float64_to_str_array
+from .converter import real_to_float64
+
+COLUMNS = ("Input", "Sign", "Exponent", "Fraction", "Chopped", "Rounded", "Error")
+READ_CHUNK = 1 << 20  # Bytes read from a file at a time
+
+
+class InputLines:
+    """
+    Byte strings of any lengths stored end to end: line i is
+    data[offsets[i]:offsets[i + 1]].
+
+    Attributes:
+        data (bytes): The lines, concatenated.
+        offsets (ndarray): int64 start of every line, and the end of the last.
+    """
+
+    def __init__(self, data=b"", offsets=None):
+        self.data = data
+        self.offsets = np.zeros(1, dtype=np.int64) if offsets is None else offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, rows):
+        """The lines of a slice, as a new InputLines holding only their bytes."""
+        start, stop, step = rows.indices(len(self))
+        if step != 1:
+            raise ValueError("only contiguous slices of lines are supported")
+        stop = max(start, stop)
+        offsets = self.offsets[start:stop + 1]
+        return InputLines(self.data[offsets[0]:offsets[-1]], offsets - offsets[0])
+
+    @property
+    def nbytes(self):
+        return len(self.data) + self.offsets.nbytes
+
+    def tolist(self):
+        """The lines as a list of bytes."""
+        data, bounds = self.data, self.offsets.tolist()
+        return [data[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def read_lines(lines):
+    """
+    Collect the non-blank lines of an iterable (a file or a list of str
+    or bytes) into the InputLines of a ConversionTable.
+    """
+    data = bytearray()
+    offsets = array("q", [0])
+    for line in lines:
+        line = line.strip()
+        if line:
+            data += line.encode() if isinstance(line, str) else line
+            offsets.append(len(data))
+    return InputLines(bytes(data), np.frombuffer(offsets, dtype=np.int64))
+
+
+def read_file(path, chunk_size=READ_CHUNK):
+    """
+    Read the non-blank lines of a file, chunk_size bytes at a time.
+
+    Input:
+        path (str): File of numbers, one per line.
+        chunk_size (int): Bytes read at a time.
+    Returns:
+        InputLines
+    """
+    def lines():
+        with open(path, "rb") as f:
+            tail = b""
+            while chunk := f.read(chunk_size):
+                parts = (tail + chunk).split(b"\n")
+                tail = parts.pop()  # Unfinished until the next chunk
+                yield from parts
+            yield tail
+
+    return read_lines(lines())
+
+
+def convert_lines(inputs):
+    """
+    Convert a chunk of inputs both ways.
+
+    Input:
+        inputs (InputLines): Numbers as text.
+    Returns:
+        tuple: (chopped, rounded, errors) where chopped and rounded are
+        uint64 arrays of patterns and errors maps chunk indexes of invalid
+        inputs to messages.
+    """
+    n = len(inputs)
+    chopped = np.zeros(n, dtype=np.uint64)
+    rounded = np.zeros(n, dtype=np.uint64)
+    errors = {}
+
+    for i, line in enumerate(inputs.tolist()):
+        text = line.decode(errors="replace")
+        try:
+            chopped[i] = int(real_to_float64(text), 2)
+            rounded[i] = int(real_to_float64(text, round=True), 2)
+        except ArithmeticError:
+            # decimal.InvalidOperation from an unparsable number
+            errors[i] = "not a valid number"
+        except ValueError as e:
+            errors[i] = str(e)
+
+    return chopped, rounded, errors
+
+
+class ConversionTable:
+    """
+    Results of converting an array of inputs, filled in chunk by chunk.
+
+    Attributes:
+        inputs (InputLines): The input texts.
+        chopped, rounded (ndarray): uint64 patterns.
+        errors (dict): Row index -> error message.
+        done (int): Number of rows converted so far (rows [0, done)).
+    """
+
+    def __init__(self, inputs):
+        self.inputs = inputs
+        self.chopped = np.zeros(len(inputs), dtype=np.uint64)
+        self.rounded = np.zeros(len(inputs), dtype=np.uint64)
+        self.errors = {}
+        self.done = 0
+
+    def __len__(self):
+        return len(self.inputs)
+
+    def store(self, start, result):
+        """Store the result of convert_lines(inputs[start:...])."""
+        chopped, rounded, errors = result
+        stop = start + len(chopped)
+        self.chopped[start:stop] = chopped
+        self.rounded[start:stop] = rounded
+        self.errors.update((start + i, message) for i, message in errors.items())
+        self.done = max(self.done, stop)
+
+    def rows(self, start, stop):
+        """
+        Return the display rows [start, stop) as tuples of strings in
+        COLUMNS order. Rows not converted yet show only their input.
+        """
+        stop = min(stop, len(self))
+        if stop <= start:
+            return []
+
+        inputs = [line.decode(errors="replace") for line in self.inputs[start:stop].tolist()]
+        bits = bits_to_strings(self.chopped[start:stop]).tolist()
+        chopped = float64_to_str_array(self.chopped[start:stop]).tolist()
+        rounded = float64_to_str_array(self.rounded[start:stop]).tolist()
+
+        rows = []
+        for i, text in enumerate(inputs):
+            row = start + i
+            if row >= self.done:
+                rows.append((text, "", "", "", "", "", ""))
+            elif row in self.errors:
+                rows.append((text, "", "", "", "", "", self.errors[row]))
+            else:
+                b = bits[i].decode()
+                rows.append((text, b[0], b[1:12], b[12:], chopped[i], rounded[i], ""))
+        return rows
+
+    def write_csv(self, f, start=0, stop=None, header=True):
+        """
+        Write rows [start, stop) to a text file as CSV. Call repeatedly
+        with consecutive ranges (header only on the first) to stream a
+        large table out in chunks.
+        """
+        writer = csv.writer(f)
+        if header:
+            writer.writerow(COLUMNS)
+        writer.writerows(self.rows(start, len(self) if stop is None else stop))
@@ -0,0 +1,222 @@
+"""
+ulp.py
+
+Neighbours, spacing and distances of doubles, computed with integer
+operations on their 64-bit patterns (no Decimal or float arithmetic).
+
+The key is the ordinal of a pattern: its position among all doubles in
+increasing order, with both zeros at 0,
+
+     ordinal(p) = p                  for a positive sign bit (0)
+     ordinal(p) = -(p & ~sign bit)   for a negative one
+
+so the ordinals of consecutive doubles differ by 1 across zeros,
+subnormals and exponent boundaries, and ±inf are the ends of the range.
+next_up/next_down step the ordinal (keeping the sign of a zero result as
+IEEE 754 nextUp/nextDown do), and the ULP distance between two doubles
+is the difference of their ordinals. NaN has no place in the order and
+raises ValueError.
+
+Scalar functions take and return 64-bit binary strings; the _array
+versions take and return uint64 arrays of patterns (e.g. from
+real_to_float64_array(x, packed=True) or x.view(np.uint64)).
+"""
+
+import numpy as np
+
+_SIGN = 1 << 63
+_ABS = _SIGN - 1
+_INF = 0x7FF0000000000000
+
+SIGN_MASK = np.uint64(_SIGN)
+ABS_MASK = np.uint64(_ABS)
+INF_BITS = np.uint64(_INF)
+
+
+def ordinal(bits):
+    """
+    Position of a double in the order of all doubles (both zeros are 0).
+
+    Input:
+        bits (str): 64-bit binary string.
+    Returns:
+        int: Between -ordinal(+inf) and ordinal(+inf) = 0x7FF0000000000000.
+    """
+    p = _parse(bits)
+    return -(p & _ABS) if p & _SIGN else p
+
+
+def from_ordinal(n):
+    """
+    The double at an ordinal (0 gives +0).
+
+    Input:
+        n (int): Ordinal, |n| <= 0x7FF0000000000000.
+    Returns:
+        str: 64-bit binary string.
+    """
+    if abs(n) > _INF:
+        raise ValueError("ordinal out of range")
+    return _format(_SIGN | -n if n < 0 else n)
+
+
+def next_up(bits):
+    """
+    The next double above (+inf stays +inf; the result has the input's
+    sign when it is zero, so next_up(-min subnormal) is -0).
+
+    Input:
+        bits (str): 64-bit binary string.
+    Returns:
+        str: 64-bit binary string.
+    """
+    return _step(bits, 1)
+
+
+def next_down(bits):
+    """The next double below (-inf stays -inf). See next_up."""
+    return _step(bits, -1)
+
+
+def ulp(bits):
+    """
+    Spacing of the doubles at |x|: the gap from |x| to the next double
+    away from zero (for the largest double, the gap below it).
+
+    Input:
+        bits (str): 64-bit binary string.
+    Returns:
+        str: 64-bit binary string of the (positive) spacing; +inf for ±inf.
+    """
+    p = _parse(bits)
+    return _format(_ulp_bits((p & _ABS) >> 52))
+
+
+def ulp_distance(a, b):
+    """
+    Number of steps between neighbouring doubles from a to b (0 for +0 and -0).
+
+    Input:
+        a, b (str): 64-bit binary strings.
+    Returns:
+        int: |ordinal(b) - ordinal(a)|.
+    """
+    return abs(ordinal(b) - ordinal(a))
+
+
+def ordinal_array(bits):
+    """
+    Vectorized ordinal().
+
+    Input:
+        bits (ndarray): uint64 patterns.
+    Returns:
+        ndarray: int64 ordinals with the shape of bits.
+    """
+    bits = _check_array(bits, check_nan=False)
+    magnitude = bits & ABS_MASK
+    if (magnitude > INF_BITS).any():
+        raise ValueError("NaN has no neighbours or ordinal")
+    magnitude = magnitude.view(np.int64)
+    # Branch-free negation: the sign bit, shifted arithmetically, is 0 or -1
+    sign = bits.view(np.int64) >> 63
+    return (magnitude ^ sign) - sign
+
+
+def from_ordinal_array(n):
+    """Vectorized from_ordinal(): uint64 patterns of int64 ordinals."""
+    n = np.asarray(n, dtype=np.int64)
+    if (np.abs(n) > _INF).any():
+        raise ValueError("ordinal out of range")
+    return np.where(n < 0, (-n).view(np.uint64) | SIGN_MASK, n.view(np.uint64))
+
+
+def next_up_array(bits):
+    """Vectorized next_up() on uint64 patterns."""
+    return _step_array(bits, 1)
+
+
+def next_down_array(bits):
+    """Vectorized next_down() on uint64 patterns."""
+    return _step_array(bits, -1)
+
+
+def ulp_array(bits):
+    """Vectorized ulp(): uint64 patterns of the spacings."""
+    bits = _check_array(bits)
+    c = (bits & ABS_MASK) >> np.uint64(52)
+    one = np.uint64(1)
+    # Subnormal spacings 2^(c-1075) are the patterns 1 << (c - 1)
+    subnormal = one << (np.clip(c, one, np.uint64(53)) - one)
+    normal = (np.maximum(c, np.uint64(53)) - np.uint64(52)) << np.uint64(52)
+    out = np.where(c > 52, normal, np.where(c == 0, one, subnormal))
+    out[c == 0x7FF] = INF_BITS
+    return out
+
+
+def ulp_distance_array(a, b):
+    """
+    Vectorized ulp_distance().
+
+    Input:
+        a, b (ndarray): uint64 patterns (broadcast together).
+    Returns:
+        ndarray: uint64 distances (the largest, from -inf to +inf, does not
+        fit an int64).
+    """
+    oa, ob = ordinal_array(a), ordinal_array(b)
+    # Two's complement differences are exact modulo 2^64
+    d = ob.view(np.uint64) - oa.view(np.uint64)
+    np.negative(d, out=d, where=oa > ob)
+    return d
+
+
+def _parse(bits):
+    if not isinstance(bits, str) or len(bits) != 64 or bits.strip('01'):
+        raise ValueError("Input must be a 64-bit binary string")
+    p = int(bits, 2)
+    if p & _ABS > _INF:
+        raise ValueError("NaN has no neighbours or ordinal")
+    return p
+
+
+def _format(p):
+    return f"{p:064b}"
+
+
+def _ulp_bits(c):
+    """Pattern of the spacing of doubles with biased exponent c."""
+    if c == 0x7FF:
+        return _INF
+    if c > 52:
+        return (c - 52) << 52
+    return 1 << max(c - 1, 0)
+
+
+def _step(bits, direction):
+    p = _parse(bits)
+    n = -(p & _ABS) if p & _SIGN else p
+    if abs(n + direction) > _INF:
+        return bits  # ±inf stays
+    n += direction
+    if n == 0:
+        return _format(p & _SIGN)  # Signed zero keeps the input's sign
+    return _format(_SIGN | -n if n < 0 else n)
+
+
+def _step_array(bits, direction):
+    bits = np.asarray(bits)
+    n = ordinal_array(bits)
+    at_end = n == direction * _INF
+    stepped = from_ordinal_array(np.where(at_end, n, n + direction))
+    # Zero results keep the input's sign
+    return np.where(n + direction == 0, bits & SIGN_MASK, stepped)
+
+
+def _check_array(bits, check_nan=True):
+    bits = np.asarray(bits)
+    if bits.dtype != np.uint64:
+        raise TypeError("Input must be a uint64 array of 64-bit patterns")
+    if check_nan and ((bits & ABS_MASK) > INF_BITS).any():
+        raise ValueError("NaN has no neighbours or ordinal")
+    return bits
@@ -0,0 +1,408 @@
+"""
+verify.py
+
+Differential verification of the converter against the machine's native
+IEEE 754 doubles, for as many bit patterns as you care to run.
+
+Bit patterns are drawn in shards: uniform random patterns (so every
+exponent is covered), plus subnormals, edge exponents and edge fractions.
+For each pattern p with native double x the checks are:
+    encode           real_to_float64(x, round=True)
+    encode_repr      real_to_float64(repr(x), round=True)
+    encode_midpoint  real_to_float64 of the exact midpoint between |x| and
+                     the next double, which must round to the even one
+    encode_near_tie  the midpoint moved 2**-60 ulp up and down, which must
+                     round to the nearer double
+    decode           float(float64_to_real(p)), the 70-digit Decimal result
+    decode_float     float64_to_real(p, as_float=True)
+    decode_shortest  float(float64_to_str(p)), which must give p back
+    decode_exact     float64_to_str(p, exact=True), which must equal Decimal(x)
+Expected values follow the converter's documented policy: results below
+the smallest normal are flushed to a signed zero when encoding, NaN is
+encoded as one quiet NaN pattern, and both zeros decode to 0.0 (but
+format with their sign).
+
+Shard i always draws the same patterns for a given seed, so a run is
+reproducible for any number of workers. With a checkpoint file (JSON
+lines: the run configuration, then one line per finished shard), finished
+shards are appended as they complete and skipped when the run is resumed.
+Every mismatch is counted; the first MAX_MISMATCHES of a shard are kept
+as examples and minimized (bits cleared while it still fails), and the
+report lists the distinct minimized patterns with throughput numbers.
+
+Run:
+    python -m float64_converter.verify --total 100000000 --workers 8 --checkpoint run.jsonl
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+from concurrent.futures import as_completed
+from decimal import Decimal, localcontext
+
+import numpy as np
+
+from .batch import SIGN_MASK, EXPONENT_MASK, FRACTION_MASK
+from .converter import real_to_float64, float64_to_real, float64_to_str
+from .parallel import POOLS
+
+CHECKS = ("encode", "encode_repr", "encode_midpoint", "encode_near_tie", "decode", "decode_float",
+          "decode_shortest", "decode_exact")
+
+SHARD_SIZE = 10_000
+MAX_MISMATCHES = 100   # Mismatches kept (and minimized) per shard; all are counted
+
+_DOUBLE = struct.Struct('>d')
+_UINT64 = struct.Struct('>Q')
+_SIGN = 1 << 63
+_ABS = _SIGN - 1
+_INF = 0x7FF0000000000000
+_XMIN = 0x0010000000000000
+_QUIET_NAN = 0x7FF8000000000000
+
+_EDGE_FRACTIONS = np.array([0, 1, 2, 1 << 51, (1 << 52) - 2, (1 << 52) - 1], dtype=np.uint64)
+_EDGE_EXPONENTS = np.array([0, 1, 2, 1022, 1023, 1024, 2045, 2046, 2047], dtype=np.uint64) << np.uint64(52)
+
+
+def generate(rng, n):
+    """
+    Draw n bit patterns: 5/8 uniform, 1/8 subnormal (or zero), 1/8 with an
+    edge exponent and 1/8 with an edge fraction.
+
+    Input:
+        rng (numpy.random.Generator): Random source.
+        n (int): Number of patterns.
+    Returns:
+        ndarray: uint64 patterns.
+    """
+    bits = rng.integers(0, 2**64, n, dtype=np.uint64)
+    kind = rng.integers(0, 8, n)
+
+    subnormal = kind == 0
+    bits[subnormal] &= SIGN_MASK | FRACTION_MASK
+
+    edge_exponent = kind == 1
+    bits[edge_exponent] = ((bits[edge_exponent] & (SIGN_MASK | FRACTION_MASK))
+                           | rng.choice(_EDGE_EXPONENTS, edge_exponent.sum()))
+
+    edge_fraction = kind == 2
+    bits[edge_fraction] = ((bits[edge_fraction] & (SIGN_MASK | EXPONENT_MASK))
+                           | rng.choice(_EDGE_FRACTIONS, edge_fraction.sum()))
+    return bits
+
+
+def check(name, p):
+    """
+    Run one check on the pattern p (an int).
+
+    Returns:
+        None if the converter agrees with the native double, otherwise a
+        tuple (got, expected) of printable values.
+    """
+    x = _float(p)
+    magnitude = p & _ABS
+    sign = p & _SIGN
+
+    if name == "encode":
+        return _compare(real_to_float64(x, round=True), _encoded(p))
+
+    if name == "encode_repr":
+        return _compare(real_to_float64(repr(x), round=True), _encoded(p))
+
+    if name in ("encode_midpoint", "encode_near_tie"):
+        if magnitude >= _INF - 1:
+            return None  # No finite double above
+        low, high = Decimal(_float(magnitude)), Decimal(_float(magnitude + 1))
+        with localcontext() as ctx:
+            ctx.prec = 1200  # Exact for any two neighbouring doubles
+            midpoint = (low + high) / 2
+            if name == "encode_midpoint":
+                cases = [(midpoint, magnitude + (magnitude & 1))]
+            else:
+                delta = (high - low) / 2**60
+                cases = [(midpoint + delta, magnitude + 1), (midpoint - delta, magnitude)]
+
+        for value, nearest in cases:
+            if value < Decimal(_float(_XMIN)):
+                nearest = 0  # Flushed
+            value = value.copy_negate() if sign else value
+            mismatch = _compare(real_to_float64(value, round=True), sign | nearest)
+            if mismatch:
+                return mismatch
+        return None
+
+    if name == "decode":
+        got = float(float64_to_real(_bit_string(p)))
+        return _compare_float(got, _decoded(p))
+
+    if name == "decode_float":
+        got = float64_to_real(_bit_string(p), as_float=True)
+        return _compare_float(got, _decoded(p))
+
+    if name == "decode_shortest":
+        return _compare_float(float(float64_to_str(_bit_string(p))), x)
+
+    if name == "decode_exact":
+        got = float64_to_str(_bit_string(p), exact=True)
+        if magnitude >= _INF:  # inf or NaN
+            return None if got == repr(x) else (got, repr(x))
+        value, expected = Decimal(got), Decimal(x)
+        if value == expected and value.is_signed() == expected.is_signed():
+            return None
+        return got, str(expected)
+
+    raise ValueError(f"check must be one of {CHECKS}")
+
+
+def minimize(name, p):
+    """
+    Clear bits of a failing pattern, lowest first, as long as the check
+    still fails, to get a simpler pattern showing the same problem.
+    """
+    for bit in range(64):
+        q = p & ~(1 << bit)
+        if q != p and _fails(name, q):
+            p = q
+    return p
+
+
+def run_shard(index, n, seed=0, checks=CHECKS):
+    """
+    Verify the n patterns of shard index.
+
+    Returns:
+        dict: "index", "patterns", "checks" (number run), "seconds",
+        "mismatch_count" (every failed check) and "mismatches" (list of
+        dicts with check, pattern, minimized, got and expected; the first
+        MAX_MISMATCHES).
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+    patterns = generate(rng, n).tolist()
+
+    mismatches = []
+    mismatch_count = 0
+    for p in patterns:
+        for name in checks:
+            try:
+                mismatch = check(name, p)
+            except Exception as e:
+                mismatch = (f"{type(e).__name__}: {e}", "no error")
+            if not mismatch:
+                continue
+            mismatch_count += 1
+            if len(mismatches) < MAX_MISMATCHES:
+                got, expected = mismatch
+                mismatches.append({
+                    "check": name,
+                    "pattern": f"{p:016x}",
+                    "minimized": f"{minimize(name, p):016x}",
+                    "got": got,
+                    "expected": expected,
+                })
+
+    return {
+        "index": index,
+        "patterns": n,
+        "checks": n * len(checks),
+        "seconds": time.perf_counter() - start,
+        "mismatch_count": mismatch_count,
+        "mismatches": mismatches,
+    }
+
+
+def verify(total, shard_size=SHARD_SIZE, seed=0, checks=CHECKS, workers=None,
+           checkpoint=None, backend="process", progress=None):
+    """
+    Verify total patterns in shards across a pool.
+
+    Input:
+        total (int): Number of patterns.
+        shard_size (int): Patterns per shard.
+        seed (int): Root seed.
+        checks (tuple of str): Checks to run (default: all of CHECKS).
+        workers (int): Number of workers (default: os.cpu_count()).
+        checkpoint (str): JSON lines file finished shards are appended to;
+        shards already in it are skipped.
+        backend (str): "process" or "thread".
+        progress (callable): Called with each finished shard's dict.
+    Returns:
+        dict: Report with the run configuration, pattern and check counts,
+        throughput, and the distinct minimized mismatches.
+    """
+    if backend not in POOLS:
+        raise ValueError(f"backend must be one of {sorted(POOLS)}")
+    unknown = set(checks) - set(CHECKS)
+    if unknown:
+        raise ValueError(f"Unknown checks: {sorted(unknown)}")
+
+    config = {"total": total, "shard_size": shard_size, "seed": seed, "checks": list(checks)}
+    shards = _load_checkpoint(checkpoint, config)
+
+    sizes = {i: min(shard_size, total - i * shard_size) for i in range(-(-total // shard_size))}
+    todo = [i for i in sizes if i not in shards]
+    workers = workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+
+    def finished(result):
+        shards[result["index"]] = result
+        _save_checkpoint(checkpoint, config, result)
+        if progress:
+            progress(result)
+
+    if workers == 1 or len(todo) <= 1:
+        for i in todo:
+            finished(run_shard(i, sizes[i], seed, tuple(checks)))
+    else:
+        with POOLS[backend](max_workers=workers) as pool:
+            futures = [pool.submit(run_shard, i, sizes[i], seed, tuple(checks)) for i in todo]
+            for future in as_completed(futures):
+                finished(future.result())
+
+    return _report(config, shards, time.perf_counter() - start, sum(sizes[i] for i in todo))
+
+
+def _report(config, shards, wall_seconds, run_patterns):
+    patterns = sum(s["patterns"] for s in shards.values())
+    n_checks = sum(s["checks"] for s in shards.values())
+    worker_seconds = sum(s["seconds"] for s in shards.values())
+
+    distinct = {}
+    n_mismatches = 0
+    for shard in shards.values():
+        n_mismatches += shard["mismatch_count"]
+        for m in shard["mismatches"]:
+            distinct.setdefault((m["check"], m["minimized"]), m)
+
+    return {
+        "config": config,
+        "patterns": patterns,
+        "checks": n_checks,
+        "mismatches": n_mismatches,
+        "minimized": sorted(distinct.values(), key=lambda m: (m["check"], m["minimized"])),
+        "wall_seconds": wall_seconds,
+        "patterns_per_second": run_patterns / wall_seconds if wall_seconds else 0.0,
+        "checks_per_worker_second": n_checks / worker_seconds if worker_seconds else 0.0,
+    }
+
+
+def _load_checkpoint(path, config):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r+") as f:
+        text = f.read()
+        # A line cut short by an interruption is dropped (and truncated
+        # away, so that the next shard starts a line of its own)
+        complete = text.rfind("\n") + 1
+        if complete < len(text):
+            f.truncate(complete)
+    lines = text[:complete].splitlines()
+    if not lines:
+        return {}
+    saved = json.loads(lines[0])["config"]
+    if saved != config:
+        raise ValueError(f"Checkpoint {path} is for a different run: {saved}")
+    shards = (json.loads(line) for line in lines[1:])
+    return {shard["index"]: shard for shard in shards}
+
+
+def _save_checkpoint(path, config, shard):
+    """Append one finished shard, after the configuration line of a new file."""
+    if not path:
+        return
+    with open(path, "a") as f:
+        if f.tell() == 0:
+            f.write(json.dumps({"config": config}) + "\n")
+        f.write(json.dumps(shard) + "\n")
+
+
+def _fails(name, p):
+    try:
+        return check(name, p) is not None
+    except Exception:
+        return True
+
+
+def _float(p):
+    return _DOUBLE.unpack(_UINT64.pack(p))[0]
+
+
+def _bit_string(p):
+    return format(p, "064b")
+
+
+def _encoded(p):
+    """Expected encoding of the double with pattern p."""
+    magnitude = p & _ABS
+    if magnitude > _INF:
+        return _QUIET_NAN
+    if magnitude < _XMIN:
+        return p & _SIGN  # Zero, or a subnormal flushed to a signed zero
+    return p
+
+
+def _decoded(p):
+    """Expected decoding of pattern p."""
+    if p & _ABS == 0:
+        return 0.0
+    return _float(p)
+
+
+def _compare(got, expected):
+    if got == _bit_string(expected):
+        return None
+    return got, _bit_string(expected)
+
+
+def _compare_float(got, expected):
+    if expected != expected:
+        return None if got != got else (repr(got), "nan")
+    if got == expected and _DOUBLE.pack(got) == _DOUBLE.pack(expected):
+        return None
+    return repr(got), repr(expected)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m float64_converter.verify",
+        description="Check the converter against native doubles for random and structured bit patterns.")
+    parser.add_argument("--total", type=int, default=1_000_000, help="patterns to check (default: 1000000)")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE,
+                        help=f"patterns per shard (default: {SHARD_SIZE})")
+    parser.add_argument("--seed", type=int, default=0, help="root seed (default: 0)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--checks", nargs="+", choices=CHECKS, default=list(CHECKS),
+                        help="checks to run (default: all)")
+    parser.add_argument("--checkpoint", help="JSON lines file to save progress to and resume from")
+    parser.add_argument("-o", "--output", default="-", help="report file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    done = [0]
+
+    def progress(shard):
+        done[0] += shard["patterns"]
+        print(f"shard {shard['index']}: {shard['patterns']} patterns, "
+              f"{shard['mismatch_count']} mismatches, {done[0]} this run",
+              file=sys.stderr)
+
+    report = verify(args.total, args.shard_size, args.seed, tuple(args.checks), args.workers,
+                    args.checkpoint, progress=progress)
+
+    document = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(document)
+    else:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    print(f"{report['patterns']} patterns, {report['checks']} checks, "
+          f"{report['mismatches']} mismatches ({len(report['minimized'])} distinct), "
+          f"{report['patterns_per_second']:,.0f} patterns/s", file=sys.stderr)
+    return 1 if report["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
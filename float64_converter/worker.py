@@ -0,0 +1,145 @@
+"""
+worker.py
+
+Runs conversions in a background process so a caller with an event loop
+(the Tk GUI) never blocks on them.
+
+A BackgroundConverter owns one worker process. submit() sends it a job
+and returns at once; the caller then calls poll() periodically (e.g. from
+root.after) until the result arrives. Only the latest job matters:
+results of earlier jobs are dropped when they arrive, and a job still
+running when a newer one is submitted is killed together with its process
+if it has been running for a while. A job that runs longer than the
+timeout is cancelled the same way.
+
+A process, not a thread, is used because a pathological input (10**10**8,
+a million-digit Decimal string) spends its time in C code that holds the
+GIL and can only be stopped by killing the process.
+"""
+
+import itertools
+import multiprocessing
+import queue
+import time
+
+
+class BackgroundConverter:
+    """
+    Run func(*args) jobs in a worker process, one current job at a time.
+
+    Attributes:
+        timeout (float or None): Seconds after which poll() cancels the
+        current job and reports "timeout".
+        restart_after (float): A job still running this many seconds after
+        it started is killed when a newer job is submitted, instead of
+        letting it finish and dropping its result.
+    """
+
+    def __init__(self, timeout=5.0, restart_after=0.25, context=None):
+        self.timeout = timeout
+        self.restart_after = restart_after
+        self._context = context or multiprocessing.get_context("spawn")
+        self._ids = itertools.count(1)
+        self._process = None
+        self._pending = None  # (job id, start time) of the current job
+
+    def start(self):
+        """Start the worker process (done on demand by submit)."""
+        if self._process is not None and self._process.is_alive():
+            return
+        self._requests = self._context.Queue()
+        self._results = self._context.Queue()
+        self._process = self._context.Process(
+            target=_serve, args=(self._requests, self._results), daemon=True)
+        self._process.start()
+
+    @property
+    def busy(self):
+        """True while the current job has not been collected by poll()."""
+        return self._pending is not None
+
+    def submit(self, func, *args):
+        """
+        Queue func(*args) as the current job, superseding any earlier one.
+
+        Input:
+            func: A picklable callable (a module-level function).
+            args: Its picklable arguments.
+        Returns:
+            int: The job id, as reported by poll().
+        """
+        if self._pending is not None and time.monotonic() - self._pending[1] > self.restart_after:
+            self._stop()
+        self.start()
+
+        job = next(self._ids)
+        self._requests.put((job, func, args))
+        self._pending = (job, time.monotonic())
+        return job
+
+    def poll(self):
+        """
+        Check for the result of the current job without blocking.
+
+        Returns:
+            None while the job runs (or if there is none), otherwise a tuple
+            (job id, status, value) where status is "ok" (value is the
+            result), "error" (value is the error message) or "timeout".
+        """
+        if self._pending is None:
+            return None
+        job, started = self._pending
+
+        while True:
+            try:
+                result_job, ok, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if result_job == job:
+                self._pending = None
+                return job, ("ok" if ok else "error"), value
+            # Result of a superseded job: dropped
+
+        if not self._process.is_alive():
+            self._pending = None
+            self._process = None
+            return job, "error", "Worker process exited"
+        if self.timeout is not None and time.monotonic() - started > self.timeout:
+            self.cancel()
+            return job, "timeout", None
+        return None
+
+    def cancel(self):
+        """Abandon the current job, killing the worker if it is still running."""
+        if self._pending is not None:
+            self._pending = None
+            self._stop()
+
+    def close(self):
+        """Stop the worker process."""
+        self._pending = None
+        if self._process is not None and self._process.is_alive():
+            self._requests.put((None, None, ()))
+            self._process.join(1)
+        self._stop()
+
+    def _stop(self):
+        if self._process is None:
+            return
+        self._process.terminate()
+        self._process.join()
+        self._requests.close()
+        self._results.close()
+        self._process = None
+
+
+def _serve(requests, results):
+    """Worker process loop: run jobs until a None job id arrives."""
+    while True:
+        job, func, args = requests.get()
+        if job is None:
+            return
+        try:
+            results.put((job, True, func(*args)))
+        except Exception as e:
+            results.put((job, False, str(e)))
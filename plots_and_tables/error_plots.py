@@ -1,63 +1,37 @@
-import os, sys, math
-from decimal import Decimal, getcontext
+import os, sys, io, math, argparse
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MaxNLocator
-import pandas as pd
 
 # Find package
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
-from float64_converter.converter import real_to_float64, float64_to_real
+from float64_converter import analysis, accuracy, export
 
-getcontext().prec = 70
 
-def chop_vs_round_plot():
+def chop_vs_round_plot(num_points=70, seed=0):
     '''
     Plot the Relative Error for Randomly generated values to compare chopping and rounding
 
     Plot is saved as chop_vs_round_plot.png
     '''
-    num_points = 70
-    x_linspace = np.linspace(-1, 1, num_points)
-
-    test_values = []
-    for x in x_linspace:
-        # Use a non-terminating fraction for variety
-        base_fraction = Decimal(1)/Decimal(3)
-        scaled_value = base_fraction * Decimal(str(x))  # scale fraction
-        test_values.append(str(scaled_value))
-
-    # Add a few extra small fractions
-    test_values += ["0.1", str(Decimal(1)/Decimal(7)), str(Decimal(1)/Decimal(1000))]
-    for log_mag in x_linspace:
-        scaled_value = base_fraction * (Decimal(10) ** Decimal(log_mag))
-        test_values.append(str(scaled_value))
-
-    # Add some extra non-terminating fractions
-    test_values += ["0.1", str(Decimal(1)/Decimal(7))]
-
-    # --- Compute chopped & rounded values and errors ---
-    X_values, log10_errors_chop, log10_errors_round = [], [], []
-
-    for x_str in test_values:
-        chop_bits = real_to_float64(x_str, round=False)
-        round_bits = real_to_float64(x_str, round=True)
-
-        x_back_chop = Decimal(str(float64_to_real(chop_bits)))
-        x_back_round = Decimal(str(float64_to_real(round_bits)))
-        x_dec = Decimal(x_str)
-
-        # Compute relative errors safely
-        rel_err_chop = abs(x_dec - x_back_chop)/abs(x_dec) if x_dec != 0 else abs(x_dec - x_back_chop)
-        rel_err_round = abs(x_dec - x_back_round)/abs(x_dec) if x_dec != 0 else abs(x_dec - x_back_round)
-
-        # Skip zero errors to avoid log10(0)
-        if rel_err_chop > 0 or rel_err_round > 0:
-            X_values.append(float(x_dec))
-            log10_errors_chop.append(math.log10(float(rel_err_chop)) if rel_err_chop > 0 else np.nan)
-            log10_errors_round.append(math.log10(float(rel_err_round)) if rel_err_round > 0 else np.nan)
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import MaxNLocator
+
+    # Random reals in [-1/3, 1/3] and with magnitudes 10^[-1, 1] / 3,
+    # with their exact chop and round errors (see float64_converter.analysis)
+    rng = np.random.default_rng(seed)
+    log10_third = math.log10(1/3)
+    samples = [analysis.sample("uniform", num_points, rng, -1/3, 1/3),
+               analysis.sample("log-uniform", num_points, rng, log10_third - 1, log10_third + 1)]
+    a, t, sign = (np.concatenate(parts) for parts in zip(*samples))
+
+    errors = analysis.errors(a, t, sign)
+    with np.errstate(divide="ignore"):
+        log10_errors_chop = np.log10(errors["chop"][1])
+        log10_errors_round = np.log10(errors["round"][1])
+    log10_errors_chop[np.isinf(log10_errors_chop)] = np.nan
+    log10_errors_round[np.isinf(log10_errors_round)] = np.nan
+    X_values = sign * a
 
     # --- Plot ---
     plt.style.use('seaborn-v0_8-whitegrid')
@@ -83,8 +57,8 @@ def chop_vs_round_plot():
     ax.legend(frameon=True, fontsize=10)
 
     # change y-axis display
-    min_y = min(filter(lambda v: not np.isnan(v), log10_errors_chop + log10_errors_round))
-    max_y = max(filter(lambda v: not np.isnan(v), log10_errors_chop + log10_errors_round))
+    all_errors = np.concatenate([log10_errors_chop, log10_errors_round])
+    min_y, max_y = np.nanmin(all_errors), np.nanmax(all_errors)
     ax.set_ylim(min_y - 0.5, max_y + 0.5)
     
 
@@ -95,58 +69,131 @@ def chop_vs_round_plot():
     plt.savefig(output_path, dpi=150)
 
 
-def test_val_table():
+def error_histogram_plot(n=10_000_000, distribution="log-uniform", workers=None, seed=0):
+    '''
+    Plot histograms of the relative and ULP errors of chopping and rounding
+    n random reals, computed in parallel shards by float64_converter.analysis.
+    Progress is printed as the shard histograms are merged.
+
+    Plot is saved as error_histogram_plot.png
+    '''
+    import matplotlib.pyplot as plt
+
+    study = analysis.ErrorStudy()
+    for study in analysis.iter_study(n, distribution, seed=seed, workers=workers):
+        print(f"{study.count:>12,} / {n:,} samples", end="\r", flush=True)
+    print()
+
+    plt.style.use('seaborn-v0_8-whitegrid')
+    fig, (ax_rel, ax_ulp) = plt.subplots(1, 2, figsize=(14, 6), dpi=120)
+    colors = {"chop": "#d62728", "round": "#1f77b4"}
+    labels = {"chop": "Chopping", "round": "Rounding"}
+
+    for mode in analysis.MODES:
+        ax_rel.stairs(study.rel_counts[mode], analysis.REL_EDGES, color=colors[mode],
+                      label=f"{labels[mode]} (mean {study.mean_rel(mode):.2e})")
+        ax_ulp.stairs(study.ulp_counts[mode], analysis.ULP_EDGES, color=colors[mode],
+                      label=f"{labels[mode]} (max {study.max_ulp[mode]:.3f} ulp)")
+
+    log10_epsilon = math.log10(np.finfo(float).eps)
+    ax_rel.axvline(x=log10_epsilon, color="#2ca02c", linestyle='--', linewidth=1.5,
+                   label=f"$\\log_{{10}}(\\varepsilon)$ ≈ {log10_epsilon:.2f}")
+
+    ax_rel.set_xlabel(r"log$_{10}$(Relative Error)", fontsize=14)
+    ax_ulp.set_xlabel("Error (ulp)", fontsize=14)
+    for ax in (ax_rel, ax_ulp):
+        ax.set_ylabel("Count", fontsize=14)
+        ax.tick_params(axis='both', which='major', labelsize=12)
+        ax.legend(frameon=True, fontsize=10)
+    fig.suptitle(f"Chopping vs Rounding Errors of {study.count:,} {distribution} Values",
+                 fontsize=14, fontweight='bold')
+
+    plt.tight_layout()
+
+    # Save as png
+    output_path = os.path.join(os.path.dirname(__file__), "error_histogram_plot.png")
+    plt.savefig(output_path, dpi=150)
+    return study
+
+
+def math_ulp_plot(functions=("sin", "cos", "tan", "exp", "log", "sqrt"), n=20_000, workers=None, cache_dir=None):
+    '''
+    Plot the histograms of the ULP errors of math module functions on this
+    platform, measured by float64_converter.accuracy against high-precision
+    references (cached in cache_dir if given).
+
+    Plot is saved as math_ulp_plot.png
+    '''
+    import matplotlib.pyplot as plt
+
+    studies = accuracy.characterize(functions, n, workers=workers, cache_dir=cache_dir)
+
+    plt.style.use('seaborn-v0_8-whitegrid')
+    fig, ax = plt.subplots(figsize=(14, 7), dpi=120)
+    for study in studies.values():
+        ax.stairs(study.ulp_counts / max(study.count, 1), accuracy.ULP_EDGES,
+                  label=f"{study.name} (max {study.max_ulp:.3f} ulp, "
+                        f"{study.correctly_rounded / max(study.count, 1):.1%} correctly rounded)")
+
+    ax.set_xlabel("|Error| (ulp)", fontsize=14)
+    ax.set_ylabel("Fraction of inputs", fontsize=14)
+    ax.set_title("ULP Errors of math Module Functions", fontsize=14, fontweight='bold')
+    ax.tick_params(axis='both', which='major', labelsize=12)
+    ax.legend(frameon=True, fontsize=10)
+
+    plt.tight_layout()
+
+    # Save as png
+    output_path = os.path.join(os.path.dirname(__file__), "math_ulp_plot.png")
+    plt.savefig(output_path, dpi=150)
+    return studies
+
+
+def _val_table_options(format):
+    if format == "latex":
+        return dict(caption="IEEE 754 Conversion Results: Chopped vs. Rounded Values",
+                    label="tab:ieee754_results", column_format='lrrrrrr')
+    return {}
+
+
+def test_val_table(values=("12345.6789", "3.1415926535"), path="ieee754_table.tex", format="latex"):
     """
     Compute IEEE 754 Chopped and Rounded values and their Absolute & Relative errors
+
+    Writes the table to path and returns it as a string. format is
+    "latex", "csv" or "markdown". For long inputs use stream_val_table.
     """
+    out = io.StringIO()
+    export.write_table(values, out, format, **_val_table_options(format))
+    table = out.getvalue()
+    with open(path, "w", newline="") as f:
+        f.write(table)
+    return table
+
+
+def stream_val_table(values, path="ieee754_table.tex", format="latex"):
+    """
+    test_val_table for any number of rows: values may be any iterable of
+    numbers, such as an open file with one per line, and rows are
+    converted and written in batches (see float64_converter.export)
+    without holding the table in memory. Returns the number of rows.
+    """
+    with open(path, "w", newline="") as f:
+        return export.write_table(values, f, format, **_val_table_options(format))
 
-    test_values = ["12345.6789","3.1415926535"]
-
-    rows_data = []
-
-    for x_str in test_values:
-        x_dec = Decimal(str(eval(x_str)))
-        
-        # Convert using your functions
-        x_chop_bits = real_to_float64(x_dec, round=False)
-        x_round_bits = real_to_float64(x_dec, round=True)
-
-        x_chop_val = float64_to_real(x_chop_bits)
-        x_round_val = float64_to_real(x_round_bits)
-
-        # Absolute and Relative Errors
-        abs_err_chop = abs(x_dec - x_chop_val)
-        abs_err_round = abs(x_dec - x_round_val)
-        rel_err_chop = abs_err_chop / abs(x_dec) if x_dec != 0 else abs_err_chop
-        rel_err_round = abs_err_round / abs(x_dec) if x_dec != 0 else abs_err_round
-
-        rows_data.append({
-            "Original Value": x_str,
-            "Chopped Value": float(x_chop_val),
-            "Rounded Value": float(x_round_val),
-            "Abs. Error (Chop)": float(abs_err_chop),
-            "Rel. Error (Chop)": float(rel_err_chop),
-            "Abs. Error (Round)": float(abs_err_round),
-            "Rel. Error (Round)": float(rel_err_round),
-        })
-
-    df = pd.DataFrame(rows_data)
-
-    # Optional: format numeric columns nicely for display
-    df_display = df.copy()
-    numeric_cols = df.columns[1:]
-    df_display[numeric_cols] = df_display[numeric_cols].applymap(lambda x: f"{x:.2e}" if abs(x) < 1e3 else f"{x:.17g}")
-
-    # Export LaTeX code
-    latex_code = df_display.to_latex(index=False, escape=False, column_format='lrrrrrr',
-                                     caption="IEEE 754 Conversion Results: Chopped vs. Rounded Values",
-                                     label="tab:ieee754_results")
-    with open("ieee754_table.tex", "w") as f:
-        f.write(latex_code)
-    
-    return latex_code
 
 if __name__=="__main__":
+    parser = argparse.ArgumentParser(description="Make the chop vs. round plot and the table of ieee754_table.tex.")
+    parser.add_argument("--histogram", action="store_true",
+                        help="also plot the error histograms of a 10,000,000-sample study")
+    parser.add_argument("--math-ulp", action="store_true",
+                        help="also plot the ULP errors of math module functions")
+    args = parser.parse_args()
+
     chop_vs_round_plot()
+    if args.histogram:
+        error_histogram_plot()
+    if args.math_ulp:
+        math_ulp_plot()
     test_val_table()
     
\ No newline at end of file
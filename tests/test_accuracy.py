@@ -0,0 +1,123 @@
+"""
+tests/test_accuracy.py
+
+Tests for the ULP-error measurement of math functions: the
+high-precision references, the sampled domains, sharded runs and the
+on-disk reference cache.
+"""
+
+import os, sys, math, importlib
+import pytest
+import numpy as np
+from decimal import Decimal, localcontext
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter import accuracy
+
+# Values to 40 significant digits
+KNOWN = [
+    ("sin", 1.0, "0.8414709848078965066525023216302989996226"),
+    ("cos", 1.0, "0.5403023058681397174009366074429766037323"),
+    ("sin", math.pi, "1.224646799147353177226065932274997997083E-16"),
+    ("sin", 1e22, "-0.8522008497671888017727058937530293682618"),
+    ("atan", 1.0, "0.7853981633974483096156608458198757210493"),
+    ("acos", -1.0, "3.141592653589793238462643383279502884197"),
+    ("log1p", -0.5, "-0.6931471805599453094172321214581765680755"),
+    ("cbrt", -27.0, "-3.000000000000000000000000000000000000000"),
+]
+
+
+@pytest.mark.parametrize("name, x, expected", KNOWN)
+def test_references(name, x, expected):
+    assert accuracy.reference(name, x) == Decimal(expected)
+
+
+def test_small_arguments_keep_their_digits():
+    # exp(x) - 1 and sinh(x) lose about 10 digits to cancellation at x = 1e-10
+    x = Decimal(1e-10)
+    with localcontext() as ctx:
+        ctx.prec = 40
+        expm1 = x + x**2 / 2 + x**3 / 6 + x**4 / 24
+        sinh = x + x**3 / 6 + x**5 / 120
+    assert accuracy.reference("expm1", 1e-10) == expm1
+    assert accuracy.reference("sinh", 1e-10) == sinh
+
+
+def test_samples_stay_in_domain():
+    rng = np.random.default_rng(0)
+    for name in accuracy.FUNCTIONS:
+        x = accuracy.sample(name, 2000, rng).view(np.float64)
+        with np.errstate(all="ignore"):
+            results = [getattr(math, name)(v) for v in x.tolist()]
+        assert all(math.isfinite(y) for y in results), name
+        # About a quarter of the inputs sit close to a hard point
+        hard = np.array(accuracy.DOMAINS[name].hard)
+        close = np.isclose(x[:, None], hard, rtol=1e-10, atol=0).any(axis=1)
+        assert 0.15 < close.mean() < 0.35, name
+
+
+def test_functions_missing_from_math_are_left_out(monkeypatch):
+    # As on Python 3.10, which has neither math.cbrt nor math.exp2
+    monkeypatch.delattr(math, "cbrt", raising=False)
+    monkeypatch.delattr(math, "exp2", raising=False)
+    try:
+        functions = importlib.reload(accuracy).FUNCTIONS
+    finally:
+        monkeypatch.undo()
+        importlib.reload(accuracy)
+    assert "cbrt" not in functions and "exp2" not in functions and "sqrt" in functions
+
+
+def test_measure():
+    y, error, rounded = accuracy.measure("exp", 0.5, accuracy.reference("exp", 0.5))
+    assert y == math.exp(0.5) and abs(error) <= 1
+    # A result one ulp off is reported as such
+    ref = accuracy.reference("sqrt", 2.0)
+    shifted = Decimal(math.sqrt(2.0)) + Decimal(math.ulp(math.sqrt(2.0)))
+    _, error, rounded = accuracy.measure("sqrt", 2.0, shifted)
+    assert not rounded and -1.5 < error < -0.5
+    assert accuracy.measure("sqrt", 2.0, ref)[2]
+
+
+def test_characterize_and_sqrt_is_correctly_rounded():
+    studies = accuracy.characterize(["sqrt", "sin"], n=150, shard_size=50, workers=1)
+    for study in studies.values():
+        assert study.count + study.skipped == 150
+        assert study.ulp_counts.sum() == study.count
+        assert study.worst is not None and study.max_ulp >= study.mean_ulp()
+    # IEEE 754 requires sqrt to be correctly rounded
+    assert studies["sqrt"].correctly_rounded == studies["sqrt"].count
+    assert studies["sqrt"].max_ulp <= 0.5
+
+
+def test_cache_makes_reruns_incremental(tmp_path, monkeypatch):
+    cache = str(tmp_path / "refs")
+    first = accuracy.characterize(["log", "tan"], n=60, shard_size=20, workers=1, cache_dir=cache)
+    assert sorted(os.listdir(cache)) == ["log-40.npz", "tan-40.npz"]
+
+    calls = []
+    original = accuracy.reference
+    monkeypatch.setattr(accuracy, "reference", lambda *args: calls.append(args) or original(*args))
+
+    again = accuracy.characterize(["log", "tan"], n=60, shard_size=20, workers=1, cache_dir=cache)
+    assert calls == []
+    for name in first:
+        assert again[name].max_ulp == first[name].max_ulp
+        np.testing.assert_array_equal(again[name].ulp_counts, first[name].ulp_counts)
+
+    accuracy.characterize(["log", "tan"], n=80, shard_size=20, workers=1, cache_dir=cache)
+    assert len(calls) == 2 * 20  # Only the new shard of each function
+
+
+def test_results_do_not_depend_on_workers():
+    serial = accuracy.characterize(["exp"], n=120, shard_size=30, workers=1)["exp"]
+    pooled = accuracy.characterize(["exp"], n=120, shard_size=30, workers=2)["exp"]
+    assert (serial.count, serial.correctly_rounded, serial.max_ulp) == \
+           (pooled.count, pooled.correctly_rounded, pooled.max_ulp)
+    np.testing.assert_array_equal(serial.ulp_counts, pooled.ulp_counts)
+
+    with pytest.raises(ValueError):
+        accuracy.characterize(["gamma"], n=10)
@@ -0,0 +1,93 @@
+"""
+tests/test_analysis.py
+
+Checks the batch error-analysis engine: its errors agree with the exact
+errors of the converter's chopped and rounded results, and studies are
+reproducible across worker counts.
+"""
+
+import os, sys
+from decimal import Decimal, localcontext
+import pytest
+import numpy as np
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter import analysis
+from float64_converter.converter import real_to_float64
+
+XMAX = np.finfo(np.float64).max
+
+
+def converted(x, mode):
+    bits = real_to_float64(x, round=mode == "round")
+    return float(np.array([int(bits, 2)], dtype=np.uint64).view(np.float64)[0])
+
+
+@pytest.mark.parametrize("distribution", sorted(analysis.DISTRIBUTIONS))
+def test_errors_match_converter(distribution):
+    rng = np.random.default_rng(3)
+    a, t, sign = analysis.sample(distribution, 200, rng)
+    # Edge cases: zero, a subnormal (flushed), rounding past the largest double
+    a[:3], t[:3] = [0.0, 1e-310, XMAX], [0.3, 0.7, 0.75]
+    errors = analysis.errors(a, t, sign)
+
+    for i in range(len(a)):
+        x = analysis.to_decimal(a[i], t[i], sign[i])
+        for mode in analysis.MODES:
+            abs_err, rel_err, _ = (e[i] for e in errors[mode])
+            y = converted(x, mode)
+            if np.isinf(y):
+                assert np.isinf(rel_err)
+                continue
+            with localcontext() as ctx:
+                ctx.prec = 1200
+                exact = abs(x - Decimal(y))
+                exact_rel = float(exact / abs(x)) if x else 0.0
+            assert rel_err == pytest.approx(exact_rel, rel=3e-16, abs=0)
+            if a[i] > 1e-290:
+                assert Decimal(abs_err) == exact
+
+
+def test_ties_go_to_even():
+    a = np.array([1.0, np.nextafter(1.0, 2.0)])
+    t = np.array([0.5, 0.5])
+    _, _, ulp_err = analysis.errors(a, t, np.ones(2))["round"]
+    assert ulp_err.tolist() == [0.5, 0.5]
+    for i in range(2):
+        x = analysis.to_decimal(a[i], t[i], 1.0)
+        expected = a[i] if i == 0 else np.nextafter(a[i], 2.0)
+        assert converted(x, "round") == expected
+
+
+def test_near_ties_sample():
+    _, t, _ = analysis.sample("near-ties", 10_000, np.random.default_rng(0))
+    assert np.all(np.abs(t - 0.5) <= 2.0**-40)
+    assert np.any(t == 0.5)
+
+
+def test_study_bounds():
+    study = analysis.run_study(200_000, "uniform", workers=1, shard_size=50_000)
+    assert study.count == 200_000
+    assert study.max_ulp["chop"] < 1 and study.max_ulp["round"] <= 0.5
+    assert study.max_rel["round"] <= 2.0**-53
+    assert study.rel_counts["chop"].sum() == study.ulp_counts["round"].sum() == 200_000
+    assert study.mean_rel("round") < study.mean_rel("chop")
+
+
+def test_study_independent_of_workers():
+    kwargs = dict(n=120_000, distribution="near-ties", seed=5, shard_size=30_000)
+    serial = analysis.run_study(workers=1, **kwargs)
+    pooled = analysis.run_study(workers=2, backend="thread", **kwargs)
+    for mode in analysis.MODES:
+        np.testing.assert_array_equal(serial.rel_counts[mode], pooled.rel_counts[mode])
+        np.testing.assert_array_equal(serial.ulp_counts[mode], pooled.ulp_counts[mode])
+        assert serial.max_rel[mode] == pooled.max_rel[mode]
+        assert serial.mean_rel(mode) == pytest.approx(pooled.mean_rel(mode), rel=1e-12)
+
+
+def test_streamed_progress():
+    counts = [study.count for study in analysis.iter_study(100_000, shard_size=25_000, workers=1)]
+    assert counts == [25_000, 50_000, 75_000, 100_000]
@@ -0,0 +1,96 @@
+"""
+tests/test_batch.py
+
+Checks that the vectorized batch functions agree with the scalar
+converter functions, including NaN, infinity, zero and subnormal handling.
+"""
+
+import os, sys, math
+import pytest
+import numpy as np
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter.converter import real_to_float64, float64_to_real, float64_to_str
+from float64_converter.batch import (
+    real_to_float64_array,
+    float64_to_real_array,
+    float64_to_str_array,
+    bits_to_strings,
+)
+
+SPECIAL_VALUES = np.array([0.0, -0.0, 1.0, -12.375, 0.1, 5e-324, -2.5e-310,
+                           2.0**-1022, 1.7976931348623157e308, np.inf, -np.inf, np.nan])
+
+
+def random_patterns(n=5000, seed=0):
+    return np.random.default_rng(seed).integers(0, 2**64, size=n, dtype=np.uint64)
+
+
+def test_encode_matches_scalar():
+    values = np.concatenate([SPECIAL_VALUES, random_patterns().view(np.float64)])
+    bit_strings = real_to_float64_array(values)
+
+    assert bit_strings.dtype == np.dtype('S64')
+    for x, bits in zip(values.tolist(), bit_strings.tolist()):
+        assert bits.decode() == real_to_float64(x)
+
+
+def test_uint64_input_and_packed_output():
+    patterns = random_patterns()
+    packed = real_to_float64_array(patterns, packed=True)
+
+    assert packed.dtype == np.uint64
+    assert np.array_equal(bits_to_strings(packed), real_to_float64_array(patterns.view(np.float64)))
+
+
+def test_decode_matches_scalar():
+    bit_strings = bits_to_strings(random_patterns())
+    values = float64_to_real_array(bit_strings)
+
+    for x, bits in zip(values.tolist(), bit_strings.tolist()):
+        expected = float64_to_real(bits.decode(), as_float=True)
+        assert x == expected or (math.isnan(x) and math.isnan(expected))
+
+
+def test_decode_special_values():
+    values = float64_to_real_array(real_to_float64_array(SPECIAL_VALUES).astype('U64'))
+
+    assert math.copysign(1.0, values[1]) == 1.0  # -0.0 decodes to 0.0
+    assert values[5] == 0.0  # subnormal chopped to zero
+    assert np.isinf(values[9]) and np.isinf(values[10]) and values[10] < 0
+    assert np.isnan(values[11])
+
+
+def test_round_trip_keeps_shape():
+    values = np.linspace(-3, 3, 12).reshape(3, 4)
+    bit_strings = real_to_float64_array(values, round=True)
+
+    assert bit_strings.shape == (3, 4)
+    assert np.array_equal(float64_to_real_array(bit_strings), values)
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        float64_to_real_array(np.array(["01" * 31 + "2"]))
+    with pytest.raises(ValueError):
+        float64_to_real_array(np.array(["0101"]))
+    with pytest.raises(TypeError):
+        real_to_float64_array(np.arange(4))
+
+
+def test_str_formatting_matches_scalar():
+    patterns = np.concatenate([random_patterns(1000), SPECIAL_VALUES.view(np.uint64)])
+    strings = bits_to_strings(patterns)
+    for exact in (False, True):
+        formatted = float64_to_str_array(strings, exact=exact)
+        assert formatted.tolist() == [float64_to_str(b.decode(), exact=exact) for b in strings.tolist()]
+        np.testing.assert_array_equal(float64_to_str_array(patterns, exact=exact), formatted)
+
+    # The shortest strings read back to the same doubles
+    values = float64_to_str_array(patterns).astype(np.float64)
+    finite = ~np.isnan(values)
+    np.testing.assert_array_equal(values[finite].view(np.uint64), patterns[finite])
+    assert float64_to_str_array(patterns.reshape(2, -1)).shape == (2, len(patterns) // 2)
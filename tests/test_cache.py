@@ -0,0 +1,76 @@
+"""
+tests/test_cache.py
+
+Tests for the LRU conversion caches.
+"""
+
+import os, sys
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter import cache
+from float64_converter.converter import real_to_float64, float64_to_real
+
+
+def test_hits_misses_and_eviction():
+    encode = cache.cached_real_to_float64(maxsize=2)
+
+    encode(0.1)
+    encode(0.1)
+    encode("0.1", round=True)
+    encode(2.5)  # evicts 0.1, the least recently used entry
+    encode(0.1)
+
+    assert encode.cache_info() == cache.CacheInfo(hits=1, misses=4, maxsize=2, currsize=2)
+
+    encode.cache_clear()
+    assert encode.cache_info() == cache.CacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+
+def test_keys_are_normalized():
+    encode = cache.cached_real_to_float64()
+
+    assert encode(0.0) == real_to_float64(0.0)
+    assert encode(-0.0) == real_to_float64(-0.0)
+    assert encode(Decimal("-0")) == real_to_float64(Decimal("-0"))
+    assert encode("0.1") != encode("0.1", round=True)
+    assert encode(1) == encode(1.0)
+    assert encode.cache_info().currsize == 7
+
+    encode(float("nan"))
+    encode(float("nan"))
+    encode(Decimal("NaN"))
+    encode(Decimal("NaN"))
+    assert encode.cache_info().hits == 2
+
+
+def test_decode_cache_and_errors():
+    decode = cache.cached_float64_to_real(maxsize=8)
+    bits = real_to_float64(0.1)
+
+    assert decode(bits) == float64_to_real(bits)
+    assert decode(bits, as_float=True) == 0.1
+    assert decode(bits) == float64_to_real(bits)
+    assert decode.cache_info().hits == 1
+
+    with pytest.raises(ValueError):
+        decode("0101")
+    assert decode.cache_info().currsize == 2
+
+
+def test_shared_between_threads():
+    encode = cache.cached_real_to_float64(maxsize=64)
+    values = [str(k / 8) for k in range(100)] * 20
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(encode, values))
+
+    assert results == [real_to_float64(x) for x in values]
+    info = encode.cache_info()
+    assert info.hits + info.misses == len(values)
+    assert info.currsize == 64
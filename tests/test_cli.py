@@ -0,0 +1,77 @@
+"""
+tests/test_cli.py
+
+Tests for the streaming command-line entry point (python -m float64_converter).
+"""
+
+import os, sys, io
+import numpy as np
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter.converter import real_to_float64
+from float64_converter.__main__ import convert_stream, main
+
+
+def test_encode_stream_skips_malformed_lines():
+    out, errors = io.StringIO(), io.StringIO()
+    lines = ["0.1\n", "not a number\n", "\n", "-2.5\n"]
+
+    n_errors = convert_stream(lines, out, errors, mode="encode", round=True, chunk_size=2)
+
+    assert n_errors == 1
+    assert out.getvalue().split() == [real_to_float64("0.1", round=True), real_to_float64("-2.5")]
+    assert errors.getvalue().startswith("line 2:")
+
+
+def test_decode_file_round_trip(tmp_path):
+    numbers = tmp_path / "numbers.txt"
+    bits = tmp_path / "bits.txt"
+    decoded = tmp_path / "decoded.txt"
+    numbers.write_text("12.375\n-0.5\n1e300\n")
+
+    assert main([str(numbers), "-o", str(bits), "--round"]) == 0
+    assert main([str(bits), "-o", str(decoded), "--mode", "decode"]) == 0
+
+    values = [float(line) for line in decoded.read_text().split()]
+    assert values == [12.375, -0.5, 1e300]
+    assert decoded.read_text() == "12.375\n-0.5\n1e+300\n"
+
+
+def test_decode_formats():
+    bits = real_to_float64("0.1", round=True) + "\n"
+    outputs = {}
+    for format in ("shortest", "exact", "decimal"):
+        out = io.StringIO()
+        assert convert_stream([bits], out, io.StringIO(), mode="decode", format=format) == 0
+        outputs[format] = out.getvalue().strip()
+    assert outputs["shortest"] == "0.1"
+    assert outputs["exact"] == "0.1000000000000000055511151231257827021181583404541015625"
+    assert outputs["decimal"].startswith(outputs["exact"])
+
+
+def test_malformed_bits_reported_on_error_channel(tmp_path):
+    bits = tmp_path / "bits.txt"
+    errors = tmp_path / "errors.txt"
+    out = tmp_path / "out.txt"
+    bits.write_text("0101\n" + real_to_float64(2.0) + "\n")
+
+    assert main([str(bits), "--mode", "decode", "-o", str(out), "--errors", str(errors)]) == 1
+    assert float(out.read_text()) == 2.0
+    assert "line 1" in errors.read_text()
+
+
+def test_dump_and_load_modes(tmp_path):
+    values = np.array([0.1, -2.5, 1e300])
+    raw = tmp_path / "values.bin"
+    values.astype(">f8").tofile(raw)
+    dump = tmp_path / "dump.txt"
+    loaded = tmp_path / "loaded.npy"
+
+    assert main([str(raw), "--mode", "dump", "--byteorder", "big", "-o", str(dump)]) == 0
+    assert dump.read_text().split() == [real_to_float64(x) for x in values.tolist()]
+
+    assert main([str(dump), "--mode", "load", "-o", str(loaded)]) == 0
+    np.testing.assert_array_equal(np.load(loaded), values)
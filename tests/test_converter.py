@@ -8,15 +8,15 @@ Contains Automated pytest tests that test:
 5. Stability and Error
 """
 
-import os, sys, math
+import os, sys, math, struct, random
 import pytest
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation, localcontext
 
 # Find package
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(project_root)
 
-from float64_converter.converter import real_to_float64, float64_to_real
+from float64_converter.converter import real_to_float64, float64_to_real, float64_to_str
 
 # Machine Epsilon for 64-bit float: 2^-52
 MACHINE_EPSILON = Decimal(2)**Decimal(-52)
@@ -208,4 +208,153 @@ def test_stability_and_error(x, rounding):
     # For IEEE 64-bit floats, sensitivity <= 1 is expected for well-behaved numbers
     assert sensitivity <= Decimal(1.1), (
         f"Sensitivity {sensitivity} too high for x={x} in {mode_name} mode"
-    )
\ No newline at end of file
+    )
+
+
+@pytest.mark.parametrize("x", [1e300, -1e300, 1e-300, 2.5e-307, 1.7976931348623157e308, 12.375])
+@pytest.mark.parametrize("rounding", [True, False])
+def test_exact_values_across_magnitudes(x, rounding):
+    """
+    Values that are already doubles must come back with exactly their own bits
+    in both modes, however far they are from 1.
+    """
+    native_bits = format(struct.unpack('>Q', struct.pack('>d', x))[0], '064b')
+    assert real_to_float64(x, round=rounding) == native_bits
+    assert real_to_float64(Decimal(x), round=rounding) == native_bits
+
+
+def test_out_of_range_magnitudes():
+    """Huge and tiny decimal exponents overflow/underflow without big integer work"""
+    assert real_to_float64("1e999999999") == "0" + "1"*11 + "0"*52
+    assert real_to_float64("-1e-999999999") == "1" + "0"*63
+    assert real_to_float64("1.8e308", round=True) == "0" + "1"*11 + "0"*52
+
+
+def test_fast_paths_match_decimal_engine():
+    """Float and int inputs skip the Decimal engine but give the same bits"""
+    values = [0.1, -2.5, 1e-310, -1e-320, 5e-324, 1e308, 2.0**-1022, float("nan"), float("-inf")]
+    for val in values:
+        for rounding in (True, False):
+            assert real_to_float64(val, round=rounding) == real_to_float64(Decimal(val), round=rounding)
+
+    for n in [1, -7, 2**53 + 1, 3**100, -(10**308), 2**1024, 0]:
+        for rounding in (True, False):
+            assert real_to_float64(n, round=rounding) == real_to_float64(Decimal(n), round=rounding)
+
+
+def test_string_fast_path_matches_decimal_engine():
+    """Decimal literals are parsed without the engine but give the same bits"""
+    rng = random.Random(18)
+    literals = []
+    for _ in range(300):
+        digits = "".join(rng.choice("0123456789") for _ in range(rng.randint(1, 40)))
+        point = rng.randint(0, len(digits))
+        literals.append(f"{rng.choice(['', '-', '+'])}{digits[:point]}.{digits[point:]}e{rng.randint(-320, 320)}")
+
+    # Exact ties between doubles and values one digit beyond them
+    with localcontext() as ctx:
+        ctx.prec = 800
+        for x in [1.0, 0.1, 2.0**-1021, 1e300, 9007199254740994.0]:
+            tie = (Decimal(x) + Decimal(math.nextafter(x, math.inf))) / 2
+            ctx.prec = len(tie.as_tuple().digits) + 1
+            literals += [str(tie), str(tie.next_minus()), str(tie.next_plus()), str(-tie)]
+            ctx.prec = 800
+
+    # Around the ends of the range and across the fast path's limits
+    literals += ["2.2250738585072014e-308", "2.225073858507201e-308", "4.450147717014403e-308",
+                 "8.98846567431158e307", "1.7976931348623157e308", "1.7976931348623158e308",
+                 "1e-310", "-5e-324", "  12.5  ", "-0", "0.0e5", "1_000.5", "1" + "0" * 4100]
+
+    for text in literals:
+        for rounding in (True, False):
+            assert real_to_float64(text, round=rounding) == real_to_float64(Decimal(text), round=rounding), text
+
+
+def test_very_long_literals():
+    """Literals with thousands of digits round from all of them"""
+    tie = "1.00000000000000011102230246251565404236316680908203125" + "0" * 5000  # 1 + 2**-53
+    assert real_to_float64(tie, round=True) == real_to_float64(1.0)
+    assert real_to_float64(tie + "1", round=True) == real_to_float64(1.0 + 2**-52)
+    assert real_to_float64(tie + "1") == real_to_float64(1.0)
+    assert real_to_float64("0." + "3" * 5000) == real_to_float64(1 / 3)
+
+
+def test_float64_to_real_return_modes():
+    """as_float and as_int reinterpret the bits without building a Decimal"""
+    for val in [0.1, -12.375, 2.0**-1022, 1.7976931348623157e308]:
+        bits = real_to_float64(val)
+        assert float64_to_real(bits, as_float=True) == val
+        assert float64_to_real(bits, as_float=True) == float(float64_to_real(bits))
+
+    assert float64_to_real("0"*63 + "1", as_float=True) == 5e-324
+
+    assert float64_to_real(real_to_float64(-0.0), as_float=True) == 0.0
+    assert math.isnan(float64_to_real(real_to_float64(float("nan")), as_float=True))
+    assert float64_to_real(real_to_float64(2**60), as_int=True) == 2**60
+    assert float64_to_real(real_to_float64(-20), as_int=True) == -20
+
+    with pytest.raises(ValueError):
+        float64_to_real(real_to_float64(0.5), as_int=True)
+    with pytest.raises(ValueError):
+        float64_to_real(real_to_float64(float("inf")), as_int=True)
+    with pytest.raises(ValueError):
+        float64_to_real("01" * 31 + "2", as_float=True)
+
+
+def test_decoded_decimal_is_exact_to_working_precision():
+    """
+    float64_to_real returns the exact value of the bits to the 70-digit
+    working precision, for normal and denormalized numbers.
+    """
+    rng = random.Random(7)
+    patterns = [format(rng.getrandbits(64), '064b') for _ in range(500)]
+    patterns += ['0' * 12 + format(rng.getrandbits(52), '052b') for _ in range(100)]
+    patterns += ['0' * 63 + '1', '0' + '1' * 10 + '0' + '1' * 52]
+
+    for bits in patterns:
+        x = float64_to_real(bits, as_float=True)
+        if math.isnan(x) or math.isinf(x) or x == 0.0:
+            continue
+        exact = Decimal(x)
+        assert abs(float64_to_real(bits) - exact) <= abs(exact) * Decimal("1e-69")
+
+
+def test_shortest_and_exact_strings():
+    """float64_to_str gives the shortest round-trip string, or the exact expansion"""
+    rng = random.Random(19)
+    patterns = [format(rng.getrandbits(64), '064b') for _ in range(500)]
+    patterns += ['0' * 63 + '1', '1' + '0' * 63, '0' + '1' * 11 + '0' * 52, '0' + '1' * 10 + '0' + '1' * 52]
+
+    for bits in patterns:
+        x = struct.unpack('>d', int(bits, 2).to_bytes(8, 'big'))[0]
+        shortest = float64_to_str(bits)
+        if math.isnan(x):
+            assert shortest == float64_to_str(bits, exact=True) == "nan"
+            continue
+        assert struct.pack('>d', float(shortest)) == struct.pack('>d', x)
+        assert len(shortest.lstrip('-').split('e')[0].replace('.', '').strip('0')) <= 17
+        if math.isfinite(x):
+            assert Decimal(float64_to_str(bits, exact=True)) == Decimal(x)
+
+    assert float64_to_str(real_to_float64("0.1", round=True)) == "0.1"
+    assert float64_to_str('1' + '0' * 63) == "-0.0"
+    assert float64_to_str('0' * 63 + '1', exact=True).startswith("4.940656458412465441765687928")
+    with pytest.raises(ValueError):
+        float64_to_str("0101")
+
+
+def test_results_do_not_depend_on_caller_context():
+    """Conversions use their own precision and leave the caller's context alone"""
+    values = ["0.1", "3.141592653589793238462643383279502884197", "1e-300"]
+    expected = [(real_to_float64(x, round=True), float64_to_real(real_to_float64(x))) for x in values]
+
+    with localcontext() as ctx:
+        ctx.prec = 5
+        ctx.traps[InvalidOperation] = False
+        assert [(real_to_float64(x, round=True), float64_to_real(real_to_float64(x))) for x in values] == expected
+        assert ctx.prec == 5
+
+    with pytest.raises(InvalidOperation):
+        with localcontext() as ctx:
+            ctx.traps[InvalidOperation] = False
+            real_to_float64("not a number")
@@ -0,0 +1,151 @@
+"""
+tests/test_export.py
+
+Tests for the streaming table export: chopped and rounded values against
+the converter, errors against exact Decimal arithmetic, the LaTeX, CSV
+and Markdown writers, and constant memory use for long inputs.
+"""
+
+import os, sys, io, csv, math, tracemalloc
+import pytest
+import numpy as np
+from decimal import Decimal, localcontext
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter import export
+from float64_converter.converter import real_to_float64, float64_to_real
+
+EDGE_INPUTS = [
+    "0.1", "-2.5", "0", "-0", "12345.6789", "3.1415926535", "1e400", "-inf", "nan",
+    "1e-310", "1e-330", "2.2250738585072014e-308", "2.2250738585072013e-308",
+    "1.7976931348623157e308", "1.7976931348623158e308", "1.797693134862315799e308",
+    "1.00000000000000011102230246251565404236316680908203125",   # 1 + 2^-53, a tie
+    "1.00000000000000033306690738754696212708950042724609375",   # 1 + 3 * 2^-53, a tie
+    "1.000000000000000111022302462515654042363166809082031250001",
+    "9007199254740993", "-9007199254740993", "0." + "3" * 400,
+]
+
+
+def random_inputs(n, seed=0):
+    """Decimal literals of 1 to 25 significant digits over the whole range."""
+    rng = np.random.default_rng(seed)
+    digits = rng.integers(1, 26, size=n)
+    mantissas = rng.integers(1, 10**18, size=n)
+    exponents = rng.integers(-330, 310, size=n)
+    return [f"{'-' if m % 3 == 0 else ''}{str(m) * 2}"[:k + (m % 3 == 0)] + f"e{e}"
+            for m, k, e in zip(mantissas.tolist(), digits.tolist(), exponents.tolist())]
+
+
+def converted(text, round):
+    return float64_to_real(real_to_float64(text, round=round), as_float=True)
+
+
+def test_values_match_the_converter():
+    inputs = EDGE_INPUTS + random_inputs(3000)
+    table = export.convert_batch(inputs)
+    for i, text in enumerate(inputs):
+        for key, round in (("chopped", False), ("rounded", True)):
+            expected = converted(text, round)
+            got = table[key][i]
+            assert got == expected or (math.isnan(got) and math.isnan(expected)), (text, key)
+
+
+def test_errors_are_exact():
+    inputs = EDGE_INPUTS[:6] + EDGE_INPUTS[9:] + random_inputs(1000, seed=1)
+    table = export.convert_batch(inputs)
+    with localcontext() as ctx:
+        ctx.prec = 2000
+        for i, text in enumerate(inputs):
+            x = Decimal(text)
+            for mode, key in (("chop", "chopped"), ("round", "rounded")):
+                y = Decimal(table[key][i])
+                if math.isinf(y):
+                    assert table[f"abs_{mode}"][i] == math.inf
+                    continue
+                abs_err = abs(x - y)
+                rel_err = abs_err / abs(x) if x else abs_err
+                assert math.isclose(table[f"abs_{mode}"][i], abs_err, rel_tol=1e-14, abs_tol=1e-320), text
+                assert math.isclose(table[f"rel_{mode}"][i], rel_err, rel_tol=1e-14), text
+
+    specials = export.convert_batch(["1e400", "-inf", "nan"])
+    assert specials["abs_round"][0] == specials["rel_chop"][0] == math.inf
+    assert specials["abs_chop"][1] == 0 and math.isnan(specials["rel_round"][2])
+
+
+def test_split_ties_and_invalid_input():
+    assert export.split(EDGE_INPUTS[16]) == (1.0, 0.5, 0.5, 1.0)
+    a, t, rest, sign = export.split(EDGE_INPUTS[18])
+    assert (a, sign) == (1.0, 1.0) and 0.5 < t < 0.5000000001 and rest < 0.5
+    assert export.split(-5e-324) == (5e-324, 0.0, 1.0, -1.0)
+    # 1 - t keeps its digits when t is close to 1
+    a, t, rest, sign = export.split("1." + "9" * 40)
+    assert a == math.nextafter(2.0, 0) and t == 1 - 2**-53 and rest == pytest.approx(2e-40 / 2**-52)
+    # Extreme exponents are decided without building huge integers
+    assert export.split("-1e-9999999") == export.split("1e-651")[:3] + (-1.0,)
+    assert export.split("1e-651")[1] == 5e-324 and export.split("0e-9999999")[:2] == (0.0, 0.0)
+    assert export.split("1e9999999")[0] == math.inf
+    table = export.convert_batch(["1e-9999999", "-1e9999999"])
+    assert table["chopped"].tolist() == [0.0, -math.inf] and table["rel_chop"][0] == 1.0
+    with pytest.raises(ValueError):
+        export.split("abc")
+    with pytest.raises(ValueError):
+        list(export.iter_rows(["1", "two"]))
+
+
+def test_format_column():
+    x = np.array([0.0, 3.14159, -2.5e-300, 999.99, 12345.6789, -1e300, np.inf, np.nan])
+    assert export.format_column(x) == ["0.00e+00", "3.14e+00", "-2.50e-300", "1.00e+03",
+                                       "12345.678900000001", "-1.0000000000000001e+300", "inf", "nan"]
+
+
+def test_writers():
+    inputs = ["12345.6789", "\n", "3.1415926535\n", Decimal("0.5"), 2.0]
+    rows = [row for batch in export.iter_rows(inputs, batch_size=2) for row in batch]
+    assert [row[0] for row in rows] == ["12345.6789", "3.1415926535", "0.5", "2.0"]
+    assert rows[0][1:3] == ("12345.678899999999", "12345.678900000001")
+    assert all(len(row) == len(export.COLUMNS) for row in rows)
+
+    out = io.StringIO()
+    assert export.write_table(inputs, out, "latex", batch_size=2, caption="Results", label="tab:r") == 4
+    latex = out.getvalue().splitlines()
+    assert latex[:5] == ["\\begin{table}", "\\caption{Results}", "\\label{tab:r}",
+                         "\\begin{tabular}{lrrrrrr}", "\\toprule"]
+    assert latex[6] == "\\midrule" and latex[7] == " & ".join(rows[0]) + " \\\\"
+    assert latex[-3:] == ["\\bottomrule", "\\end{tabular}", "\\end{table}"]
+
+    out = io.StringIO()
+    export.write_table(inputs, out, "csv", batch_size=3)
+    out.seek(0)
+    assert [tuple(row) for row in csv.reader(out)] == [export.COLUMNS] + rows
+
+    out = io.StringIO()
+    export.write_table(inputs, out, "markdown")
+    markdown = out.getvalue().splitlines()
+    assert len(markdown) == 2 + len(rows) and markdown[1].startswith("|:---|---:|")
+    assert markdown[2] == "| " + " | ".join(rows[0]) + " |"
+
+    with pytest.raises(ValueError):
+        export.write_table(inputs, io.StringIO(), "html")
+
+
+class _Discard:
+    def write(self, text):
+        pass
+
+
+def test_memory_does_not_grow_with_rows():
+    inputs = random_inputs(40_000, seed=2)
+
+    def peak(n):
+        tracemalloc.start()
+        try:
+            assert export.write_table(iter(inputs[:n]), _Discard(), "csv", batch_size=500) == n
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    small, large = peak(4_000), peak(40_000)
+    assert large < 1.5 * small
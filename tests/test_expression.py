@@ -0,0 +1,86 @@
+"""
+tests/test_expression.py
+
+Checks the safe expression compiler: math expressions evaluate as before,
+anything outside the whitelist is rejected, compiled forms are cached, and
+sweeps over NumPy arrays agree with point-by-point evaluation.
+"""
+
+import os, sys, math
+import pytest
+import numpy as np
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter.converter import real_to_float64
+from float64_converter.expression import compile_expression, sweep, ExpressionError
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("sin(2)", math.sin(2)),
+    ("sqrt(5)", math.sqrt(5)),
+    ("e^3", math.e**3),
+    ("1+29*e", 1 + 29 * math.e),
+    ("-pi / 4 + 2**10 % 7", -math.pi / 4 + 2**10 % 7),
+    ("log(8, 2)", math.log(8, 2)),
+    ("42", 42),
+])
+def test_evaluates_math_expressions(text, expected):
+    assert compile_expression(text)() == expected
+
+
+@pytest.mark.parametrize("text", [
+    "__import__('os')",
+    "().__class__",
+    "math.sin(1)",
+    "[1, 2][0]",
+    "(lambda: 1)()",
+    "'abc'",
+    "open",
+    "x",
+    "sin(x=1)",
+    "1 if 1 else 2",
+    "2 +",
+])
+def test_rejects_unsafe_or_invalid(text):
+    with pytest.raises(ExpressionError):
+        compile_expression(text)
+
+
+def test_compiled_form_is_cached():
+    assert compile_expression("cos(1) + 1") is compile_expression("cos(1) + 1")
+
+
+def test_variables():
+    expression = compile_expression("x**2 + sin(x)", ("x",))
+    assert expression.variables == {"x"}
+    assert expression(x=3.0) == 9.0 + math.sin(3.0)
+    with pytest.raises(ExpressionError):
+        expression()
+
+
+def test_array_evaluation_matches_scalar():
+    expression = compile_expression("sqrt(fabs(x)) * exp(-x) + log(x + 2, 10) + erf(x)", ("x",))
+    xs = np.linspace(-1, 1, 101)
+    expected = [expression(x=x) for x in xs.tolist()]
+    np.testing.assert_allclose(expression.evaluate_array(x=xs), expected, rtol=1e-14)
+
+
+def test_constant_expression_broadcasts():
+    values = compile_expression("pi", ("x",)).evaluate_array(x=np.zeros(5))
+    assert values.shape == (5,)
+    assert (values == math.pi).all()
+
+
+def test_sweep():
+    xs, values, bits = sweep("sin(x)", 0, 1, 11)
+    np.testing.assert_array_equal(xs, np.linspace(0, 1, 11))
+    np.testing.assert_array_equal(values, np.sin(xs))
+    assert [b.decode() for b in bits] == [real_to_float64(y) for y in values.tolist()]
+
+
+def test_sweep_rejects_other_names():
+    with pytest.raises(ExpressionError):
+        sweep("sin(y)", 0, 1, 3)
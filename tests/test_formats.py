@@ -0,0 +1,92 @@
+"""
+tests/test_formats.py
+
+Tests for the format descriptors, the format-parameterized scalar engine
+(real_to_bits / bits_to_real) and the vectorized chop.
+"""
+
+import os, sys, math
+import pytest
+import numpy as np
+from decimal import Decimal
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter.formats import FloatFormat, BINARY16, BFLOAT16, BINARY32, BINARY64
+from float64_converter.converter import real_to_bits, bits_to_real, real_to_float64, float64_to_real
+from float64_converter.batch import chop
+
+E4M3 = FloatFormat("e4m3", 4, 3)
+
+
+def sample_values(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal(n) * 10.0 ** rng.integers(-45, 45, n)
+    edges = [0.0, -0.0, np.inf, -np.inf, np.nan, 65504.0, 65519.99, 65520.0,
+             6e-8, 2.9e-8, -3e-8, 3.4028235e38, 3.5e38, 1e-45, 240.0, 248.0]
+    return np.concatenate([x, edges])
+
+
+def test_format_parameters():
+    assert BINARY64.bias == 1023 and BINARY64.max_exponent == 2047 and BINARY64.width == 64
+    assert BINARY16.xmax == 65504.0 and BINARY16.xmin == 2.0**-14 and BINARY16.xmins == 2.0**-24
+    assert BFLOAT16.emax == 127 and BFLOAT16.width == 16
+    assert BINARY32.xmax == float(np.finfo(np.float32).max)
+    assert E4M3.xmax == 240.0
+
+
+def test_binary64_matches_float64_functions():
+    for x in ["0.1", "-1e-300", "1e-310", 12.375, Decimal("2.5e308"), 3**40]:
+        for rounding in (True, False):
+            bits = real_to_float64(x, round=rounding)
+            assert real_to_bits(x, BINARY64, round=rounding, subnormal=False) == bits
+            assert repr(bits_to_real(bits)) == repr(float64_to_real(bits))
+
+
+@pytest.mark.parametrize("fmt, dtype", [(BINARY16, np.float16), (BINARY32, np.float32)])
+def test_rounding_matches_native_casts(fmt, dtype):
+    x = sample_values()
+    with np.errstate(over="ignore"):
+        native = x.astype(dtype).astype(np.float64)
+
+    assert np.array_equal(chop(x, fmt, "round"), native, equal_nan=True)
+    with np.errstate(over="ignore"):
+        patterns = x[:300].astype(dtype).view(f"u{fmt.width // 8}")
+    for xi, pattern in zip(x[:300].tolist(), patterns.tolist()):
+        assert real_to_bits(xi, fmt, round=True) == format(pattern, f"0{fmt.width}b")
+
+
+@pytest.mark.parametrize("fmt", [BINARY16, BFLOAT16, BINARY32, E4M3])
+@pytest.mark.parametrize("mode", ["round", "chop"])
+@pytest.mark.parametrize("subnormal", [True, False])
+def test_chop_matches_scalar_engine(fmt, mode, subnormal):
+    x = sample_values(500)
+    y = chop(x, fmt, mode, subnormal)
+
+    for xi, yi in zip(x.tolist(), y.tolist()):
+        expected = bits_to_real(real_to_bits(xi, fmt, round=(mode == "round"), subnormal=subnormal), fmt)
+        if math.isnan(xi):
+            assert math.isnan(yi)
+        elif expected == 0:
+            assert yi == 0
+        else:
+            assert yi == float(expected)
+
+
+def test_overflow_and_underflow():
+    assert chop(np.array([65520.0, -70000.0]), BINARY16).tolist() == [np.inf, -np.inf]
+    assert chop(np.array([65535.0]), BINARY16, "chop").tolist() == [65504.0]
+    assert chop(np.array([1e-8]), BINARY16, subnormal=False).tolist() == [0.0]
+    assert chop(np.array([3e-8]), BINARY16).tolist() == [2.0**-24]
+    assert real_to_bits("65520", BINARY16, round=True) == "0" + "1" * 5 + "0" * 10
+    assert real_to_bits("1e-30", BINARY16, round=True) == "0" * 16
+    assert real_to_bits("-3e-8", BINARY16, round=True) == "1" + "0" * 14 + "1"
+
+
+def test_invalid_bits_and_mode():
+    with pytest.raises(ValueError):
+        bits_to_real("0" * 64, BINARY16)
+    with pytest.raises(ValueError):
+        chop(np.ones(3), BINARY16, mode="sideways")
@@ -0,0 +1,64 @@
+"""
+tests/test_imports.py
+
+Startup cost of the package: a cold import must stay within a time
+budget (measured with python -X importtime) and must not load the heavy
+optional dependencies, which are imported on first use.
+"""
+
+import os, sys, subprocess
+import pytest
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+# Cumulative cold-import time of float64_converter, in microseconds
+IMPORT_BUDGET_US = 100_000
+
+HEAVY_MODULES = ("numpy", "pandas", "matplotlib", "concurrent.futures", "multiprocessing")
+
+
+def import_time_us(module):
+    """Cumulative import time of module in a fresh interpreter, from -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=project_root, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+def loaded_modules(code):
+    """Names of the modules loaded after running code in a fresh interpreter."""
+    result = subprocess.run([sys.executable, "-c", f"{code}; import sys; print(*sys.modules)"],
+                            cwd=project_root, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def test_cold_import_within_budget():
+    # Best of three runs, to keep a busy machine from failing the test
+    best = min(import_time_us("float64_converter") for _ in range(3))
+    assert best <= IMPORT_BUDGET_US, f"import float64_converter took {best / 1000:.1f} ms"
+
+
+@pytest.mark.parametrize("code", [
+    "import float64_converter",
+    "from float64_converter import real_to_float64, float64_to_real, float64_to_str",
+    "import float64_converter.__main__",
+])
+def test_heavy_dependencies_are_not_imported(code):
+    assert loaded_modules(code).isdisjoint(HEAVY_MODULES)
+
+
+def test_lazy_names_import_on_first_use():
+    modules = loaded_modules("import float64_converter as f; f.chop, f.convert_many")
+    assert {"numpy", "float64_converter.batch", "float64_converter.parallel"} <= modules
+
+    import float64_converter
+    from float64_converter.batch import chop
+    assert float64_converter.chop is chop
+    assert "chop" in dir(float64_converter)
+    with pytest.raises(AttributeError):
+        float64_converter.not_a_name
@@ -0,0 +1,79 @@
+"""
+tests/test_instrument.py
+
+Tests for the opt-in instrumentation of the converter.
+"""
+
+import os, sys
+import pytest
+from decimal import Decimal
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter import instrument
+from float64_converter.converter import real_to_float64, float64_to_real
+
+
+@pytest.fixture
+def traced():
+    instrument.reset()
+    instrument.enable()
+    yield instrument
+    instrument.disable()
+    instrument.reset()
+
+
+def test_stages_and_branch_counters(traced):
+    # In-range str literals take the parsing fast path; Decimals use the engine
+    real_to_float64("0.1", round=True)
+    real_to_float64(Decimal("0.1"), round=True)
+    real_to_float64("1e400")
+    real_to_float64(1e-320)
+    real_to_float64(float("nan"))
+    real_to_float64(Decimal("1.9999999999999999999"), round=True)
+    float64_to_real(real_to_float64(2.5))
+
+    stats = traced.stats()
+    assert stats["calls"] == {"encode": 7, "decode": 1}
+    for stage in ("widening", "normalization", "rounding", "formatting", "fast_path", "parsing", "decimal"):
+        assert stats["stages"][stage]["calls"] > 0
+    assert stats["counters"]["overflow"] == 1
+    assert stats["counters"]["underflow"] == 1
+    assert stats["counters"]["special_nan"] == 1
+    assert stats["counters"]["carry"] == 1
+    assert stats["counters"]["normalize_steps"] >= 2
+
+
+def test_hooks_and_errors(traced):
+    records = []
+    hook = lambda event, record: records.append((event, record))
+    traced.add_hook(hook)
+    try:
+        real_to_float64(12.375)
+        with pytest.raises(ValueError):
+            float64_to_real("0101")
+    finally:
+        traced.remove_hook(hook)
+
+    assert [event for event, _ in records] == ["encode", "decode"]
+    assert records[0][1]["seconds"] >= sum(records[0][1]["stages"].values())
+    assert records[1][1]["error"] is True
+    assert traced.stats()["errors"] == {"decode": 1}
+
+
+def test_prometheus_export(traced):
+    real_to_float64("1e400")
+    text = traced.to_prometheus()
+
+    assert '# TYPE float64_converter_calls_total counter' in text
+    assert 'float64_converter_calls_total{event="encode"} 1' in text
+    assert 'float64_converter_branch_total{branch="overflow"} 1' in text
+
+
+def test_disabled_records_nothing():
+    instrument.reset()
+    real_to_float64("0.1")
+    float64_to_real(real_to_float64(0.1))
+    assert instrument.stats()["calls"] == {}
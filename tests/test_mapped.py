@@ -0,0 +1,109 @@
+"""
+tests/test_mapped.py
+
+Tests for memory-mapped dumps of raw and .npy files of doubles: byte
+orders, plain and field-split lines, and loading dumps back.
+"""
+
+import os, sys, io
+import pytest
+import numpy as np
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter import mapped
+from float64_converter.converter import real_to_float64
+
+VALUES = np.array([0.1, -2.5, np.nan, np.inf, -0.0, 5e-324, 1e300, -1.7976931348623157e308])
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = {
+        ("raw", "little"): tmp_path / "le.bin",
+        ("raw", "big"): tmp_path / "be.bin",
+        ("npy", "little"): tmp_path / "le.npy",
+        ("npy", "big"): tmp_path / "be.npy",
+    }
+    VALUES.astype("<f8").tofile(paths["raw", "little"])
+    VALUES.astype(">f8").tofile(paths["raw", "big"])
+    np.save(paths["npy", "little"], VALUES.astype("<f8"))
+    np.save(paths["npy", "big"], VALUES.astype(">f8"))
+    return {key: str(path) for key, path in paths.items()}
+
+
+def dump(path, **kwargs):
+    out = io.BytesIO()
+    count = mapped.dump_bits(path, out, **kwargs)
+    assert count == len(VALUES)
+    return out.getvalue().decode()
+
+
+@pytest.mark.parametrize("kind", ["raw", "npy"])
+@pytest.mark.parametrize("byteorder", ["little", "big"])
+def test_dump_matches_real_to_float64(files, kind, byteorder):
+    # A .npy file records its byte order, so the argument is ignored for it
+    lines = dump(files[kind, byteorder], byteorder=byteorder, chunk_size=3).splitlines()
+    assert lines == [real_to_float64(float(x)) for x in VALUES]
+
+
+def test_map_doubles_is_zero_copy(files):
+    bits = mapped.map_doubles(files["npy", "big"])
+    assert isinstance(bits, np.memmap) and bits.dtype == np.dtype(">u8")
+    np.testing.assert_array_equal(bits.view(">f8"), VALUES)
+
+
+def test_raw_and_fields(files):
+    lines = dump(files["raw", "little"], fields=True, raw=True).splitlines()
+    native = VALUES.view(np.uint64)
+    for line, bits in zip(lines, native.tolist()):
+        s, c, f = line.split(" ")
+        assert (len(s), len(c), len(f)) == (1, 11, 52)
+        assert int(s + c + f, 2) == bits
+
+
+@pytest.mark.parametrize("fields", [False, True])
+@pytest.mark.parametrize("target, byteorder", [("out.bin", "big"), ("out.npy", "little")])
+def test_load_round_trip(files, tmp_path, fields, target, byteorder):
+    source = tmp_path / "dump.txt"
+    source.write_text(dump(files["raw", "little"], fields=fields, raw=True))
+    path = str(tmp_path / target)
+
+    assert mapped.load_bits(str(source), path, byteorder=byteorder, chunk_size=3) == len(VALUES)
+    if target.endswith(".npy"):
+        loaded = np.load(path)
+    else:
+        loaded = np.fromfile(path, dtype=">f8")
+    np.testing.assert_array_equal(loaded.astype("<f8").view(np.uint64), VALUES.view(np.uint64))
+
+
+def test_load_rejects_bad_lines(tmp_path):
+    source = tmp_path / "dump.txt"
+    source.write_text("0" * 64 + "\n" + "0" * 63 + "2\n")
+    with pytest.raises(ValueError, match="line 2"):
+        mapped.load_bits(str(source), str(tmp_path / "out.bin"))
+
+    source.write_text("0101\n")
+    with pytest.raises(ValueError):
+        mapped.load_bits(str(source), str(tmp_path / "out.bin"))
+
+
+def test_npy_versions_and_order(tmp_path):
+    path = str(tmp_path / "v3.npy")
+    with open(path, "wb") as f:
+        np.lib.format.write_array(f, VALUES.reshape(2, 4), version=(3, 0))
+    np.testing.assert_array_equal(mapped.map_doubles(path), VALUES.view(np.uint64))
+
+    with open(path, "r+b") as f:
+        f.seek(6)
+        f.write(bytes([4, 0]))  # A version this module does not know
+    with pytest.raises(ValueError, match="version"):
+        mapped.map_doubles(path)
+
+    # Storage order would differ from the array's C order
+    path = str(tmp_path / "fortran.npy")
+    np.save(path, np.asfortranarray(np.arange(6.0).reshape(2, 3)))
+    with pytest.raises(ValueError, match="Fortran"):
+        mapped.dump_bits(path, io.StringIO())
@@ -0,0 +1,48 @@
+"""
+tests/test_parallel.py
+
+Tests for the process-pool conversion API.
+"""
+
+import os, sys
+from decimal import Decimal, localcontext
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter import parallel
+from float64_converter.converter import real_to_float64
+
+
+def decimal_strings(n):
+    return [f"{k}.{k * 7919 % 10**30:030d}e{k % 600 - 300}" for k in range(1, n + 1)]
+
+
+def test_pool_keeps_input_order():
+    values = decimal_strings(2500)
+
+    for rounding in (True, False):
+        result = parallel.convert_many(values, round=rounding, workers=2, chunksize=300)
+        assert result == [real_to_float64(x, round=rounding) for x in values]
+
+
+def test_thread_pool_ignores_caller_context():
+    values = decimal_strings(2500)
+    expected = [real_to_float64(x, round=True) for x in values]
+
+    with localcontext() as ctx:
+        ctx.prec = 5
+        result = parallel.convert_many(values, round=True, workers=4, chunksize=200, backend="thread")
+    assert result == expected
+
+
+def test_small_batches_run_serially(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("small batches must not start a process pool")
+    monkeypatch.setitem(parallel.POOLS, "process", no_pool)
+
+    values = [Decimal("0.1"), "1e-300", 2.5]
+    assert parallel.convert_many(values, round=True, workers=4) == [
+        real_to_float64(x, round=True) for x in values
+    ]
@@ -0,0 +1,170 @@
+"""
+tests/test_rounding.py
+
+Tests for the rounding modes: directed and ties-away rounding of exact
+values, agreement of the scalar engine and the vectorized chop in every
+mode, and stochastic rounding (unbiased, and reproducible across
+chunking, workers and caches).
+"""
+
+import os, sys, math, warnings
+import pytest
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, localcontext
+from fractions import Fraction
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter import batch, cache, parallel, rounding
+from float64_converter.rounding import RoundingMode
+from float64_converter.formats import FloatFormat, BINARY16, BFLOAT16, BINARY32, BINARY64
+from float64_converter.converter import real_to_float64, float64_to_real, real_to_bits, bits_to_real
+
+E4M3 = FloatFormat("e4m3", 4, 3)
+SMALLEST = "0" * 63 + "1"
+
+
+def value(bits):
+    return float64_to_real(bits, as_float=True)
+
+
+def sample_values(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal(n) * 10.0 ** rng.integers(-45, 45, n)
+    edges = [0.0, -0.0, np.inf, -np.inf, np.nan, 65504.0, 65519.99, 65520.0, -65535.0,
+             6e-8, 2.9e-8, -3e-8, 1e-300, -1e-300, 3.4028235e38, 1e-45, 240.0, 248.0,
+             0.5 + 2**-12, -(0.5 + 2**-12), 1.5 * 2**-24]
+    return np.concatenate([x, edges])
+
+
+def test_resolve():
+    assert rounding.resolve(True) is RoundingMode.NEAREST_EVEN
+    assert rounding.resolve(False) is RoundingMode.TOWARD_ZERO
+    assert rounding.resolve("down") is RoundingMode.TOWARD_NEGATIVE
+    assert rounding.resolve(RoundingMode.STOCHASTIC) is RoundingMode.STOCHASTIC
+    with pytest.raises(ValueError):
+        rounding.resolve("sideways")
+    assert real_to_float64("0.1", RoundingMode.NEAREST_EVEN) == real_to_float64("0.1", round=True)
+    assert real_to_float64("0.1", "chop") == real_to_float64("0.1")
+
+
+def test_directed_and_away_rounding_bracket_the_value():
+    rng = np.random.default_rng(1)
+    texts = [f"{'-' if k % 2 else ''}{m}e{e}" for k, (m, e) in
+             enumerate(zip(rng.integers(1, 10**17, 300).tolist(), rng.integers(-340, 290, 300).tolist()))]
+    for text in texts + ["0.1", "-0.1", "1e-400", "-1e-400"]:
+        x = Fraction(Decimal(text))
+        down, up = (value(real_to_float64(text, mode)) for mode in ("down", "up"))
+        if down == up:
+            assert Fraction(down) == x or down == up == 0.0
+            continue
+        assert Fraction(down) < x < Fraction(up)
+        toward_zero = down if x > 0 else up
+        assert value(real_to_float64(text, RoundingMode.TOWARD_ZERO)) == toward_zero
+        nearest = value(real_to_float64(text, round=True))
+        assert value(real_to_float64(text, "away")) == nearest  # No ties among these
+        assert value(real_to_float64(Decimal(text), "up")) == up
+
+
+def test_ties():
+    with localcontext() as ctx:
+        ctx.prec = 100
+        tie = Decimal(0.5) + Decimal(2.0**-54)  # Halfway between 0.5 and the next double
+    assert value(real_to_float64(tie, "away")) == math.nextafter(0.5, 1)
+    assert value(real_to_float64(tie, True)) == 0.5
+    assert value(real_to_float64(-tie, "away")) == -math.nextafter(0.5, 1)
+    assert value(real_to_float64(str(tie), "up")) == math.nextafter(0.5, 1)
+    assert value(real_to_float64(str(tie), "down")) == 0.5
+
+
+def test_tiny_values_round_to_the_smallest_subnormal():
+    assert real_to_bits("1e-400", BINARY64, "up") == SMALLEST
+    assert real_to_bits("-1e-400", BINARY64, "down") == "1" + SMALLEST[1:]
+    assert real_to_bits("-1e-400", BINARY64, "up") == "1" + "0" * 63
+    assert real_to_bits("1e-400", BINARY64, "away") == "0" * 64
+    # Flushed formats stay flushed
+    assert real_to_float64("1e-400", "up") == "0" * 64
+    # Far below the smallest subnormal only a random number of 0 rounds up
+    assert {real_to_bits("1e-400", BINARY64, "stochastic", index=i) for i in range(200)} == {"0" * 64}
+    # Close to it, about x / smallest of the draws do
+    draws = [real_to_bits("1.5e-324", BINARY64, "stochastic", seed=3, index=i) for i in range(2000)]
+    assert 0.2 < draws.count(SMALLEST) / len(draws) < 0.4
+
+
+@pytest.mark.parametrize("fmt", [BINARY16, BFLOAT16, BINARY32, E4M3])
+@pytest.mark.parametrize("mode", list(RoundingMode))
+@pytest.mark.parametrize("subnormal", [True, False])
+def test_chop_matches_scalar_engine(fmt, mode, subnormal):
+    x = sample_values()
+    y = batch.chop(x, fmt, mode, subnormal, seed=42)
+
+    for i, (xi, yi) in enumerate(zip(x.tolist(), y.tolist())):
+        expected = bits_to_real(real_to_bits(xi, fmt, mode, subnormal, seed=42, index=i), fmt)
+        if math.isnan(xi):
+            assert math.isnan(yi)
+        else:
+            assert yi == float(expected), (xi, mode)
+
+
+@pytest.mark.parametrize("mode", list(RoundingMode))
+@pytest.mark.parametrize("subnormal", [True, False])
+def test_chop_passes_nan_through_without_warnings(mode, subnormal):
+    payloads = np.array([0x7FF0000000000001, 0xFFF8000000000123], dtype=np.uint64).view(np.float64)
+    x = np.concatenate([[np.nan, 1.0, -np.inf], payloads])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        y = batch.chop(x, BINARY16, mode, subnormal)
+    assert np.isnan(y[[0, 3, 4]]).all() and y[1:3].tolist() == [1.0, -np.inf]
+
+
+def test_random_bits_array_matches_scalar():
+    bits = batch.random_bits_array(2024, 10**12, 100)
+    assert bits.tolist() == [rounding.random_bits(2024, 10**12 + i) for i in range(100)]
+    # Any int seed, taken modulo 2^64
+    assert batch.random_bits_array(-1, 0, 3).tolist() == [rounding.random_bits(2**64 - 1, i) for i in range(3)]
+
+
+def test_stochastic_rounding_is_unbiased():
+    x = np.full(200_000, 1 / 3)
+    y = batch.chop(x, BINARY16, "stochastic", seed=7)
+    low, high = batch.chop(x[:1], BINARY16, "down")[0], batch.chop(x[:1], BINARY16, "up")[0]
+    assert set(np.unique(y).tolist()) == {low, high}
+    p = (1 / 3 - low) / (high - low)
+    assert abs((y == high).mean() - p) < 4 * math.sqrt(p * (1 - p) / len(x))
+    assert abs(y.mean() - 1 / 3) < 1e-5
+    # Exact values are never moved
+    assert (batch.chop(np.full(1000, 0.375), BINARY16, "stochastic") == 0.375).all()
+
+
+def test_stochastic_rounding_does_not_depend_on_chunking(monkeypatch):
+    x = np.random.default_rng(5).standard_normal((300, 170))
+    whole = batch.chop(x, BINARY16, "stochastic", seed=9)
+    assert not np.array_equal(whole, batch.chop(x, BINARY16, "stochastic", seed=10))
+
+    flat = x.reshape(-1)
+    bounds = [0, 1, 4000, 33000, 40000, flat.size]
+    with ThreadPoolExecutor(3) as pool:
+        parts = pool.map(lambda ij: batch.chop(flat[ij[0]:ij[1]], BINARY16, "stochastic", seed=9, offset=ij[0]),
+                         zip(bounds, bounds[1:]))
+        np.testing.assert_array_equal(np.concatenate(list(parts)).reshape(x.shape), whole)
+
+    monkeypatch.setattr(batch, "CHOP_BLOCK", 1000)
+    np.testing.assert_array_equal(batch.chop(x, BINARY16, "stochastic", seed=9), whole)
+
+
+def test_stochastic_convert_many_and_cache():
+    values = [f"0.{k:06d}1" for k in range(2500)]
+    serial = [real_to_float64(v, "stochastic", 4, i) for i, v in enumerate(values)]
+    assert serial != [real_to_float64(v) for v in values]
+    assert serial != [real_to_float64(v, round=True) for v in values]
+    for workers, chunksize in ((2, 300), (3, 77)):
+        assert parallel.convert_many(values, "stochastic", workers, chunksize, "thread", seed=4) == serial
+
+    encode = cache.cached_real_to_float64()
+    encode("0.1", "stochastic", 1, 5)
+    encode("0.1", "up")
+    assert encode.cache_info().currsize == 1
+    assert encode("0.1", "up") == real_to_float64("0.1", RoundingMode.TOWARD_POSITIVE)
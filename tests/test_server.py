@@ -0,0 +1,108 @@
+"""
+tests/test_server.py
+
+Tests for the local NDJSON conversion server: the protocol, request
+coalescing, statistics, and throughput scaling with client concurrency
+under the load generator.
+"""
+
+import os, sys, json, asyncio
+import pytest
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter import server
+from float64_converter.converter import real_to_float64, float64_to_real
+
+
+def run_with_server(tmp_path, body, backend="thread", tcp=False, **kwargs):
+    """Start a server, run body(server, address) and close the server."""
+    async def main():
+        srv = server.ConversionServer(backend, workers=1, **kwargs)
+        address = await srv.start(None if tcp else str(tmp_path / "f64.sock"))
+        try:
+            return await body(srv, address)
+        finally:
+            await srv.close()
+    return asyncio.run(main())
+
+
+async def exchange(address, requests):
+    """Send all requests at once on one connection; return the responses by id."""
+    reader, writer = await server.connect(address)
+    writer.write(b"".join(json.dumps(r).encode() + b"\n" for r in requests))
+    responses = [json.loads(await reader.readline()) for _ in requests]
+    writer.close()
+    return {response["id"]: response for response in responses}
+
+
+@pytest.mark.parametrize("tcp", [False, True])
+def test_protocol(tmp_path, tcp):
+    bits = real_to_float64("3.125")
+    requests = [
+        {"id": 1, "op": "encode", "value": "0.1", "round": True},
+        {"id": 2, "op": "decode", "value": bits},
+        {"id": 3, "op": "encode", "value": -2.5},
+        {"id": 4, "op": "encode", "value": "abc"},
+        {"id": 5, "op": "decode", "value": "0101"},
+        {"id": 6, "op": "divide", "value": "1"},
+        {"id": 7, "op": "encode", "value": [1]},
+    ]
+
+    async def body(srv, address):
+        responses = await exchange(address, requests)
+        stats = (await exchange(address, [{"id": 8, "op": "stats"}]))[8]["result"]
+        return responses, stats
+
+    responses, stats = run_with_server(tmp_path, body, tcp=tcp)
+    assert responses[1]["result"] == real_to_float64("0.1", round=True)
+    assert responses[2]["result"] == str(float64_to_real(bits))
+    assert responses[3]["result"] == real_to_float64(-2.5)
+    assert responses[4]["error"] == "not a valid number"
+    assert "64-bit" in responses[5]["error"]
+    assert "op must be" in responses[6]["error"] and "value must be" in responses[7]["error"]
+    assert stats["requests"] == 5 and stats["errors"] == 2
+    assert stats["p99_ms"] >= stats["p50_ms"] > 0
+
+
+def test_identical_requests_are_coalesced(tmp_path):
+    async def body(srv, address):
+        values = ["0.1"] * 50 + [0.0, -0.0]
+        results = await asyncio.gather(*(srv.convert("encode", v) for v in values))
+        return results, srv.stats()
+
+    results, stats = run_with_server(tmp_path, body)
+    assert results[:50] == [real_to_float64("0.1")] * 50
+    assert results[50:] == [real_to_float64(0.0), real_to_float64(-0.0)]
+    assert stats["coalesced"] >= 49
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+
+
+def test_throughput_scales_with_clients(tmp_path):
+    async def body(srv, address):
+        single = await server.load(address, clients=1, requests=600)
+        many = await server.load(address, clients=16, requests=600)
+        return single, many, srv.stats()
+
+    single, many, stats = run_with_server(tmp_path, body, backend="process")
+    assert single["errors"] == many["errors"] == 0
+    # Concurrent requests share executor round trips in micro-batches
+    assert stats["mean_batch"] > 1 and stats["max_queue_depth"] > 1
+    assert many["throughput"] > 1.5 * single["throughput"]
+
+
+def test_stochastic_requests_draw_independently(tmp_path):
+    value = "0.10000000000000001"  # A third of the way between two doubles
+    neighbours = {real_to_float64(value, "down"), real_to_float64(value, "up")}
+
+    async def body(srv, address):
+        results = await asyncio.gather(*(srv.convert("encode", value, "stochastic") for _ in range(200)))
+        return results, srv.stats()
+
+    results, stats = run_with_server(tmp_path, body, seed=3)
+    assert set(results) == neighbours
+    assert stats["coalesced"] == 0
+    # The same seed replays the same draws
+    assert run_with_server(tmp_path, body, seed=3)[0] == results
@@ -0,0 +1,85 @@
+"""
+tests/test_table.py
+
+Checks the bulk conversion table used by the GUI batch tab: chunked
+conversion, display rows, error rows and streamed CSV export.
+"""
+
+import os, sys, io, csv
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter.converter import real_to_float64
+from float64_converter.table import COLUMNS, ConversionTable, convert_lines, read_lines, read_file
+
+
+LINES = ["0.1\n", "\n", "-2.5", "abc", "1e400", "  3  "]
+
+
+def converted_table(chunk=2):
+    table = ConversionTable(read_lines(LINES))
+    for start in range(0, len(table), chunk):
+        table.store(start, convert_lines(table.inputs[start:start + chunk]))
+    return table
+
+
+def test_read_lines_skips_blank_lines():
+    inputs = read_lines(LINES)
+    assert inputs.tolist() == [b"0.1", b"-2.5", b"abc", b"1e400", b"3"]
+    assert len(inputs) == 5 and inputs[1:3].tolist() == [b"-2.5", b"abc"] and inputs[4:9].tolist() == [b"3"]
+
+
+def test_read_file_in_chunks(tmp_path):
+    path = tmp_path / "numbers.txt"
+    path.write_bytes(b"0.1\r\n\n  -2.5\n" + b"7" * 50 + b"\n\n1e400")
+    for chunk_size in (1, 7, 1 << 20):
+        assert read_file(str(path), chunk_size).tolist() == [b"0.1", b"-2.5", b"7" * 50, b"1e400"]
+
+
+def test_rows():
+    rows = converted_table().rows(0, 10)
+    assert len(rows) == 5 and all(len(row) == len(COLUMNS) for row in rows)
+
+    text, sign, exponent, fraction, chopped, rounded, error = rows[0]
+    bits = real_to_float64("0.1")
+    assert (text, sign + exponent + fraction, error) == ("0.1", bits, "")
+    assert chopped == "0.09999999999999999" and rounded == "0.1"
+
+    assert rows[1][1] == "1" and rows[1][4] == rows[1][5] == "-2.5"
+    assert rows[2][0] == "abc" and rows[2][-1] == "not a valid number"
+    assert rows[3][4] == "inf"
+
+
+def test_unconverted_rows_show_input_only():
+    table = ConversionTable(read_lines(LINES))
+    table.store(0, convert_lines(table.inputs[:2]))
+    assert table.done == 2
+    assert table.rows(2, 3) == [("abc", "", "", "", "", "", "")]
+
+
+def test_streamed_csv_matches_rows():
+    table = converted_table()
+    out = io.StringIO()
+    table.write_csv(out, 0, 2)
+    table.write_csv(out, 2, None, header=False)
+    out.seek(0)
+    assert [tuple(row) for row in csv.reader(out)] == [COLUMNS] + table.rows(0, len(table))
+
+
+def test_large_table_memory():
+    inputs = read_lines(str(k * 0.001) for k in range(100_000))
+    table = ConversionTable(inputs)
+    assert table.chopped.nbytes + table.rounded.nbytes + inputs.nbytes < 5_000_000
+    assert len(table.rows(50_000, 50_025)) == 25
+
+
+def test_long_line_costs_only_its_length():
+    # A fixed-width array would give every row the width of the longest
+    inputs = read_lines(["1"] * 100_000 + ["9" * 5000])
+    assert inputs.nbytes < 2_000_000
+    table = ConversionTable(inputs)
+    table.store(99_990, convert_lines(inputs[99_990:]))
+    assert table.rows(100_000, 100_001)[0][0] == "9" * 5000
+    assert table.rows(99_999, 100_000)[0][4] == "1.0"
@@ -0,0 +1,91 @@
+"""
+tests/test_ulp.py
+
+Tests for the ULP and neighbour functions on 64-bit patterns, against
+math.nextafter/math.ulp, and for agreement of the scalar and vectorized
+versions.
+"""
+
+import os, sys, math, struct
+import pytest
+import numpy as np
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter import ulp
+
+EDGE_VALUES = [0.0, -0.0, 5e-324, -5e-324, 2.0**-1022, -2.0**-1022, 2.225073858507201e-308,
+               1.0, -1.0, 1.7976931348623157e308, -1.7976931348623157e308, math.inf, -math.inf]
+
+
+def bits_of(x):
+    return format(struct.unpack('>Q', struct.pack('>d', x))[0], '064b')
+
+
+def value_of(bits):
+    return struct.unpack('>d', int(bits, 2).to_bytes(8, 'big'))[0]
+
+
+def patterns(n=3000, seed=0):
+    """Random non-NaN patterns (every exponent) plus the edge values."""
+    p = np.random.default_rng(seed).integers(0, 2**64, size=n, dtype=np.uint64)
+    p = p[~np.isnan(p.view(np.float64))]
+    return np.concatenate([np.array(EDGE_VALUES).view(np.uint64), p])
+
+
+def test_neighbours_and_spacing_match_math():
+    for p in patterns().tolist():
+        bits = format(p, '064b')
+        x = value_of(bits)
+        assert ulp.next_up(bits) == bits_of(math.nextafter(x, math.inf))
+        assert ulp.next_down(bits) == bits_of(math.nextafter(x, -math.inf))
+        if math.isfinite(x):
+            assert value_of(ulp.ulp(bits)) == math.ulp(x)
+
+    assert ulp.next_up(bits_of(-5e-324)) == bits_of(-0.0)
+    assert ulp.next_down(bits_of(0.0)) == bits_of(-5e-324)
+    assert ulp.ulp(bits_of(-math.inf)) == bits_of(math.inf)
+
+
+def test_ordinals_follow_the_order_of_values():
+    values = sorted(set(patterns().view(np.float64).tolist()) - {-0.0})
+    ordinals = [ulp.ordinal(bits_of(x)) for x in values]
+    assert ordinals == sorted(ordinals) and len(set(ordinals)) == len(ordinals)
+    assert ulp.ordinal(bits_of(0.0)) == ulp.ordinal(bits_of(-0.0)) == 0
+    for n in ordinals[::50]:
+        assert ulp.ordinal(ulp.from_ordinal(n)) == n
+
+    assert ulp.ulp_distance(bits_of(1.0), bits_of(math.nextafter(1.0, 2))) == 1
+    assert ulp.ulp_distance(bits_of(-5e-324), bits_of(5e-324)) == 2
+    assert ulp.ulp_distance(bits_of(-math.inf), bits_of(math.inf)) == 2 * 0x7FF0000000000000
+
+
+def test_arrays_match_scalar():
+    p = patterns()
+    q = p[::-1].copy()
+    strings = [format(x, '064b') for x in p.tolist()]
+    for scalar, vectorized in ((ulp.next_up, ulp.next_up_array), (ulp.next_down, ulp.next_down_array),
+                               (ulp.ulp, ulp.ulp_array)):
+        assert [format(x, '064b') for x in vectorized(p).tolist()] == [scalar(s) for s in strings]
+
+    assert ulp.ordinal_array(p).tolist() == [ulp.ordinal(s) for s in strings]
+    np.testing.assert_array_equal(ulp.from_ordinal_array(ulp.ordinal_array(p[2:])), p[2:])  # Skip the zeros
+    expected = [ulp.ulp_distance(format(a, '064b'), format(b, '064b')) for a, b in zip(p.tolist(), q.tolist())]
+    assert ulp.ulp_distance_array(p, q).tolist() == expected
+
+
+def test_nan_and_bad_input():
+    nan = bits_of(math.nan)
+    for func in (ulp.next_up, ulp.next_down, ulp.ulp, ulp.ordinal):
+        with pytest.raises(ValueError):
+            func(nan)
+    with pytest.raises(ValueError):
+        ulp.ulp_distance_array(np.array([np.nan]).view(np.uint64), np.zeros(1, dtype=np.uint64))
+    with pytest.raises(ValueError):
+        ulp.from_ordinal(0x7FF0000000000001)
+    with pytest.raises(ValueError):
+        ulp.next_up("0101")
+    with pytest.raises(TypeError):
+        ulp.ulp_array(np.array([1.0]))
@@ -0,0 +1,81 @@
+"""
+tests/test_verify.py
+
+Tests for the differential verification harness: reproducible shards,
+checkpoint/resume, and detection and minimization of mismatches.
+"""
+
+import os, sys, json
+import pytest
+import numpy as np
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter import verify
+from float64_converter.converter import real_to_float64
+
+
+def test_small_run_has_no_mismatches():
+    report = verify.verify(400, shard_size=100, workers=1)
+    assert report["patterns"] == 400
+    assert report["checks"] == 400 * len(verify.CHECKS)
+    assert report["mismatches"] == 0 and report["minimized"] == []
+    assert report["patterns_per_second"] > 0
+
+
+def test_generate_covers_structured_patterns():
+    bits = verify.generate(np.random.default_rng(0), 4000)
+    exponents = (bits >> np.uint64(52)) & np.uint64(0x7FF)
+    assert (exponents == 0).sum() > 400          # Subnormals and zeros
+    assert (exponents == 0x7FF).any()            # Infinities and NaNs
+    assert len(np.unique(exponents)) > 1000      # Every part of the range
+
+
+def test_shards_are_reproducible():
+    rng = lambda: np.random.default_rng(np.random.SeedSequence(7, spawn_key=(3,)))
+    np.testing.assert_array_equal(verify.generate(rng(), 50), verify.generate(rng(), 50))
+    assert verify.run_shard(3, 50, seed=7)["mismatches"] == []
+
+
+def test_checkpoint_resume(tmp_path, monkeypatch):
+    checkpoint = str(tmp_path / "run.jsonl")
+    verify.verify(300, shard_size=100, workers=1, checkpoint=checkpoint)
+
+    # Forget one shard and leave half a line, as if the run had been interrupted
+    lines = open(checkpoint).read().splitlines(keepends=True)
+    assert json.loads(lines[0])["config"]["total"] == 300 and len(lines) == 4
+    kept = [line for line in lines if json.loads(line).get("index") != 1]
+    open(checkpoint, "w").write("".join(kept) + '{"index": 1, "pat')
+
+    run = []
+    original = verify.run_shard
+    monkeypatch.setattr(verify, "run_shard", lambda i, *args: run.append(i) or original(i, *args))
+    report = verify.verify(300, shard_size=100, workers=1, checkpoint=checkpoint)
+    assert run == [1]
+    assert report["patterns"] == 300
+    assert len(open(checkpoint).read().splitlines()) == 4
+
+    run.clear()
+    assert verify.verify(300, shard_size=100, workers=1, checkpoint=checkpoint)["patterns"] == 300
+    assert run == []
+
+    with pytest.raises(ValueError):
+        verify.verify(300, shard_size=100, seed=1, workers=1, checkpoint=checkpoint)
+
+
+def test_mismatches_are_found_and_minimized(monkeypatch):
+    # A converter that ignores round=True fails the midpoint checks
+    monkeypatch.setattr(verify, "real_to_float64", lambda x, round=False: real_to_float64(x))
+    report = verify.verify(200, shard_size=100, workers=1, checks=("encode_near_tie",))
+    assert report["mismatches"] > 0
+
+    # Every mismatch is counted, beyond the examples kept
+    monkeypatch.setattr(verify, "MAX_MISMATCHES", 2)
+    shard = verify.run_shard(0, 100, checks=("encode_near_tie",))
+    assert len(shard["mismatches"]) == 2 and shard["mismatch_count"] > 2
+
+    for m in report["minimized"]:
+        assert verify.check("encode_near_tie", int(m["minimized"], 16)) is not None
+        assert bin(int(m["minimized"], 16)).count("1") <= bin(int(m["pattern"], 16)).count("1")
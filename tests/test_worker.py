@@ -0,0 +1,81 @@
+"""
+tests/test_worker.py
+
+Checks the background conversion worker: results arrive through poll(),
+superseded results are dropped, and slow jobs are cancelled or timed out
+without blocking the caller.
+"""
+
+import os, sys, time
+import pytest
+
+# Find package
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(project_root)
+
+from float64_converter.converter import real_to_float64
+from float64_converter.worker import BackgroundConverter
+
+
+@pytest.fixture
+def worker():
+    worker = BackgroundConverter(timeout=10.0)
+    worker.start()
+    yield worker
+    worker.close()
+
+
+def wait(worker, limit=30.0):
+    end = time.monotonic() + limit
+    while time.monotonic() < end:
+        result = worker.poll()
+        if result is not None:
+            return result
+        time.sleep(0.01)
+    raise AssertionError("no result")
+
+
+def test_result(worker):
+    job = worker.submit(real_to_float64, "0.1", True)
+    assert worker.busy
+    assert wait(worker) == (job, "ok", real_to_float64("0.1", round=True))
+    assert not worker.busy
+    assert worker.poll() is None
+
+
+def test_error_message(worker):
+    worker.submit(real_to_float64, "not a number")
+    _, status, message = wait(worker)
+    assert status == "error"
+    assert isinstance(message, str)
+
+
+def test_stale_result_is_dropped(worker):
+    worker.restart_after = 60.0
+    worker.submit(time.sleep, 0.2)
+    job = worker.submit(real_to_float64, 1.5)
+    assert wait(worker) == (job, "ok", real_to_float64(1.5))
+
+
+def test_slow_job_is_replaced(worker):
+    worker.restart_after = 0.0
+    worker.submit(time.sleep, 60)
+    time.sleep(0.05)
+    job = worker.submit(real_to_float64, 2.0)
+    assert wait(worker, limit=20.0) == (job, "ok", real_to_float64(2.0))
+
+
+def test_cancel_returns_immediately(worker):
+    worker.submit(time.sleep, 60)
+    start = time.monotonic()
+    worker.cancel()
+    assert time.monotonic() - start < 5
+    assert not worker.busy and worker.poll() is None
+
+
+def test_timeout(worker):
+    worker.timeout = 0.2
+    job = worker.submit(time.sleep, 60)
+    time.sleep(0.3)
+    assert worker.poll() == (job, "timeout", None)
+    assert not worker.busy